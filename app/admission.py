@@ -0,0 +1,273 @@
+import json
+import asyncio
+from collections import deque
+from typing import Any, Dict
+
+from app.logger import get_logger
+from app.config_manager import get_config
+
+# 獲取日誌記錄器
+logger = get_logger()
+
+# 獲取配置管理器
+config = get_config()
+
+# 受准入控制的路由：(方法, 路徑) -> 名額類別。只限制會呼叫後端的密碼修改，
+# 首頁、靜態文件、健康檢查與唯讀 API 不受限制
+GATED_ROUTES = {
+    ("POST", "/change-password"): "change_password",
+    ("POST", "/api/change-password/batch"): "batch",
+}
+
+
+class AdmissionController:
+    """
+    請求准入控制
+
+    同時處理的請求數達到上限時，之後的請求在有界的等待佇列中依序等候；
+    佇列已滿或等候超過期限的請求立即拒絕，不再佔用伺服器資源。
+    只在事件迴圈中使用，不需要加鎖。
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 32,
+        max_pending: int = 64,
+        pending_timeout: float = 5.0,
+        retry_after: int = 2,
+    ):
+        """
+        初始化准入控制
+
+        :param max_concurrent: 同時處理的請求數上限
+        :param max_pending: 等待佇列長度上限
+        :param pending_timeout: 在佇列中等候的最長時間（秒）
+        :param retry_after: 拒絕時建議用戶端重試前等待的秒數
+        """
+        self._active = 0
+        self._waiters: "deque[asyncio.Future]" = deque()
+        self._admitted = 0
+        self._queued = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self.configure(max_concurrent, max_pending, pending_timeout, retry_after)
+
+    def configure(
+        self,
+        max_concurrent: int,
+        max_pending: int,
+        pending_timeout: float,
+        retry_after: int,
+    ) -> None:
+        """
+        更新准入參數（可能在配置監看線程中呼叫，只替換數值，
+        提高上限後等待中的請求在下一次 release() 時依新的上限放行）
+
+        :param max_concurrent: 同時處理的請求數上限
+        :param max_pending: 等待佇列長度上限
+        :param pending_timeout: 在佇列中等候的最長時間（秒）
+        :param retry_after: 拒絕時建議用戶端重試前等待的秒數
+        """
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.max_pending = max(0, int(max_pending))
+        self.pending_timeout = max(0.0, float(pending_timeout))
+        self.retry_after = max(1, int(retry_after))
+
+    @property
+    def enabled(self) -> bool:
+        """
+        是否啟用准入控制
+        """
+        return config.snapshot.admission.enabled
+
+    def _wake_waiters(self) -> None:
+        """
+        依空出的處理名額放行等待中的請求
+        """
+        while self._waiters and self._active < self.max_concurrent:
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            # 名額直接轉交給等待者，等待者被喚醒前不會被其他請求搶走
+            self._active += 1
+            waiter.set_result(True)
+
+    async def acquire(self) -> bool:
+        """
+        取得處理名額，必要時在佇列中等候
+
+        :return: 是否取得名額，取得時處理完畢後必須呼叫 release()
+        """
+        if self._active < self.max_concurrent and not self._waiters:
+            self._active += 1
+            self._admitted += 1
+            return True
+        if len(self._waiters) >= self.max_pending:
+            self._rejected += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._queued += 1
+        try:
+            await asyncio.wait_for(waiter, self.pending_timeout)
+        except asyncio.TimeoutError:
+            # 逾時與名額轉交可能同時發生；名額已轉交過來則歸還（轉交給下一個等待者）
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            self._timed_out += 1
+            self._rejected += 1
+            return False
+        except asyncio.CancelledError:
+            # 用戶端已斷線；若名額已轉交過來則歸還
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            if not waiter.done():
+                waiter.cancel()
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                pass
+        self._admitted += 1
+        return True
+
+    def release(self) -> None:
+        """
+        歸還處理名額並放行下一個等待中的請求
+        """
+        self._active -= 1
+        self._wake_waiters()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        獲取准入控制統計資料
+
+        :return: 統計資料字典
+        """
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_pending": self.max_pending,
+            "active": self._active,
+            "pending": len(self._waiters),
+            "admitted": self._admitted,
+            "queued": self._queued,
+            "rejected": self._rejected,
+            "timed_out": self._timed_out,
+        }
+
+
+class AdmissionMiddleware:
+    """
+    依准入控制放行密碼修改請求的 ASGI 中介層
+
+    單筆修改與批次串流各有自己的名額：批次串流在整個上傳期間佔用名額，
+    不會耗盡單筆修改的名額。被拒絕的請求立即返回 503 與 Retry-After 標頭。
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        controller = None
+        if scope["type"] == "http":
+            controller = controllers.get(
+                GATED_ROUTES.get((scope["method"], scope["path"]))
+            )
+        if controller is None or not controller.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        if not await controller.acquire():
+            logger.warning(f"伺服器忙碌，拒絕請求 {scope['method']} {scope['path']}")
+            await self._reject(send, controller.retry_after)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            controller.release()
+
+    @staticmethod
+    async def _reject(send, retry_after: int) -> None:
+        """
+        返回 503 回應
+
+        :param send: ASGI send
+        :param retry_after: 建議重試前等待的秒數
+        """
+        body = json.dumps(
+            {"success": False, "message": "伺服器忙碌中，請稍後再試"},
+            ensure_ascii=False,
+        ).encode("utf-8")
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json; charset=utf-8"),
+                    (b"content-length", str(len(body)).encode("latin-1")),
+                    (b"retry-after", str(retry_after).encode("latin-1")),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+def apply_config(snapshot) -> None:
+    """
+    套用配置快照中的准入設定
+
+    :param snapshot: 配置快照
+    """
+    settings = snapshot.admission
+    controllers["change_password"].configure(
+        settings.max_concurrent,
+        settings.max_pending,
+        settings.pending_timeout_seconds,
+        settings.retry_after_seconds,
+    )
+    # 批次串流不排隊，名額用完時立即拒絕
+    controllers["batch"].configure(
+        settings.max_batch_streams, 0, 0, settings.retry_after_seconds
+    )
+
+
+# 創建全局准入控制實例：單筆修改與批次串流
+controllers = {
+    "change_password": AdmissionController(
+        max_concurrent=config.get("admission", "max_concurrent", 32),
+        max_pending=config.get("admission", "max_pending", 64),
+        pending_timeout=config.get("admission", "pending_timeout_seconds", 5),
+        retry_after=config.get("admission", "retry_after_seconds", 2),
+    ),
+    "batch": AdmissionController(
+        max_concurrent=config.get("admission", "max_batch_streams", 2),
+        max_pending=0,
+        pending_timeout=0,
+        retry_after=config.get("admission", "retry_after_seconds", 2),
+    ),
+}
+config.subscribe(apply_config)
+
+
+def get_admission_controller(name: str = "change_password") -> AdmissionController:
+    """
+    獲取准入控制實例
+
+    :param name: 名額類別：change_password 或 batch
+    :return: 准入控制
+    """
+    return controllers[name]
+
+
+def get_admission_stats() -> Dict[str, Any]:
+    """
+    獲取所有准入控制的統計資料
+
+    :return: 統計資料字典
+    """
+    return {
+        "enabled": config.snapshot.admission.enabled,
+        **{name: controller.get_stats() for name, controller in controllers.items()},
+    }
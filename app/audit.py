@@ -0,0 +1,126 @@
+import logging
+from typing import Any, Dict, Optional
+
+from app.logger import get_logger, LazyMessage
+from app.config_manager import get_config
+
+# 獲取日誌記錄器
+logger = get_logger()
+
+# 獲取配置管理器
+config = get_config()
+
+
+class AuditEvent(LazyMessage):
+    """
+    密碼修改流程中某個階段的審計事件
+
+    只保存欄位，文字與 JSON 格式都在寫入線程實際輸出時才產生。
+    """
+
+    __slots__ = ("event", "stage", "outcome", "user", "duration_ms", "extra")
+
+    audit = True
+
+    def __init__(
+        self,
+        event: str,
+        stage: str,
+        outcome: str,
+        user: Optional[str] = None,
+        duration_ms: Optional[float] = None,
+        extra: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        :param event: 事件類型，例如 password_change
+        :param stage: 流程階段，例如 verify、set_password、completed
+        :param outcome: 結果，例如 success、rejected、error
+        :param user: 使用者名稱（未啟用記錄用戶操作時為 None）
+        :param duration_ms: 階段耗時（毫秒）
+        :param extra: 其他欄位
+        """
+        self.event = event
+        self.stage = stage
+        self.outcome = outcome
+        self.user = user
+        self.duration_ms = duration_ms
+        self.extra = extra or {}
+
+    def fields(self) -> Dict[str, Any]:
+        data = {"event": self.event, "stage": self.stage, "outcome": self.outcome}
+        if self.user is not None:
+            data["user"] = self.user
+        if self.duration_ms is not None:
+            data["duration_ms"] = round(self.duration_ms, 1)
+        data.update(self.extra)
+        return data
+
+    def __str__(self) -> str:
+        parts = [f"{self.event}.{self.stage}: {self.outcome}"]
+        if self.user is not None:
+            parts.append(f"user='{self.user}'")
+        if self.duration_ms is not None:
+            parts.append(f"{self.duration_ms:.1f}ms")
+        parts.extend(f"{key}={value}" for key, value in self.extra.items())
+        return " ".join(parts)
+
+
+class AuditLog:
+    """審計事件記錄器，依日誌級別決定是否建立事件"""
+
+    def __init__(self, target: logging.Logger):
+        """
+        :param target: 輸出事件的日誌記錄器
+        """
+        self.target = target
+
+    def enabled_for(self, level: int) -> bool:
+        """
+        檢查指定級別的事件是否會被記錄
+
+        :param level: logging級別常數
+        :return: 是否會被記錄
+        """
+        return self.target.isEnabledFor(level)
+
+    def event(
+        self,
+        stage: str,
+        outcome: str,
+        user: Optional[str] = None,
+        duration_ms: Optional[float] = None,
+        level: int = logging.INFO,
+        event: str = "password_change",
+        **extra: Any,
+    ) -> None:
+        """
+        記錄審計事件；未啟用記錄用戶操作時不記錄使用者名稱
+
+        :param stage: 流程階段
+        :param outcome: 結果
+        :param user: 使用者名稱
+        :param duration_ms: 階段耗時（毫秒）
+        :param level: logging級別常數
+        :param event: 事件類型
+        :param extra: 其他欄位
+        """
+        if not self.target.isEnabledFor(level):
+            return
+        if user is not None and not config.snapshot.security.log_user_actions:
+            user = None
+        self.target.log(
+            level, AuditEvent(event, stage, outcome, user, duration_ms, extra)
+        )
+
+
+# 創建全局審計事件記錄器實例
+audit_log = AuditLog(logger)
+
+
+def get_audit_log() -> AuditLog:
+    """
+    獲取審計事件記錄器實例
+
+    :return: 審計事件記錄器
+    """
+    return audit_log
@@ -0,0 +1,270 @@
+import os
+import json
+import struct
+import zlib
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.log_rotation import list_log_files, parse_log_name
+
+# 每筆索引：事件時間、行在文件中的位元組位置、使用者/結果/階段的 CRC32
+ENTRY = struct.Struct("<dQIII")
+
+# 審計日誌的文件名稱前綴與副檔名
+AUDIT_PREFIX = "audit"
+AUDIT_EXTENSION = "jsonl"
+
+
+def _crc(value: Optional[str]) -> int:
+    """
+    計算欄位的 CRC32，使用者名稱不區分大小寫，缺少的欄位為 0
+
+    :param value: 欄位值
+    :return: CRC32
+    """
+    if not value:
+        return 0
+    return zlib.crc32(value.casefold().encode("utf-8"))
+
+
+class AuditIndex:
+    """
+    審計日誌的位元組位置索引
+
+    每個 audit_*.jsonl 文件在 index 目錄中有對應的 .idx 文件，內容是固定長度的
+    索引記錄。查詢時只讀取索引，符合條件的記錄再依位置讀取單行 JSON。
+    """
+
+    def __init__(self, log_folder: str, index_folder: Optional[str] = None):
+        """
+        :param log_folder: 審計日誌所在目錄
+        :param index_folder: 索引目錄，預設為 log_folder/.index
+        """
+        self.log_folder = log_folder
+        self.index_folder = index_folder or os.path.join(log_folder, ".index")
+        os.makedirs(self.index_folder, exist_ok=True)
+        # 寫入線程批次寫入索引，查詢只讀取完整的索引記錄
+        self._lock = threading.Lock()
+        self._pending: Dict[str, List[bytes]] = {}
+
+    def _index_path(self, log_path: str) -> str:
+        return os.path.join(self.index_folder, os.path.basename(log_path) + ".idx")
+
+    def add(self, log_path: str, created: float, offset: int, fields: Dict) -> None:
+        """
+        加入一筆索引記錄（寫入線程呼叫，flush 時寫入）
+
+        :param log_path: 審計日誌文件路徑
+        :param created: 事件時間 (epoch 秒)
+        :param offset: 此行在文件中的位元組位置
+        :param fields: 事件欄位
+        """
+        entry = ENTRY.pack(
+            created,
+            offset,
+            _crc(fields.get("user")),
+            _crc(fields.get("outcome")),
+            _crc(fields.get("stage")),
+        )
+        with self._lock:
+            self._pending.setdefault(log_path, []).append(entry)
+
+    def flush(self) -> None:
+        """
+        將待寫入的索引記錄寫入索引文件
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            for log_path, entries in pending.items():
+                with open(self._index_path(log_path), "ab") as f:
+                    f.write(b"".join(entries))
+
+    def rename(self, old_path: str, new_path: str) -> None:
+        """
+        日誌文件輪替改名時，索引文件跟著改名
+
+        :param old_path: 原日誌文件路徑
+        :param new_path: 新日誌文件路徑
+        """
+        with self._lock:
+            old_index = self._index_path(old_path)
+            if os.path.exists(old_index):
+                os.replace(old_index, self._index_path(new_path))
+
+    def _index_line(self, line: bytes, offset: int) -> Optional[bytes]:
+        """
+        從審計日誌的一行建立索引記錄
+
+        :param line: JSON 行
+        :param offset: 行的位元組位置
+        :return: 索引記錄，無法解析時返回 None
+        """
+        try:
+            data = json.loads(line)
+            created = datetime.fromisoformat(data["time"]).timestamp()
+        except (ValueError, KeyError, TypeError):
+            return None
+        return ENTRY.pack(
+            created,
+            offset,
+            _crc(data.get("user")),
+            _crc(data.get("outcome")),
+            _crc(data.get("stage")),
+        )
+
+    def rebuild_file(self, log_path: str) -> int:
+        """
+        補齊單一審計日誌文件的索引（從索引涵蓋的最後一行之後開始掃描）
+
+        :param log_path: 審計日誌文件路徑
+        :return: 新增的索引記錄數
+        """
+        index_path = self._index_path(log_path)
+        start = 0
+        with self._lock:
+            if os.path.exists(index_path):
+                size = os.path.getsize(index_path)
+                with open(index_path, "r+b") as f:
+                    # 去掉寫到一半的索引記錄
+                    whole = size - size % ENTRY.size
+                    if whole != size:
+                        f.truncate(whole)
+                    if whole:
+                        f.seek(whole - ENTRY.size)
+                        last_offset = ENTRY.unpack(f.read(ENTRY.size))[1]
+                        with open(log_path, "rb") as log_file:
+                            log_file.seek(last_offset)
+                            log_file.readline()
+                            start = log_file.tell()
+
+            entries = []
+            with open(log_path, "rb") as log_file:
+                log_file.seek(start)
+                offset = start
+                for line in log_file:
+                    if not line.endswith(b"\n"):
+                        # 寫到一半的行留待之後處理
+                        break
+                    entry = self._index_line(line, offset)
+                    if entry is not None:
+                        entries.append(entry)
+                    offset += len(line)
+            if entries:
+                with open(index_path, "ab") as f:
+                    f.write(b"".join(entries))
+            return len(entries)
+
+    def rebuild(self, skip: Optional[str] = None) -> int:
+        """
+        補齊所有審計日誌文件的索引，並刪除已沒有對應日誌文件的索引
+
+        :param skip: 略過的文件（寫入中的文件由處理器在開始寫入前補齊）
+        :return: 新增的索引記錄數
+        """
+        added = 0
+        live = set()
+        for log_path in list_log_files(self.log_folder, AUDIT_PREFIX, AUDIT_EXTENSION):
+            if not log_path.endswith(AUDIT_EXTENSION):
+                continue
+            live.add(os.path.basename(log_path) + ".idx")
+            if skip and os.path.abspath(log_path) == os.path.abspath(skip):
+                continue
+            try:
+                added += self.rebuild_file(log_path)
+            except OSError:
+                # 文件可能在掃描期間被維護線程刪除
+                continue
+        for name in os.listdir(self.index_folder):
+            if name.endswith(".idx") and name not in live:
+                os.remove(os.path.join(self.index_folder, name))
+        return added
+
+    def query(
+        self,
+        user: Optional[str] = None,
+        outcome: Optional[str] = None,
+        stage: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: int = 100,
+    ) -> List[Dict[str, Any]]:
+        """
+        查詢審計事件，由新到舊返回
+
+        :param user: 使用者名稱（不區分大小寫）
+        :param outcome: 結果
+        :param stage: 流程階段
+        :param since: 起始時間（含）
+        :param until: 結束時間（不含）
+        :param limit: 最多返回的事件數
+        :return: 事件列表
+        """
+        user_crc = _crc(user) if user else None
+        outcome_crc = _crc(outcome) if outcome else None
+        stage_crc = _crc(stage) if stage else None
+        since_ts = since.timestamp() if since else None
+        until_ts = until.timestamp() if until else None
+        # 文件名稱中的日期是本地時間
+        since_day = since.astimezone().date().isoformat() if since else None
+        until_day = until.astimezone().date().isoformat() if until else None
+
+        results = []
+        files = list_log_files(self.log_folder, AUDIT_PREFIX, AUDIT_EXTENSION)
+        for log_path in reversed(files):
+            day, _, compressed = parse_log_name(
+                AUDIT_PREFIX, AUDIT_EXTENSION, os.path.basename(log_path)
+            )
+            if compressed:
+                continue
+            # 以文件名稱中的日期略過範圍外的文件（文件由新到舊）
+            if since_day and day < since_day:
+                break
+            if until_day and day > until_day:
+                continue
+            try:
+                with open(self._index_path(log_path), "rb") as f:
+                    data = f.read()
+            except OSError:
+                continue
+            data = data[: len(data) - len(data) % ENTRY.size]
+
+            matches = []
+            for created, offset, u, o, s in ENTRY.iter_unpack(data):
+                if user_crc is not None and u != user_crc:
+                    continue
+                if outcome_crc is not None and o != outcome_crc:
+                    continue
+                if stage_crc is not None and s != stage_crc:
+                    continue
+                if since_ts is not None and created < since_ts:
+                    continue
+                if until_ts is not None and created >= until_ts:
+                    continue
+                matches.append((created, offset))
+            if not matches:
+                continue
+
+            matches.sort(reverse=True)
+            try:
+                log_file = open(log_path, "rb")
+            except OSError:
+                continue
+            with log_file:
+                for _, offset in matches:
+                    log_file.seek(offset)
+                    try:
+                        event = json.loads(log_file.readline())
+                    except ValueError:
+                        continue
+                    # CRC 可能碰撞，以實際欄位再確認一次
+                    if user and (event.get("user") or "").casefold() != user.casefold():
+                        continue
+                    if outcome and event.get("outcome") != outcome:
+                        continue
+                    if stage and event.get("stage") != stage:
+                        continue
+                    results.append(event)
+                    if len(results) >= limit:
+                        return results
+        return results
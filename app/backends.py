@@ -0,0 +1,448 @@
+import time
+import random
+import threading
+from typing import Any, Dict, Optional
+
+from app.logger import get_logger
+from app.config_manager import get_config
+
+# 獲取日誌記錄器
+logger = get_logger()
+
+# 獲取配置管理器
+config = get_config()
+
+
+class BackendError(Exception):
+    """憑證後端無法完成操作時拋出的異常"""
+
+
+class BackendTimeoutError(BackendError):
+    """憑證後端呼叫超過期限時拋出的異常"""
+
+
+class BackendRejectedError(BackendError):
+    """
+    後端明確拒絕操作時拋出的異常（例如新密碼不符合原則、使用者不存在）
+
+    後端已正常回應，不代表後端故障，不計入斷路器的失敗次數
+    """
+
+
+class CredentialBackend:
+    """憑證後端基類，定義密碼服務所需的操作"""
+
+    name = "base"
+    # 是否能在 call() 中自行強制執行期限
+    supports_deadline = False
+
+    # check_credentials 的驗證結果
+    VERIFIED = "verified"
+    WRONG_PASSWORD = "wrong_password"
+    UNKNOWN_USER = "unknown_user"
+    # 密碼過期、帳戶鎖定、停用或受限，狀態可能隨時改變
+    ACCOUNT_UNUSABLE = "account_unusable"
+
+    def call(self, method: str, *args, timeout: Optional[float] = None) -> Any:
+        """
+        以方法名稱呼叫後端
+
+        :param method: 後端方法名稱
+        :param args: 方法參數
+        :param timeout: 期限（秒），僅 supports_deadline 為 True 的後端會強制執行
+        :return: 後端方法的返回值
+        """
+        return getattr(self, method)(*args)
+
+    def check_credentials(self, username: str, password: str) -> str:
+        """
+        驗證使用者憑證並返回驗證結果
+
+        :param username: 使用者名稱
+        :param password: 密碼
+        :return: VERIFIED、WRONG_PASSWORD、UNKNOWN_USER 或 ACCOUNT_UNUSABLE
+        :raises BackendError: 後端無法完成驗證
+        """
+        raise NotImplementedError
+
+    def verify_credentials(self, username: str, password: str) -> bool:
+        """
+        驗證使用者憑證
+
+        :param username: 使用者名稱
+        :param password: 密碼
+        :return: 憑證是否正確（使用者不存在時返回 False）
+        :raises BackendError: 後端無法完成驗證
+        """
+        return self.check_credentials(username, password) == self.VERIFIED
+
+    def set_password(self, username: str, new_password: str) -> None:
+        """
+        設置使用者密碼
+
+        :param username: 使用者名稱
+        :param new_password: 新密碼
+        :raises BackendError: 後端無法完成設置
+        """
+        raise NotImplementedError
+
+    def lookup_user(self, username: str) -> Optional[Dict[str, Any]]:
+        """
+        查詢使用者資訊
+
+        :param username: 使用者名稱
+        :return: 使用者資訊字典，使用者不存在時返回 None
+        :raises BackendError: 後端無法完成查詢
+        """
+        raise NotImplementedError
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        獲取後端統計資料
+
+        :return: 統計資料字典
+        """
+        return {"name": self.name}
+
+    def apply_config(self, snapshot) -> None:
+        """
+        套用配置快照中可即時生效的後端設定，預設不做任何事
+
+        :param snapshot: 配置快照
+        """
+
+    def shutdown(self) -> None:
+        """
+        釋放後端資源
+        """
+
+
+class Win32Backend(CredentialBackend):
+    """使用 pywin32 操作本機 Windows 帳戶的憑證後端"""
+
+    name = "win32"
+
+    # LogonUser 因憑證本身被拒絕時的錯誤碼與驗證結果（其餘錯誤視為後端故障）
+    CREDENTIAL_REJECTED_ERRORS = {
+        # ERROR_LOGON_FAILURE：密碼錯誤，使用者不存在時也返回此錯誤碼
+        1326: CredentialBackend.WRONG_PASSWORD,
+        1327: CredentialBackend.ACCOUNT_UNUSABLE,  # ERROR_ACCOUNT_RESTRICTION
+        1330: CredentialBackend.ACCOUNT_UNUSABLE,  # ERROR_PASSWORD_EXPIRED
+        1331: CredentialBackend.ACCOUNT_UNUSABLE,  # ERROR_ACCOUNT_DISABLED
+        1909: CredentialBackend.ACCOUNT_UNUSABLE,  # ERROR_ACCOUNT_LOCKED_OUT
+    }
+    # NERR_UserNotFound
+    USER_NOT_FOUND_ERROR = 2221
+    # NetUserSetInfo 明確拒絕新密碼或帳戶時的錯誤碼（其餘錯誤視為後端故障）
+    SET_PASSWORD_REJECTED_ERRORS = {
+        5,  # ERROR_ACCESS_DENIED
+        86,  # ERROR_INVALID_PASSWORD
+        1325,  # ERROR_PASSWORD_RESTRICTION
+        2221,  # NERR_UserNotFound
+        2245,  # NERR_PasswordTooShort
+    }
+
+    def __init__(self):
+        """
+        初始化 Windows 憑證後端，在此才載入 pywin32 模組
+        """
+        import win32net
+        import win32api
+        import win32netcon
+        import win32security
+
+        self.win32net = win32net
+        self.win32netcon = win32netcon
+        self.win32security = win32security
+        self.domain = win32api.GetComputerName()
+        logger.debug(f"使用電腦名稱作為域: {self.domain}")
+
+    def check_credentials(self, username: str, password: str) -> str:
+        try:
+            hUser = self.win32security.LogonUser(
+                username,
+                self.domain,
+                password,
+                self.win32security.LOGON32_LOGON_NETWORK,
+                self.win32security.LOGON32_PROVIDER_DEFAULT,
+            )
+            hUser.Close()
+            return self.VERIFIED
+        except Exception as e:
+            outcome = self.CREDENTIAL_REJECTED_ERRORS.get(getattr(e, "winerror", None))
+            if outcome is not None:
+                logger.debug(f"LogonUser 拒絕憑證: {e}")
+                return outcome
+            raise BackendError(f"LogonUser 呼叫失敗: {e}") from e
+
+    def set_password(self, username: str, new_password: str) -> None:
+        user_info = {
+            "name": username,
+            "password": new_password,
+            "flags": self.win32netcon.UF_SCRIPT | self.win32netcon.UF_NORMAL_ACCOUNT,
+        }
+        try:
+            self.win32net.NetUserSetInfo(None, username, 1003, user_info)
+        except Exception as e:
+            if getattr(e, "winerror", None) in self.SET_PASSWORD_REJECTED_ERRORS:
+                raise BackendRejectedError(str(e)) from e
+            raise BackendError(str(e)) from e
+
+    def lookup_user(self, username: str) -> Optional[Dict[str, Any]]:
+        try:
+            info = self.win32net.NetUserGetInfo(None, username, 0)
+            return {"name": info["name"]}
+        except Exception as e:
+            if getattr(e, "winerror", None) == self.USER_NOT_FOUND_ERROR:
+                return None
+            raise BackendError(f"NetUserGetInfo 呼叫失敗: {e}") from e
+
+
+class MemoryBackend(CredentialBackend):
+    """記憶體憑證後端，用於在非 Windows 環境下測試與壓力測試"""
+
+    name = "memory"
+
+    def __init__(
+        self,
+        users: Optional[Dict[str, str]] = None,
+        latency_ms: float = 0,
+        latency_jitter_ms: float = 0,
+        error_rate: float = 0.0,
+    ):
+        """
+        初始化記憶體憑證後端
+
+        :param users: 使用者名稱與密碼的對應表
+        :param latency_ms: 每次呼叫的模擬延遲（毫秒）
+        :param latency_jitter_ms: 模擬延遲的隨機抖動範圍（毫秒）
+        :param error_rate: 模擬後端錯誤的機率（0 到 1）
+        """
+        self._users = dict(users or {})
+        self._lock = threading.Lock()
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.error_rate = error_rate
+        logger.info(
+            f"記憶體憑證後端初始化, 使用者數: {len(self._users)}, "
+            f"延遲: {latency_ms}ms, 錯誤率: {error_rate}"
+        )
+
+    def _simulate(self, operation: str) -> None:
+        """
+        模擬後端延遲與錯誤
+
+        :param operation: 操作名稱
+        """
+        delay = self.latency_ms
+        if self.latency_jitter_ms:
+            delay += random.uniform(0, self.latency_jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+        if self.error_rate and random.random() < self.error_rate:
+            raise BackendError(f"模擬的後端錯誤: {operation}")
+
+    def add_user(self, username: str, password: str) -> None:
+        """
+        新增或覆寫使用者
+
+        :param username: 使用者名稱
+        :param password: 密碼
+        """
+        with self._lock:
+            self._users[username] = password
+
+    def check_credentials(self, username: str, password: str) -> str:
+        self._simulate("check_credentials")
+        with self._lock:
+            if username not in self._users:
+                return self.UNKNOWN_USER
+            if self._users[username] != password:
+                return self.WRONG_PASSWORD
+        return self.VERIFIED
+
+    def set_password(self, username: str, new_password: str) -> None:
+        self._simulate("set_password")
+        with self._lock:
+            if username not in self._users:
+                raise BackendRejectedError(f"使用者 {username} 不存在")
+            self._users[username] = new_password
+
+    def lookup_user(self, username: str) -> Optional[Dict[str, Any]]:
+        self._simulate("lookup_user")
+        with self._lock:
+            if username not in self._users:
+                return None
+        return {"name": username}
+
+
+class ProcessIsolatedBackend(CredentialBackend):
+    """進程隔離的憑證後端，將呼叫轉送到預先啟動的工作進程中執行"""
+
+    name = "process"
+    supports_deadline = True
+
+    def __init__(self, settings: Dict[str, Any]):
+        """
+        初始化進程隔離後端並啟動工作進程
+
+        :param settings: backend 配置區段
+        """
+        from app.process_pool import ProcessBackendPool
+
+        # 工作進程內直接使用真正的後端
+        inner_settings = dict(settings, isolation="none")
+        self.inner_name = str(settings.get("type", "win32")).lower()
+        self.pool = ProcessBackendPool(
+            inner_settings,
+            workers=settings.get("process_workers", 2),
+            max_calls_per_worker=settings.get("process_max_calls", 1000),
+            call_timeout=settings.get("process_call_timeout_seconds", 30),
+        )
+
+    def call(self, method: str, *args, timeout: Optional[float] = None) -> Any:
+        return self.pool.call(method, *args, timeout=timeout)
+
+    def check_credentials(self, username: str, password: str) -> str:
+        return self.pool.call("check_credentials", username, password)
+
+    def set_password(self, username: str, new_password: str) -> None:
+        self.pool.call("set_password", username, new_password)
+
+    def lookup_user(self, username: str) -> Optional[Dict[str, Any]]:
+        return self.pool.call("lookup_user", username)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"name": self.name, "inner": self.inner_name, **self.pool.get_stats()}
+
+    def apply_config(self, snapshot) -> None:
+        settings = snapshot.backend
+        self.pool.resize(
+            settings.process_workers,
+            settings.process_max_calls,
+            settings.process_call_timeout_seconds,
+        )
+
+    def shutdown(self) -> None:
+        self.pool.shutdown()
+
+
+def create_backend(settings: Dict[str, Any]) -> CredentialBackend:
+    """
+    根據配置創建憑證後端
+
+    :param settings: backend 配置區段
+    :return: 憑證後端實例
+    """
+    if str(settings.get("isolation", "none")).lower() == "process":
+        return ProcessIsolatedBackend(settings)
+
+    backend_type = str(settings.get("type", "win32")).lower()
+    if backend_type == "memory":
+        return MemoryBackend(
+            users=settings.get("memory_users", {}),
+            latency_ms=settings.get("memory_latency_ms", 0),
+            latency_jitter_ms=settings.get("memory_latency_jitter_ms", 0),
+            error_rate=settings.get("memory_error_rate", 0.0),
+        )
+    if backend_type == "win32":
+        return Win32Backend()
+    raise ValueError(f"未知的憑證後端類型: {backend_type}")
+
+
+# 需要重啟才會生效的 backend 配置項；期限、斷路器門檻與進程池大小會即時套用
+RESTART_ONLY_KEYS = (
+    "type",
+    "isolation",
+    "memory_users",
+    "memory_latency_ms",
+    "memory_latency_jitter_ms",
+    "memory_error_rate",
+)
+
+# 全局憑證後端實例（首次使用時才創建，避免在非 Windows 環境載入 pywin32）
+_backend: Optional[CredentialBackend] = None
+_backend_lock = threading.Lock()
+# 最近一次套用或警告過的需要重啟的配置值，同一變更只警告一次
+_restart_settings: Dict[str, Any] = {}
+
+
+def get_backend() -> CredentialBackend:
+    """
+    獲取憑證後端實例
+
+    :return: 憑證後端
+    """
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                from app.resilience import CircuitBreaker, ResilientBackend
+
+                settings = config.get_all().get("backend", {})
+                _restart_settings.update(
+                    {key: settings.get(key) for key in RESTART_ONLY_KEYS}
+                )
+                _backend = ResilientBackend(
+                    create_backend(settings),
+                    verify_timeout=config.get(
+                        "resilience", "verify_timeout_seconds", 15
+                    ),
+                    set_timeout=config.get("resilience", "set_timeout_seconds", 15),
+                    breaker=CircuitBreaker(
+                        failure_threshold=config.get(
+                            "resilience", "breaker_failure_threshold", 5
+                        ),
+                        reset_timeout=config.get(
+                            "resilience", "breaker_reset_seconds", 30
+                        ),
+                    ),
+                    max_concurrent_calls=config.get(
+                        "resilience", "max_concurrent_calls", 8
+                    ),
+                )
+                logger.info(f"使用憑證後端: {_backend.name}")
+    return _backend
+
+
+def apply_config(snapshot) -> None:
+    """
+    將配置快照套用到已創建的憑證後端，需要重啟的配置項變更時記錄警告
+
+    :param snapshot: 配置快照
+    """
+    backend = _backend
+    if backend is None:
+        return
+    changed = [
+        key
+        for key in RESTART_ONLY_KEYS
+        if snapshot.backend.get(key) != _restart_settings.get(key)
+    ]
+    if changed:
+        logger.warning(f"憑證後端設定 {', '.join(changed)} 已變更，需要重啟才會生效")
+        _restart_settings.update({key: snapshot.backend.get(key) for key in changed})
+    backend.apply_config(snapshot)
+
+
+config.subscribe(apply_config)
+
+
+def get_backend_stats() -> Optional[Dict[str, Any]]:
+    """
+    獲取憑證後端統計資料（後端尚未創建時返回 None）
+
+    :return: 統計資料字典
+    """
+    backend = _backend
+    return backend.get_stats() if backend is not None else None
+
+
+def shutdown_backend() -> None:
+    """
+    關閉憑證後端並釋放資源
+    """
+    backend = _backend
+    if backend is not None:
+        logger.info("關閉憑證後端")
+        backend.shutdown()
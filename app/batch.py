@@ -0,0 +1,235 @@
+import csv
+import json
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from pydantic import ValidationError
+
+from app.models import PasswordChange
+
+# 批次資料的欄位
+BATCH_FIELDS = ("username", "current_password", "new_password", "confirm_password")
+
+
+class BatchFormatError(Exception):
+    """批次資料格式錯誤時拋出的異常"""
+
+
+def detect_batch_format(content_type: str) -> Optional[str]:
+    """
+    根據 Content-Type 判斷批次資料格式
+
+    :param content_type: 請求的 Content-Type
+    :return: "csv"、"ndjson" 或 None（不支援的格式）
+    """
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    if media_type in ("text/csv", "application/csv"):
+        return "csv"
+    if media_type in (
+        "application/x-ndjson",
+        "application/ndjson",
+        "application/jsonl",
+        "application/json-lines",
+    ):
+        return "ndjson"
+    return None
+
+
+async def iter_lines(
+    chunks: AsyncIterator[bytes], max_line_bytes: int = 65536
+) -> AsyncIterator[bytes]:
+    """
+    將位元組串流切分為行，只保留尚未完整的最後一行
+
+    :param chunks: 位元組區塊的非同步迭代器
+    :param max_line_bytes: 單行的最大長度
+    :return: 行（不含換行符）的非同步迭代器
+    :raises BatchFormatError: 單行超過最大長度
+    """
+    buffer = b""
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        buffer += chunk
+        lines = buffer.split(b"\n")
+        buffer = lines.pop()
+        if len(buffer) > max_line_bytes:
+            raise BatchFormatError(f"單行資料超過 {max_line_bytes} 位元組")
+        for line in lines:
+            yield line.rstrip(b"\r")
+    if buffer:
+        yield buffer.rstrip(b"\r")
+
+
+class RowParser:
+    """批次資料行解析器，支援帶標題列的 CSV 與 NDJSON"""
+
+    def __init__(self, batch_format: str):
+        """
+        初始化解析器
+
+        :param batch_format: "csv" 或 "ndjson"
+        """
+        self.batch_format = batch_format
+        self.header: Optional[List[str]] = None
+
+    def parse(self, text: str) -> Optional[Dict[str, Any]]:
+        """
+        解析一行資料
+
+        :param text: 一行文字
+        :return: 欄位字典；CSV 標題列返回 None
+        :raises BatchFormatError: 資料格式錯誤
+        """
+        if self.batch_format == "ndjson":
+            try:
+                row = json.loads(text)
+            except ValueError as e:
+                raise BatchFormatError(f"JSON 格式錯誤: {e}")
+            if not isinstance(row, dict):
+                raise BatchFormatError("每一行必須是 JSON 物件")
+            return row
+
+        values = next(csv.reader([text]))
+        if self.header is None:
+            header = [value.strip().lstrip("\ufeff") for value in values]
+            # 無效的標題列不保留，呼叫端依 header 仍為 None 判斷無法繼續解析
+            if "username" not in header:
+                raise BatchFormatError(
+                    f"CSV 標題列必須包含欄位: {', '.join(BATCH_FIELDS[:3])}"
+                )
+            self.header = header
+            return None
+        if len(values) != len(self.header):
+            raise BatchFormatError(
+                f"欄位數量 {len(values)} 與標題列 {len(self.header)} 不符"
+            )
+        return dict(zip(self.header, values))
+
+
+def build_password_change(row: Dict[str, Any]) -> PasswordChange:
+    """
+    由批次資料行建立密碼修改模型，未提供確認密碼時使用新密碼
+
+    :param row: 欄位字典
+    :return: 密碼修改模型
+    :raises ValidationError: 欄位驗證失敗
+    """
+    data = {field: row.get(field) for field in BATCH_FIELDS}
+    if data["confirm_password"] in (None, ""):
+        data["confirm_password"] = data["new_password"]
+    return PasswordChange(**data)
+
+
+def _error_result(
+    line_no: int, message: str, username: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    建立失敗的資料行結果
+
+    :param line_no: 行號
+    :param message: 錯誤訊息
+    :param username: 使用者名稱
+    :return: 結果字典
+    """
+    return {"line": line_no, "username": username, "success": False, "message": message}
+
+
+async def run_batch(
+    lines: AsyncIterator[bytes],
+    batch_format: str,
+    handler: Callable[[PasswordChange], Awaitable[Dict[str, Any]]],
+    parallelism: int = 8,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    逐行讀取批次資料並以有限的並行度處理，依完成順序產生結果
+
+    同時處理中的資料行不超過 parallelism，輸入只在有空位時才繼續讀取，
+    因此記憶體用量與輸入大小無關。
+
+    :param lines: 資料行的非同步迭代器
+    :param batch_format: "csv" 或 "ndjson"
+    :param handler: 處理單筆密碼修改的協程函數，返回含 success 與 message 的字典
+    :param parallelism: 最大並行度
+    :return: 每行結果與最後摘要的非同步迭代器
+    """
+    parser = RowParser(batch_format)
+    parallelism = max(1, int(parallelism))
+    pending = set()
+    total = succeeded = 0
+
+    async def process(line_no: int, row: Dict[str, Any]) -> Dict[str, Any]:
+        username = row.get("username")
+        try:
+            password_data = build_password_change(row)
+        except ValidationError as e:
+            errors = e.errors()
+            message = errors[0]["msg"] if errors else "輸入數據驗證失敗"
+            return _error_result(line_no, message, username)
+        try:
+            result = await handler(password_data)
+        except Exception as e:
+            result = {"success": False, "message": f"發生錯誤: {str(e)}"}
+        return {
+            "line": line_no,
+            "username": password_data.username,
+            "success": result["success"],
+            "message": result["message"],
+        }
+
+    def collect(done) -> List[Dict[str, Any]]:
+        nonlocal succeeded
+        results = [task.result() for task in done]
+        succeeded += sum(1 for result in results if result["success"])
+        return results
+
+    async def wait_any() -> List[Dict[str, Any]]:
+        nonlocal pending
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        return collect(done)
+
+    line_no = 0
+    try:
+        try:
+            async for raw_line in lines:
+                line_no += 1
+                text = raw_line.decode("utf-8", errors="replace")
+                if not text.strip():
+                    continue
+                try:
+                    row = parser.parse(text)
+                except BatchFormatError as e:
+                    total += 1
+                    yield _error_result(line_no, str(e))
+                    # CSV 標題列無效時無法解析後續資料
+                    if parser.batch_format == "csv" and parser.header is None:
+                        break
+                    continue
+                if row is None:
+                    continue
+
+                total += 1
+                pending.add(asyncio.create_task(process(line_no, row)))
+                # 達到並行上限時，等待任一資料行完成才繼續讀取輸入
+                while len(pending) >= parallelism:
+                    for result in await wait_any():
+                        yield result
+        except BatchFormatError as e:
+            # 輸入串流本身無法繼續解析，停止讀取但完成已開始的資料行
+            total += 1
+            yield _error_result(line_no + 1, str(e))
+
+        while pending:
+            for result in await wait_any():
+                yield result
+    finally:
+        for task in pending:
+            task.cancel()
+
+    yield {
+        "summary": {
+            "total": total,
+            "succeeded": succeeded,
+            "failed": total - succeeded,
+        }
+    }
@@ -0,0 +1,232 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from app.logger import get_logger
+from app.shared_state import SharedStateBusyError
+
+# 獲取日誌記錄器
+logger = get_logger()
+
+
+class TTLCache:
+    """執行緒安全的 LRU 快取，每個項目在存活時間後失效"""
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 3600):
+        """
+        初始化快取
+
+        :param max_entries: 最大項目數，超過時淘汰最久未使用的項目
+        :param ttl_seconds: 項目存活時間（秒）
+        """
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = float(ttl_seconds)
+        self._items: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        獲取快取項目
+
+        :param key: 鍵
+        :param default: 項目不存在或已失效時的返回值
+        :return: 快取值
+        """
+        now = time.monotonic()
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self._misses += 1
+                return default
+            expires_at, value = item
+            if expires_at <= now:
+                del self._items[key]
+                self._expirations += 1
+                self._misses += 1
+                return default
+            self._items.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(
+        self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None
+    ) -> None:
+        """
+        設置快取項目
+
+        :param key: 鍵
+        :param value: 值
+        :param ttl_seconds: 本項目的存活時間，預設使用 ttl_seconds
+        """
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        expires_at = time.monotonic() + ttl
+        with self._lock:
+            self._items[key] = (expires_at, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+                self._evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        """
+        刪除快取項目
+
+        :param key: 鍵
+        """
+        with self._lock:
+            self._items.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        清空快取
+        """
+        with self._lock:
+            self._items.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        獲取快取統計資料
+
+        :return: 統計資料字典
+        """
+        with self._lock:
+            return {
+                "entries": len(self._items),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+            }
+
+
+class SharedTTLCache:
+    """
+    保存在共用狀態儲存中的快取，多個伺服器工作進程共用同一份內容
+
+    介面與 TTLCache 相同，值必須可以 JSON 編碼（tuple 取回時為 list）。
+    讀取不寫入共用狀態儲存：命中與未命中次數先在進程內累計，每累計 COUNTER_FLUSH_INTERVAL
+    次或查詢統計時才批次寫入。共用狀態儲存忙碌時讀取視為未命中、寫入略過。
+    """
+
+    # 進程內累計多少次命中與未命中後寫入共用狀態儲存
+    COUNTER_FLUSH_INTERVAL = 256
+
+    def __init__(
+        self, store, namespace: str, max_entries: int = 10000, ttl_seconds: float = 3600
+    ):
+        """
+        初始化快取
+
+        :param store: 共用狀態儲存
+        :param namespace: 快取名稱，不同快取的項目與統計分開保存
+        :param max_entries: 最大項目數，超過時淘汰最早失效的項目
+        :param ttl_seconds: 項目存活時間（秒）
+        """
+        self.store = store
+        self.namespace = namespace
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = float(ttl_seconds)
+        self._lock = threading.Lock()
+        self._pending = {"hits": 0, "misses": 0}
+
+    def _count(self, name: str) -> None:
+        """
+        在進程內累計統計，達到間隔時寫入共用狀態儲存
+
+        :param name: 計數名稱
+        """
+        with self._lock:
+            self._pending[name] += 1
+            flush = sum(self._pending.values()) >= self.COUNTER_FLUSH_INTERVAL
+        if flush:
+            self._flush_counters()
+
+    def _flush_counters(self) -> None:
+        """
+        將進程內累計的統計寫入共用狀態儲存，忙碌時保留到下一次
+        """
+        with self._lock:
+            pending = {k: v for k, v in self._pending.items() if v}
+            self._pending = dict.fromkeys(self._pending, 0)
+        if not pending:
+            return
+        try:
+            self.store.add_counters(
+                {f"cache.{self.namespace}.{k}": v for k, v in pending.items()}
+            )
+        except SharedStateBusyError:
+            with self._lock:
+                for name, value in pending.items():
+                    self._pending[name] += value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        獲取快取項目
+
+        :param key: 鍵
+        :param default: 項目不存在或已失效時的返回值
+        :return: 快取值
+        """
+        value = self.store.cache_get(self.namespace, key)
+        self._count("misses" if value is None else "hits")
+        return default if value is None else value
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """
+        設置快取項目
+
+        :param key: 鍵
+        :param value: 值
+        :param ttl_seconds: 本項目的存活時間，預設使用 ttl_seconds
+        """
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        try:
+            self.store.cache_set(self.namespace, key, value, ttl, self.max_entries)
+        except SharedStateBusyError as e:
+            logger.warning(f"略過快取 {self.namespace} 的寫入: {e}")
+
+    def delete(self, key: str) -> None:
+        """
+        刪除快取項目
+
+        :param key: 鍵
+        """
+        try:
+            self.store.cache_delete(self.namespace, key)
+        except SharedStateBusyError as e:
+            logger.warning(f"略過快取 {self.namespace} 的刪除: {e}")
+
+    def clear(self) -> None:
+        """
+        清空快取
+        """
+        try:
+            self.store.cache_clear(self.namespace)
+        except SharedStateBusyError as e:
+            logger.warning(f"略過快取 {self.namespace} 的清空: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        獲取快取統計資料（所有工作進程合計，其他工作進程尚未寫入的累計不含在內）
+
+        :return: 統計資料字典
+        """
+        self._flush_counters()
+        counters = self.store.get_counters(f"cache.{self.namespace}.")
+        return {
+            "entries": self.store.cache_size(self.namespace),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": counters.get("hits", 0),
+            "misses": counters.get("misses", 0),
+            "evictions": counters.get("evictions", 0),
+            "expirations": counters.get("expirations", 0),
+            "shared": True,
+        }
@@ -0,0 +1,274 @@
+import os
+import csv
+import sys
+import json
+import time
+import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from pydantic import ValidationError
+
+from app.logger import get_logger, set_console_level
+from app.config_manager import get_config
+from app.batch import build_password_change
+from app.services import PasswordService
+
+# 獲取日誌記錄器
+logger = get_logger()
+
+# 獲取配置管理器
+config = get_config()
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """
+    解析命令列參數
+
+    :param argv: 參數列表，預設使用 sys.argv
+    :return: 參數
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m app.cli", description="批次修改 Windows 使用者密碼"
+    )
+    parser.add_argument("input", help="帳戶 CSV 檔案路徑")
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="結果檔案路徑，副檔名為 .csv 時輸出 CSV，否則輸出 JSON Lines"
+        "（預設為 <輸入檔名>.results.jsonl）",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=config.get("batch", "parallelism", 8),
+        help="並行工作執行緒數（預設使用 batch.parallelism 配置）",
+    )
+    parser.add_argument("--no-progress", action="store_true", help="不顯示進度")
+    parser.add_argument(
+        "-v", "--verbose", action="store_true", help="在主控台顯示完整日誌"
+    )
+    return parser.parse_args(argv)
+
+
+def read_rows(path: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    逐行讀取帳戶 CSV
+
+    :param path: CSV 檔案路徑
+    :return: (行號, 欄位字典) 的迭代器
+    """
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.DictReader(f)
+        if not reader.fieldnames or "username" not in reader.fieldnames:
+            raise ValueError(
+                "CSV 標題列必須包含欄位: username, current_password, new_password"
+            )
+        for row in reader:
+            yield reader.line_num, row
+
+
+def count_rows(path: str) -> int:
+    """
+    計算 CSV 的資料行數（用於顯示進度）
+
+    :param path: CSV 檔案路徑
+    :return: 資料行數
+    """
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        return max(0, sum(1 for _ in csv.reader(f)) - 1)
+
+
+def process_row(line_no: int, row: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    修改單一帳戶的密碼
+
+    :param line_no: 行號
+    :param row: 欄位字典
+    :return: 結果字典
+    """
+    try:
+        password_data = build_password_change(row)
+    except ValidationError as e:
+        errors = e.errors()
+        message = errors[0]["msg"] if errors else "輸入數據驗證失敗"
+        return {
+            "line": line_no,
+            "username": row.get("username"),
+            "success": False,
+            "message": message,
+        }
+
+    result = PasswordService.change_password(
+        username=password_data.username,
+        current_password=password_data.current_password,
+        new_password=password_data.new_password,
+    )
+    return {
+        "line": line_no,
+        "username": password_data.username,
+        "success": result["success"],
+        "message": result["message"],
+    }
+
+
+class ResultWriter:
+    """結果檔案寫入器，支援 JSON Lines 與 CSV"""
+
+    FIELDS = ("line", "username", "success", "message")
+
+    def __init__(self, path: str):
+        """
+        開啟結果檔案
+
+        :param path: 結果檔案路徑
+        """
+        self.is_csv = path.lower().endswith(".csv")
+        self.file = open(path, "w", encoding="utf-8", newline="")
+        if self.is_csv:
+            self.writer = csv.DictWriter(self.file, fieldnames=self.FIELDS)
+            self.writer.writeheader()
+
+    def write(self, result: Dict[str, Any]) -> None:
+        """
+        寫入一筆結果
+
+        :param result: 結果字典
+        """
+        if self.is_csv:
+            self.writer.writerow(result)
+        else:
+            self.file.write(json.dumps(result, ensure_ascii=False) + "\n")
+        self.file.flush()
+
+    def close(self) -> None:
+        """
+        關閉結果檔案
+        """
+        self.file.close()
+
+
+class Progress:
+    """在標準錯誤輸出顯示進度"""
+
+    def __init__(self, total: int, enabled: bool = True):
+        """
+        初始化進度顯示
+
+        :param total: 總筆數
+        :param enabled: 是否顯示
+        """
+        self.total = total
+        self.enabled = enabled
+        self.done = 0
+        self.succeeded = 0
+        self.started_at = time.perf_counter()
+
+    def update(self, success: bool) -> None:
+        """
+        更新進度
+
+        :param success: 本筆是否成功
+        """
+        self.done += 1
+        if success:
+            self.succeeded += 1
+        if self.enabled:
+            elapsed = time.perf_counter() - self.started_at
+            rate = self.done / elapsed if elapsed > 0 else 0.0
+            sys.stderr.write(
+                f"\r已完成 {self.done}/{self.total} "
+                f"(成功 {self.succeeded}, 失敗 {self.done - self.succeeded}, "
+                f"{rate:.1f} 筆/秒)"
+            )
+            sys.stderr.flush()
+
+    def finish(self) -> None:
+        """
+        結束進度顯示
+        """
+        if self.enabled:
+            sys.stderr.write("\n")
+            sys.stderr.flush()
+
+
+def run(
+    input_path: str, output_path: str, workers: int, show_progress: bool = True
+) -> Tuple[int, int]:
+    """
+    執行批次密碼修改
+
+    :param input_path: 帳戶 CSV 檔案路徑
+    :param output_path: 結果檔案路徑
+    :param workers: 並行工作執行緒數
+    :param show_progress: 是否顯示進度
+    :return: (總筆數, 成功筆數)
+    """
+    workers = max(1, workers)
+    progress = Progress(count_rows(input_path), enabled=show_progress)
+    writer = ResultWriter(output_path)
+    write_lock = threading.Lock()
+    logger.info(f"開始批次修改密碼, 輸入: {input_path}, 並行數: {workers}")
+
+    def on_done(future) -> None:
+        result = future.result()
+        with write_lock:
+            writer.write(result)
+            progress.update(result["success"])
+
+    try:
+        with ThreadPoolExecutor(workers, thread_name_prefix="cli") as pool:
+            pending = set()
+            for line_no, row in read_rows(input_path):
+                future = pool.submit(process_row, line_no, row)
+                future.add_done_callback(on_done)
+                pending.add(future)
+                # 限制排隊中的資料行數量，讓記憶體用量與檔案大小無關
+                if len(pending) >= workers * 2:
+                    _, pending = wait(pending, return_when=FIRST_COMPLETED)
+    finally:
+        progress.finish()
+        writer.close()
+
+    logger.info(
+        f"批次修改密碼完成, 共 {progress.done} 筆, 成功 {progress.succeeded} 筆"
+    )
+    return progress.done, progress.succeeded
+
+
+def main(argv=None) -> int:
+    """
+    命令列入口
+
+    :param argv: 參數列表
+    :return: 結束代碼（0 全部成功、1 有失敗、2 輸入錯誤）
+    """
+    args = parse_args(argv)
+    if not args.verbose:
+        set_console_level(logging.WARNING)
+
+    output_path: Optional[str] = args.output
+    if not output_path:
+        output_path = os.path.splitext(args.input)[0] + ".results.jsonl"
+
+    try:
+        total, succeeded = run(
+            args.input, output_path, args.workers, not args.no_progress
+        )
+    except (OSError, ValueError) as e:
+        logger.error(f"無法讀取帳戶檔案: {e}")
+        sys.stderr.write(f"錯誤: {e}\n")
+        return 2
+
+    sys.stderr.write(
+        f"共 {total} 筆，成功 {succeeded} 筆，失敗 {total - succeeded} 筆，"
+        f"結果已寫入 {output_path}\n"
+    )
+    return 0 if succeeded == total else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
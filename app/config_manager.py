@@ -1,13 +1,197 @@
 import os
 import sys
+import copy
 import json
-from typing import Any, Dict
-from app.logger import get_logger
+import hashlib
+import threading
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Optional
+from app.logger import get_logger, set_log_level, configure_logging
+from app.config_persister import ConfigPersister
 
 # 獲取日誌記錄器
 logger = get_logger()
 
 
+class ConfigConflictError(Exception):
+    """If-Match 指定的 ETag 與目前配置不符時拋出的異常"""
+
+
+class ConfigValidationError(ValueError):
+    """配置值不符合格式時拋出的異常"""
+
+    def __init__(self, errors: List[str]):
+        """
+        :param errors: 錯誤訊息列表
+        """
+        super().__init__("; ".join(errors))
+        self.errors = errors
+
+
+def _freeze(value: Any) -> Any:
+    """
+    將配置值轉換為不可變的形式
+
+    :param value: 配置值
+    :return: 不可變的配置值
+    """
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+class ConfigSection:
+    """不可變的配置區段，已知配置項以屬性讀取"""
+
+    __slots__ = ("_values",)
+
+    def __init__(self, values: Dict[str, Any]):
+        """
+        :param values: 區段的配置字典
+        """
+        object.__setattr__(self, "_values", _freeze(values))
+        for key in self.__slots__:
+            if key in values:
+                object.__setattr__(self, key, self._values[key])
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("配置快照不可修改，請使用 ConfigManager.set")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("配置快照不可修改，請使用 ConfigManager.set")
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        獲取配置項（包含未在默認配置中定義的項目）
+
+        :param key: 配置項名稱
+        :param default: 配置項不存在時的返回值
+        :return: 配置值
+        """
+        return self._values.get(key, default)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self._values)!r})"
+
+
+class ConfigSnapshot:
+    """
+    不可變的配置快照
+
+    每個默認配置區段都是一個屬性，例如 ``snapshot.security.log_user_actions``。
+    快照建立後不會再改變，更新配置時會建立新的快照並整個替換。
+    """
+
+    __slots__ = ("version", "json_bytes", "etag", "_data", "_sections")
+
+    # 區段名稱 -> 區段類型，由 make_snapshot_type 依默認配置產生
+    _section_types: Dict[str, type] = {}
+
+    def __init__(self, data: Dict[str, Any], version: int):
+        """
+        :param data: 已驗證的完整配置字典（快照持有後不可再修改）
+        :param version: 快照版本號，每次更新遞增
+        """
+        sections = {}
+        for name, values in data.items():
+            if not isinstance(values, dict):
+                continue
+            section_type = self._section_types.get(name)
+            sections[name] = (section_type or ConfigSection)(values)
+            if section_type is not None:
+                object.__setattr__(self, name, sections[name])
+        # 快照不會改變，序列化結果與 ETag 只需計算一次
+        json_bytes = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode(
+            "utf-8"
+        )
+        object.__setattr__(self, "version", version)
+        object.__setattr__(self, "json_bytes", json_bytes)
+        object.__setattr__(
+            self, "etag", '"' + hashlib.sha256(json_bytes).hexdigest()[:32] + '"'
+        )
+        object.__setattr__(self, "_data", data)
+        object.__setattr__(self, "_sections", sections)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("配置快照不可修改，請使用 ConfigManager.set")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("配置快照不可修改，請使用 ConfigManager.set")
+
+    def section(self, name: str) -> Optional[ConfigSection]:
+        """
+        依名稱獲取配置區段（包含未在默認配置中定義的區段）
+
+        :param name: 區段名稱
+        :return: 配置區段，不存在時返回 None
+        """
+        return self._sections.get(name)
+
+    def get(self, section: str, key: str, default: Any = None) -> Any:
+        """
+        獲取配置值
+
+        :param section: 配置區段
+        :param key: 配置項名稱
+        :param default: 配置不存在時的返回值
+        :return: 配置值
+        """
+        values = self._sections.get(section)
+        if values is None:
+            return default
+        return values.get(key, default)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        轉換為可修改的配置字典
+
+        :return: 配置字典的深複本
+        """
+        return copy.deepcopy(self._data)
+
+    def etag_matches(self, header: Optional[str], weak: bool = False) -> bool:
+        """
+        檢查 If-Match / If-None-Match 標頭是否包含本快照的 ETag
+
+        If-Match 使用強比較，W/ 開頭的弱 ETag 一律不符合；
+        If-None-Match 使用弱比較，忽略 W/ 前綴（例如經過壓縮的代理改寫後的 ETag）。
+
+        :param header: 標頭值，可以是以逗號分隔的多個 ETag 或 *
+        :param weak: 是否使用弱比較
+        :return: 是否符合
+        """
+        if not header:
+            return False
+        tags = [tag.strip() for tag in header.split(",")]
+        if weak:
+            tags = [tag[2:] if tag.startswith("W/") else tag for tag in tags]
+        return "*" in tags or self.etag in tags
+
+
+def make_snapshot_type(defaults: Dict[str, Dict[str, Any]]) -> type:
+    """
+    依默認配置產生快照類型，每個區段與配置項都對應一個 __slots__ 屬性
+
+    :param defaults: 默認配置
+    :return: ConfigSnapshot 的子類
+    """
+    section_types = {
+        name: type(
+            "".join(part.title() for part in name.split("_")) + "Config",
+            (ConfigSection,),
+            {"__slots__": tuple(values)},
+        )
+        for name, values in defaults.items()
+    }
+    return type(
+        "AppConfigSnapshot",
+        (ConfigSnapshot,),
+        {"__slots__": tuple(section_types), "_section_types": section_types},
+    )
+
+
 class ConfigManager:
     """配置管理器類，管理應用程式配置"""
 
@@ -17,11 +201,25 @@ class ConfigManager:
             "host": "0.0.0.0",
             "port": 18080,
             "auto_open_browser": True,
+            "ipv6": True,
+            "unix_socket": "",
+            "backlog": 2048,
+            "port_fallback_attempts": 10,
+            "workers": 1,
+            "limit_concurrency": 0,
+            "timeout_keep_alive": 5,
+            "loop": "auto",
+            "http": "auto",
         },
         "logging": {
             "level": "INFO",
             "max_file_size_mb": 10,
-            "backup_count": 5,
+            "max_total_size_mb": 500,
+            "retention_days": 90,
+            "compress_rotated": True,
+            "queue_size": 10000,
+            "queue_full_policy": "drop_debug",
+            "audit_log": True,
         },
         "tray": {
             "enabled": True,
@@ -36,8 +234,78 @@ class ConfigManager:
             "enable_password_masking": True,
             "log_user_actions": True,
         },
+        "executor": {
+            "max_workers": 4,
+            "queue_size": 32,
+        },
+        "backend": {
+            "type": "win32",
+            "isolation": "none",
+            "process_workers": 2,
+            "process_max_calls": 1000,
+            "process_call_timeout_seconds": 30,
+            "memory_users": {},
+            "memory_latency_ms": 0,
+            "memory_latency_jitter_ms": 0,
+            "memory_error_rate": 0.0,
+        },
+        "batch": {
+            "parallelism": 8,
+            "max_line_bytes": 65536,
+        },
+        "idempotency": {
+            "enabled": True,
+            "max_entries": 10000,
+            "ttl_seconds": 3600,
+        },
+        "resilience": {
+            "verify_timeout_seconds": 15,
+            "set_timeout_seconds": 15,
+            "breaker_failure_threshold": 5,
+            "breaker_reset_seconds": 30,
+            "max_concurrent_calls": 8,
+        },
+        "rate_limit": {
+            "enabled": True,
+            "ip_requests_per_minute": 30,
+            "ip_burst": 10,
+            "user_requests_per_minute": 5,
+            "user_burst": 3,
+            "max_entries": 10000,
+        },
+        "negative_cache": {
+            "enabled": True,
+            "unknown_user_ttl_seconds": 300,
+            "failed_verify_ttl_seconds": 10,
+            "max_entries": 10000,
+        },
+        "config_watch": {
+            "enabled": True,
+            "poll_interval_seconds": 2,
+        },
+        "admission": {
+            "enabled": True,
+            "max_concurrent": 32,
+            "max_pending": 64,
+            "pending_timeout_seconds": 5,
+            "retry_after_seconds": 2,
+            "max_batch_streams": 2,
+        },
     }
 
+    # 只允許特定值的配置項
+    ALLOWED_VALUES = {
+        ("logging", "level"): ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"),
+        ("logging", "queue_full_policy"): ("block", "drop_debug", "drop_oldest"),
+        ("backend", "type"): ("win32", "memory"),
+        ("backend", "isolation"): ("none", "process"),
+        ("server", "loop"): ("auto", "asyncio", "uvloop"),
+        ("server", "http"): ("auto", "h11", "httptools"),
+    }
+
+    # 依默認配置產生的快照類型
+    SNAPSHOT_TYPE = make_snapshot_type(DEFAULT_CONFIG)
+
     def __init__(self, config_file: str = "config.json"):
         """
         初始化配置管理器
@@ -46,7 +314,87 @@ class ConfigManager:
         """
         self.config_file = self._get_config_path(config_file)
         logger.debug(f"使用配置文件: {self.config_file}")
-        self.config = self._load_config()
+        # 配置文件只讀取一次，寫入器以此內容判斷之後的寫入是否有變更
+        text = self._read_config_text()
+        self._persister = ConfigPersister(self.config_file, existing=text)
+        # 寫入者之間互斥，讀取者直接讀取目前的快照而不需要鎖
+        self._write_lock = threading.Lock()
+        self._subscribers: List[Callable[[ConfigSnapshot], None]] = []
+        self._snapshot = self.SNAPSHOT_TYPE(self._load_config(text), 1)
+
+    @property
+    def snapshot(self) -> ConfigSnapshot:
+        """
+        目前的不可變配置快照，熱路徑應先取得快照再以屬性讀取配置
+        """
+        return self._snapshot
+
+    @property
+    def config(self) -> Dict[str, Any]:
+        """
+        目前配置的唯讀檢視
+        """
+        return MappingProxyType(self._snapshot._data)
+
+    def _validate_value(self, section: str, key: str, value: Any) -> Optional[str]:
+        """
+        依默認配置的型別檢查配置值
+
+        :param section: 配置區段
+        :param key: 配置項名稱
+        :param value: 配置值
+        :return: 錯誤訊息，值有效時返回 None
+        """
+        defaults = self.DEFAULT_CONFIG.get(section)
+        if defaults is None or key not in defaults:
+            # 未在默認配置中定義的配置項不檢查
+            return None
+
+        default = defaults[key]
+        name = f"{section}.{key}"
+        if isinstance(default, bool):
+            if not isinstance(value, bool):
+                return f"{name} 必須是布爾值"
+        elif isinstance(default, (int, float)):
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                return f"{name} 必須是數字"
+            if isinstance(default, int) and not isinstance(value, int):
+                # 端口、工作進程數等整數配置項不接受小數
+                return f"{name} 必須是整數"
+            if value < 0:
+                return f"{name} 不可為負數"
+        elif isinstance(default, str):
+            if not isinstance(value, str):
+                return f"{name} 必須是字串"
+        elif isinstance(default, dict):
+            if not isinstance(value, dict):
+                return f"{name} 必須是物件"
+
+        allowed = self.ALLOWED_VALUES.get((section, key))
+        if allowed is not None and value not in allowed:
+            return f"{name} 必須是 {', '.join(allowed)} 之一"
+        if section == "server" and key == "port" and not 0 < value < 65536:
+            return f"{name} 必須介於 1 到 65535"
+        return None
+
+    def validate(self, config: Dict[str, Any]) -> List[str]:
+        """
+        檢查完整配置
+
+        :param config: 配置字典
+        :return: 錯誤訊息列表，空列表表示配置有效
+        """
+        errors = []
+        for section, values in config.items():
+            if not isinstance(values, dict):
+                if section in self.DEFAULT_CONFIG:
+                    errors.append(f"配置區段 {section} 必須是物件")
+                continue
+            for key, value in values.items():
+                error = self._validate_value(section, key, value)
+                if error:
+                    errors.append(error)
+        return errors
 
     def _get_config_path(self, config_file: str) -> str:
         """
@@ -83,18 +431,33 @@ class ConfigManager:
         logger.debug(f"配置文件不存在，將創建於: {possible_paths[0]}")
         return possible_paths[0]
 
-    def _load_config(self) -> Dict[str, Any]:
+    def _read_config_text(self) -> Optional[str]:
         """
-        載入配置文件，如果不存在則創建默認配置
+        讀取配置文件內容
 
+        :return: 文件內容，文件不存在或無法讀取時返回 None
+        """
+        try:
+            with open(self.config_file, "r", encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.error(f"讀取配置文件失敗: {e}")
+            return None
+
+    def _load_config(self, text: Optional[str]) -> Dict[str, Any]:
+        """
+        解析配置文件內容，如果不存在則創建默認配置
+
+        :param text: 配置文件內容，文件不存在時為 None
         :return: 配置字典
         """
-        # 如果配置文件存在，載入它
-        if os.path.exists(self.config_file):
+        # 如果配置文件存在，解析它
+        if text is not None:
             try:
                 logger.info(f"正在載入配置文件: {self.config_file}")
-                with open(self.config_file, "r", encoding="utf-8") as f:
-                    config = json.load(f)
+                config = json.loads(text)
                 logger.info("配置文件載入成功")
 
                 # 確保配置結構完整，用默認值填補缺失的配置
@@ -105,6 +468,8 @@ class ConfigManager:
                     logger.info("配置結構已更新，保存更新後的配置")
                     self._save_config(merged_config)
 
+                # 無效的配置值在本次執行中改用默認值，配置文件保持不變
+                self._replace_invalid_values(merged_config)
                 return merged_config
 
             except Exception as e:
@@ -115,20 +480,38 @@ class ConfigManager:
 
         # 保存默認配置到文件
         self._save_config(self.DEFAULT_CONFIG)
-        return self.DEFAULT_CONFIG
+        return copy.deepcopy(self.DEFAULT_CONFIG)
+
+    def _replace_invalid_values(self, config: Dict[str, Any]) -> None:
+        """
+        將無效的配置值替換為默認值
+
+        :param config: 配置字典（原地修改）
+        """
+        for section, defaults in self.DEFAULT_CONFIG.items():
+            if not isinstance(config.get(section), dict):
+                logger.warning(f"配置區段 {section} 無效，使用默認值")
+                config[section] = copy.deepcopy(defaults)
+                continue
+            for key, value in config[section].items():
+                error = self._validate_value(section, key, value)
+                if error:
+                    logger.warning(f"{error}，使用默認值 {defaults[key]!r}")
+                    config[section][key] = copy.deepcopy(defaults[key])
 
     def _save_config(self, config: Dict[str, Any]) -> None:
         """
-        保存配置到文件
+        排程保存配置到文件，由背景線程合併短時間內的多次更新後寫入
 
         :param config: 配置字典
         """
-        try:
-            with open(self.config_file, "w", encoding="utf-8") as f:
-                json.dump(config, f, indent=4, ensure_ascii=False)
-            logger.info(f"配置已保存到: {self.config_file}")
-        except Exception as e:
-            logger.error(f"保存配置文件失敗: {e}")
+        self._persister.schedule(config)
+
+    def flush(self) -> None:
+        """
+        立即寫入尚未保存的配置，應用程式關閉前呼叫
+        """
+        self._persister.flush()
 
     def _merge_configs(
         self, default: Dict[str, Any], user: Dict[str, Any]
@@ -167,11 +550,114 @@ class ConfigManager:
         :param default: 默認值（如果配置不存在）
         :return: 配置值
         """
+        return self._snapshot.get(section, key, default)
+
+    def _update(self, description: str, mutate, if_match: Optional[str] = None) -> bool:
+        """
+        以複製後寫入的方式更新配置：在複本上修改、驗證後建立新快照並整個替換
+
+        :param description: 更新內容的說明（用於日誌）
+        :param mutate: 修改配置複本的函數
+        :param if_match: If-Match 標頭值，提供時只在符合目前快照的 ETag 時更新
+        :return: 配置是否有變更
+        :raises ConfigConflictError: 配置已被其他請求修改
+        :raises ConfigValidationError: 修改後的配置無效
+        """
+        with self._write_lock:
+            current = self._snapshot
+            if if_match is not None and not current.etag_matches(if_match):
+                raise ConfigConflictError("配置已被修改，請重新取得後再試")
+            updated = current.to_dict()
+            mutate(updated)
+            if updated == current._data:
+                logger.debug(f"{description} 未變更")
+                return False
+
+            errors = self.validate(updated)
+            if errors:
+                logger.warning(f"{description} 被拒絕: {'; '.join(errors)}")
+                raise ConfigValidationError(errors)
+
+            self._snapshot = self.SNAPSHOT_TYPE(updated, current.version + 1)
+            logger.info(description)
+            self._save_config(updated)
+            self._notify(self._snapshot)
+            return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        獲取配置狀態
+
+        :return: 包含快照版本與寫入統計的字典
+        """
+        return {
+            "version": self._snapshot.version,
+            "persistence": self._persister.get_stats(),
+        }
+
+    def subscribe(self, callback: Callable[[ConfigSnapshot], None]) -> None:
+        """
+        註冊配置變更的回呼，每次換上新的快照後以新快照呼叫
+
+        回呼在寫入鎖內依序執行，不可在回呼中再修改配置。
+
+        :param callback: 回呼函數
+        """
+        self._subscribers.append(callback)
+
+    def _notify(self, snapshot: ConfigSnapshot) -> None:
+        """
+        通知所有訂閱者配置已變更
+
+        :param snapshot: 新的配置快照
+        """
+        for callback in list(self._subscribers):
+            try:
+                callback(snapshot)
+            except Exception as e:
+                logger.error(f"套用配置變更失敗 ({callback.__qualname__}): {e}")
+
+    def reload(self) -> bool:
+        """
+        重新載入配置文件，驗證通過且內容有變更時換上新的快照
+
+        :return: 配置是否有變更
+        """
         try:
-            return self.config.get(section, {}).get(key, default)
+            with open(self.config_file, "r", encoding="utf-8") as f:
+                text = f.read()
+            # 本程式剛寫入的內容已在目前或更新的快照中
+            if self._persister.is_own_write(text):
+                return False
+            loaded = json.loads(text)
+            if not isinstance(loaded, dict):
+                raise ValueError("配置文件的最上層必須是物件")
         except Exception as e:
-            logger.error(f"獲取配置 {section}.{key} 失敗: {e}")
-            return default
+            logger.error(f"重新載入配置文件失敗，保留目前的配置: {e}")
+            return False
+
+        merged = self._merge_configs(self.DEFAULT_CONFIG, loaded)
+        errors = self.validate(merged)
+        if errors:
+            logger.error(f"配置文件內容無效，保留目前的配置: {'; '.join(errors)}")
+            return False
+
+        with self._write_lock:
+            current = self._snapshot
+            if merged == current._data:
+                return False
+            self._snapshot = self.SNAPSHOT_TYPE(merged, current.version + 1)
+            changed = [
+                section
+                for section in merged
+                if merged.get(section) != current._data.get(section)
+            ]
+            logger.info(
+                f"已重新載入配置文件 (版本 {self._snapshot.version}), "
+                f"變更的區段: {', '.join(changed)}"
+            )
+            self._notify(self._snapshot)
+            return True
 
     def set(self, section: str, key: str, value: Any) -> None:
         """
@@ -180,23 +666,54 @@ class ConfigManager:
         :param section: 配置區段
         :param key: 配置項名稱
         :param value: 新的配置值
+        :raises ConfigValidationError: 配置值無效
         """
-        if section not in self.config:
-            self.config[section] = {}
 
-        # 檢查值是否變更
-        if (
-            section in self.config
-            and key in self.config[section]
-            and self.config[section][key] == value
-        ):
-            logger.debug(f"配置 {section}.{key} 未變更")
-            return
+        def mutate(updated):
+            if not isinstance(updated.get(section), dict):
+                updated[section] = {}
+            updated[section][key] = value
 
-        # 更新配置並保存到文件
-        self.config[section][key] = value
-        logger.info(f"配置已更新: {section}.{key} = {value}")
-        self._save_config(self.config)
+        self._update(f"配置已更新: {section}.{key} = {value}", mutate)
+
+    def patch(
+        self, changes: Dict[str, Any], if_match: Optional[str] = None
+    ) -> ConfigSnapshot:
+        """
+        一次套用多個區段的配置變更，全部有效才會生效
+
+        :param changes: {區段: {配置項: 值}} 格式的變更
+        :param if_match: If-Match 標頭值，提供時只在符合目前快照的 ETag 時更新
+        :return: 套用後的配置快照
+        :raises ConfigConflictError: 配置已被其他請求修改
+        :raises ConfigValidationError: 變更的格式或值無效
+        """
+        errors = []
+        if not isinstance(changes, dict):
+            raise ConfigValidationError(["變更內容必須是物件"])
+        for section, values in changes.items():
+            if section not in self.DEFAULT_CONFIG:
+                errors.append(f"未知的配置區段 {section}")
+            elif not isinstance(values, dict):
+                errors.append(f"配置區段 {section} 必須是物件")
+            else:
+                errors.extend(
+                    f"未知的配置項 {section}.{key}"
+                    for key in values
+                    if key not in self.DEFAULT_CONFIG[section]
+                )
+        if errors:
+            raise ConfigValidationError(errors)
+
+        def mutate(updated):
+            for section, values in changes.items():
+                updated[section].update(copy.deepcopy(values))
+
+        keys = ", ".join(
+            f"{section}.{key}" for section, values in changes.items() for key in values
+        )
+        self._update(f"配置已批次更新: {keys}", mutate, if_match)
+        return self._snapshot
 
     def get_all(self) -> Dict[str, Any]:
         """
@@ -204,15 +721,18 @@ class ConfigManager:
 
         :return: 所有配置的複本
         """
-        return self.config.copy()
+        return self._snapshot.to_dict()
 
     def reset_to_default(self) -> None:
         """
         重置配置為默認值
         """
-        logger.info("重置所有配置為默認值")
-        self.config = self.DEFAULT_CONFIG.copy()
-        self._save_config(self.config)
+
+        def mutate(updated):
+            updated.clear()
+            updated.update(copy.deepcopy(self.DEFAULT_CONFIG))
+
+        self._update("重置所有配置為默認值", mutate)
 
     def reset_section(self, section: str) -> None:
         """
@@ -221,9 +741,11 @@ class ConfigManager:
         :param section: 配置區段名稱
         """
         if section in self.DEFAULT_CONFIG:
-            logger.info(f"重置配置區段 {section} 為默認值")
-            self.config[section] = self.DEFAULT_CONFIG[section].copy()
-            self._save_config(self.config)
+
+            def mutate(updated):
+                updated[section] = copy.deepcopy(self.DEFAULT_CONFIG[section])
+
+            self._update(f"重置配置區段 {section} 為默認值", mutate)
         else:
             logger.warning(f"配置區段 {section} 不存在於默認配置中")
 
@@ -231,6 +753,21 @@ class ConfigManager:
 # 創建全局配置管理器實例
 config_manager = ConfigManager()
 
+# 以載入的配置設置日誌處理器，寫入在此之前暫存的日誌
+configure_logging(config_manager.snapshot.section("logging"))
+
+
+def _apply_logging_config(snapshot: ConfigSnapshot) -> None:
+    """
+    將配置中的日誌級別套用到日誌記錄器
+
+    :param snapshot: 配置快照
+    """
+    set_log_level(snapshot.logging.level)
+
+
+config_manager.subscribe(_apply_logging_config)
+
 
 def get_config() -> ConfigManager:
     """
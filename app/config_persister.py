@@ -0,0 +1,182 @@
+import os
+import json
+import time
+import atexit
+import tempfile
+import threading
+from typing import Any, Dict, Optional
+
+from app.logger import get_logger
+
+# 獲取日誌記錄器
+logger = get_logger()
+
+
+def serialize_config(config: Dict[str, Any]) -> str:
+    """
+    將配置序列化為寫入文件的文字
+
+    :param config: 配置字典
+    :return: JSON 文字
+    """
+    return json.dumps(config, indent=4, ensure_ascii=False)
+
+
+def write_atomic(path: str, text: str) -> None:
+    """
+    先寫入同目錄的暫存文件再以原子操作替換，寫入中途當機也不會留下損壞的文件
+
+    :param path: 目標文件路徑
+    :param text: 文件內容
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=".config-", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+class ConfigPersister:
+    """
+    配置文件的延遲寫入器
+
+    短時間內的多次更新合併為一次寫入，由背景線程在最後一次更新後等待
+    debounce_seconds 再寫入；內容與文件相同時略過。
+    """
+
+    def __init__(
+        self,
+        path: str,
+        debounce_seconds: float = 0.5,
+        existing: Optional[str] = None,
+    ):
+        """
+        初始化寫入器
+
+        :param path: 配置文件路徑
+        :param debounce_seconds: 最後一次更新後延遲寫入的時間（秒）
+        :param existing: 呼叫端已讀取的文件內容，未提供時自行讀取
+        """
+        self.path = path
+        self.debounce_seconds = max(0.0, float(debounce_seconds))
+        self._cond = threading.Condition()
+        # 寫入文件時持有，確保較舊的內容不會覆蓋較新的內容
+        self._io_lock = threading.Lock()
+        self._pending: Optional[str] = None
+        self._due = 0.0
+        self._thread: Optional[threading.Thread] = None
+        self._last_written = existing if existing is not None else self._read_existing()
+        self._scheduled = 0
+        self._written = 0
+        self._skipped = 0
+        self._failed = 0
+        atexit.register(self.flush)
+
+    def _read_existing(self) -> Optional[str]:
+        """
+        讀取目前的文件內容
+
+        :return: 文件內容，無法讀取時返回 None
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def schedule(self, config: Dict[str, Any]) -> None:
+        """
+        排程寫入配置，取代尚未寫入的內容
+
+        :param config: 配置字典（呼叫後不可再修改）
+        """
+        text = serialize_config(config)
+        with self._cond:
+            self._pending = text
+            self._due = time.monotonic() + self.debounce_seconds
+            self._scheduled += 1
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="config-persister", daemon=True
+                )
+                self._thread.start()
+            self._cond.notify()
+
+    def is_own_write(self, text: str) -> bool:
+        """
+        判斷文件內容是否為本寫入器寫入或即將寫入的內容
+
+        :param text: 文件內容
+        :return: 是否為本寫入器的內容
+        """
+        with self._cond:
+            return text == self._last_written or text == self._pending
+
+    def _write_pending(self) -> None:
+        """
+        立即寫入尚未寫入的內容
+        """
+        with self._io_lock:
+            with self._cond:
+                text, self._pending = self._pending, None
+                if text is None:
+                    return
+                if text == self._last_written:
+                    self._skipped += 1
+                    logger.debug("配置內容未變更，略過寫入")
+                    return
+            try:
+                write_atomic(self.path, text)
+            except Exception as e:
+                with self._cond:
+                    self._failed += 1
+                logger.error(f"保存配置文件失敗: {e}")
+                return
+            with self._cond:
+                self._last_written = text
+                self._written += 1
+            logger.info(f"配置已保存到: {self.path}")
+
+    def _run(self) -> None:
+        """
+        背景寫入線程主迴圈
+        """
+        while True:
+            with self._cond:
+                while self._pending is None:
+                    self._cond.wait()
+                remaining = self._due - time.monotonic()
+                if remaining > 0:
+                    self._cond.wait(remaining)
+                    continue
+            self._write_pending()
+
+    def flush(self) -> None:
+        """
+        立即寫入尚未寫入的內容，應用程式關閉前呼叫
+        """
+        self._write_pending()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        獲取寫入統計資料
+
+        :return: 統計資料字典
+        """
+        with self._cond:
+            return {
+                "pending": self._pending is not None,
+                "scheduled": self._scheduled,
+                "written": self._written,
+                "skipped": self._skipped,
+                "failed": self._failed,
+            }
@@ -0,0 +1,224 @@
+import os
+import sys
+import time
+import select
+import struct
+import threading
+from typing import Optional, Tuple
+
+from app.logger import get_logger
+from app.config_manager import ConfigManager, get_config
+
+# 獲取日誌記錄器
+logger = get_logger()
+
+# 獲取配置管理器
+config = get_config()
+
+# inotify 事件：寫入完成、移入（原子替換）、建立
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+
+class _Inotify:
+    """以 ctypes 呼叫 Linux inotify，監看配置文件所在的目錄"""
+
+    def __init__(self, directory: str):
+        """
+        :param directory: 要監看的目錄
+        :raises OSError: 系統不支援 inotify
+        """
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, os.strerror(errno))
+
+    def read_names(self) -> set:
+        """
+        讀取所有待處理的事件
+
+        :return: 發生事件的文件名稱集合
+        """
+        names = set()
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                return names
+            offset = 0
+            while offset + 16 <= len(data):
+                _, _, _, length = struct.unpack_from("iIII", data, offset)
+                name = data[offset + 16 : offset + 16 + length].rstrip(b"\0")
+                names.add(os.fsdecode(name))
+                offset += 16 + length
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class ConfigWatcher:
+    """
+    配置文件監看器
+
+    在背景線程中偵測 config.json 的變更並呼叫 ConfigManager.reload。Linux 上
+    使用 inotify 即時得知變更，其他平台或 inotify 無法使用時以修改時間輪詢。
+    """
+
+    # 收到事件後等待編輯器寫完的時間（秒）
+    DEBOUNCE_SECONDS = 0.2
+
+    def __init__(self, manager: ConfigManager, poll_interval: float = 2.0):
+        """
+        初始化監看器
+
+        :param manager: 配置管理器
+        :param poll_interval: 輪詢間隔（秒）
+        """
+        self.manager = manager
+        self.poll_interval = max(0.1, float(poll_interval))
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._inotify: Optional[_Inotify] = None
+        self._wake_r, self._wake_w = None, None
+        self._signature = self._stat()
+        self.mode = "poll"
+        self.reloads = 0
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        """
+        獲取配置文件的修改時間與大小
+
+        :return: (修改時間, 大小)，文件不存在時返回 None
+        """
+        try:
+            st = os.stat(self.manager.config_file)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def start(self) -> None:
+        """
+        啟動背景監看線程
+        """
+        if self._thread is not None:
+            return
+        if sys.platform.startswith("linux"):
+            try:
+                directory = os.path.dirname(os.path.abspath(self.manager.config_file))
+                self._inotify = _Inotify(directory)
+                self._wake_r, self._wake_w = os.pipe()
+                self.mode = "inotify"
+            except (OSError, AttributeError) as e:
+                logger.debug(f"無法使用 inotify，改用輪詢: {e}")
+        self._thread = threading.Thread(
+            target=self._run, name="config-watcher", daemon=True
+        )
+        self._thread.start()
+        logger.info(
+            f"配置文件監看已啟動 ({self.mode}), 輪詢間隔: {self.poll_interval:g}s"
+        )
+
+    def stop(self) -> None:
+        """
+        停止背景監看線程
+        """
+        self._stop.set()
+        if self._wake_w is not None:
+            os.write(self._wake_w, b"\0")
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+        if self._inotify is not None:
+            self._inotify.close()
+            os.close(self._wake_r)
+            os.close(self._wake_w)
+            self._inotify = None
+            self._wake_r = self._wake_w = None
+
+    def _wait(self) -> None:
+        """
+        等待下一次檢查：inotify 模式下等到配置文件有事件或輪詢間隔到期
+        """
+        if self._inotify is None:
+            self._stop.wait(self.poll_interval)
+            return
+
+        target = os.path.basename(self.manager.config_file)
+        readable, _, _ = select.select(
+            [self._inotify.fd, self._wake_r], [], [], self.poll_interval
+        )
+        if self._inotify.fd in readable and target in self._inotify.read_names():
+            # 編輯器可能分多次寫入，稍等後再讀取並丟棄期間的事件
+            time.sleep(self.DEBOUNCE_SECONDS)
+            self._inotify.read_names()
+
+    def check(self) -> bool:
+        """
+        檢查配置文件是否變更，變更時重新載入
+
+        :return: 是否換上了新的配置
+        """
+        signature = self._stat()
+        if signature is None or signature == self._signature:
+            return False
+        self._signature = signature
+        if self.manager.reload():
+            self.reloads += 1
+            return True
+        return False
+
+    def _run(self) -> None:
+        """
+        監看線程主迴圈
+        """
+        while not self._stop.is_set():
+            try:
+                self._wait()
+                if not self._stop.is_set():
+                    self.check()
+            except Exception as e:
+                logger.error(f"監看配置文件時發生錯誤: {e}")
+                self._stop.wait(self.poll_interval)
+
+
+# 全局配置監看器實例，在應用程式啟動時創建
+config_watcher: Optional[ConfigWatcher] = None
+
+
+def start_config_watcher() -> Optional[ConfigWatcher]:
+    """
+    依配置啟動配置文件監看器
+
+    :return: 配置監看器，停用時返回 None
+    """
+    global config_watcher
+    settings = config.snapshot.config_watch
+    if not settings.enabled:
+        logger.info("配置文件監看已停用")
+        return None
+    if config_watcher is None:
+        config_watcher = ConfigWatcher(config, settings.poll_interval_seconds)
+        config_watcher.start()
+    return config_watcher
+
+
+def stop_config_watcher() -> None:
+    """
+    停止配置文件監看器
+    """
+    global config_watcher
+    if config_watcher is not None:
+        config_watcher.stop()
+        config_watcher = None
@@ -0,0 +1,229 @@
+import time
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from app.logger import get_logger
+from app.config_manager import get_config
+
+# 獲取日誌記錄器
+logger = get_logger()
+
+# 獲取配置管理器
+config = get_config()
+
+
+class ExecutorBusyError(Exception):
+    """執行佇列已滿時拋出的異常"""
+
+
+class BackendExecutor:
+    """後端執行器類，將同步的後端呼叫分派到有界的執行緒池，避免阻塞事件迴圈"""
+
+    def __init__(self, max_workers: int = 4, queue_size: int = 32):
+        """
+        初始化後端執行器
+
+        :param max_workers: 執行緒池大小
+        :param queue_size: 等待佇列的最大長度
+        """
+        self.max_workers = max(1, int(max_workers))
+        self.queue_size = max(0, int(queue_size))
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="backend"
+        )
+        self._stats_lock = threading.Lock()
+        # 執行中與排隊中的任務數，上限為 max_workers + queue_size
+        self._in_flight = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._active = 0
+        self._queued = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._total_exec = 0.0
+        self._max_exec = 0.0
+        logger.info(
+            f"後端執行器初始化, 執行緒數: {self.max_workers}, 佇列長度: {self.queue_size}"
+        )
+
+    def _record_start(self, wait: float) -> None:
+        """
+        記錄任務開始執行
+
+        :param wait: 排隊等待時間（秒）
+        """
+        with self._stats_lock:
+            self._queued -= 1
+            self._active += 1
+            self._total_wait += wait
+            self._max_wait = max(self._max_wait, wait)
+
+    def _record_finish(self, elapsed: float, failed: bool) -> None:
+        """
+        記錄任務執行完成
+
+        :param elapsed: 執行時間（秒）
+        :param failed: 是否拋出異常
+        """
+        with self._stats_lock:
+            self._active -= 1
+            self._completed += 1
+            if failed:
+                self._failed += 1
+            self._total_exec += elapsed
+            self._max_exec = max(self._max_exec, elapsed)
+
+    def _release(self, future) -> None:
+        """
+        任務結束（包含被取消）時釋放佇列名額
+
+        :param future: 已結束的任務
+        """
+        with self._stats_lock:
+            if future.cancelled():
+                self._queued -= 1
+            self._in_flight -= 1
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        在執行緒池中執行同步函數並等待結果
+
+        :param func: 要執行的同步函數
+        :param args: 位置參數
+        :param kwargs: 關鍵字參數
+        :return: 函數的返回值
+        :raises ExecutorBusyError: 執行中與排隊中的任務已達上限
+        """
+        with self._stats_lock:
+            busy = self._in_flight >= self.max_workers + self.queue_size
+            if busy:
+                self._rejected += 1
+            else:
+                self._in_flight += 1
+                self._submitted += 1
+                self._queued += 1
+        if busy:
+            logger.warning("後端執行佇列已滿，拒絕新的請求")
+            raise ExecutorBusyError("伺服器忙碌中，請稍後再試")
+
+        submitted_at = time.perf_counter()
+
+        def task():
+            started_at = time.perf_counter()
+            self._record_start(started_at - submitted_at)
+            failed = False
+            try:
+                return func(*args, **kwargs)
+            except BaseException:
+                failed = True
+                raise
+            finally:
+                elapsed = time.perf_counter() - started_at
+                self._record_finish(elapsed, failed)
+                logger.debug(
+                    f"後端呼叫完成, 排隊 {(started_at - submitted_at) * 1000:.1f}ms, "
+                    f"執行 {elapsed * 1000:.1f}ms"
+                )
+
+        # 在工作線程中沿用呼叫端的上下文，日誌才能標記請求識別碼
+        context = contextvars.copy_context()
+        with self._stats_lock:
+            future = self._pool.submit(context.run, task)
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        獲取執行器統計資料
+
+        :return: 統計資料字典（時間單位為毫秒）
+        """
+        with self._stats_lock:
+            started = self._completed + self._active
+            return {
+                "max_workers": self.max_workers,
+                "queue_size": self.queue_size,
+                "active": self._active,
+                "queued": self._queued,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "avg_queue_wait_ms": (
+                    self._total_wait / started * 1000 if started else 0.0
+                ),
+                "max_queue_wait_ms": self._max_wait * 1000,
+                "avg_execution_ms": (
+                    self._total_exec / self._completed * 1000
+                    if self._completed
+                    else 0.0
+                ),
+                "max_execution_ms": self._max_exec * 1000,
+            }
+
+    def resize(self, max_workers: int, queue_size: int) -> None:
+        """
+        調整執行緒池大小與佇列長度
+
+        執行緒數變更時以新的執行緒池接收新任務，舊執行緒池在背景中完成已提交的任務。
+
+        :param max_workers: 新的執行緒池大小
+        :param queue_size: 新的等待佇列長度
+        """
+        max_workers = max(1, int(max_workers))
+        queue_size = max(0, int(queue_size))
+        old_pool = None
+        with self._stats_lock:
+            if max_workers == self.max_workers and queue_size == self.queue_size:
+                return
+            self.queue_size = queue_size
+            if max_workers != self.max_workers:
+                old_pool = self._pool
+                self._pool = ThreadPoolExecutor(
+                    max_workers=max_workers, thread_name_prefix="backend"
+                )
+                self.max_workers = max_workers
+        if old_pool is not None:
+            old_pool.shutdown(wait=False)
+        logger.info(
+            f"後端執行器已調整, 執行緒數: {max_workers}, 佇列長度: {queue_size}"
+        )
+
+    def apply_config(self, snapshot) -> None:
+        """
+        套用配置快照中的執行器設定
+
+        :param snapshot: 配置快照
+        """
+        self.resize(snapshot.executor.max_workers, snapshot.executor.queue_size)
+
+    def shutdown(self, wait: bool = False) -> None:
+        """
+        關閉執行緒池
+
+        :param wait: 是否等待執行中的任務完成
+        """
+        logger.info("關閉後端執行器")
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+
+# 創建全局後端執行器實例
+backend_executor = BackendExecutor(
+    max_workers=config.get("executor", "max_workers", 4),
+    queue_size=config.get("executor", "queue_size", 32),
+)
+config.subscribe(backend_executor.apply_config)
+
+
+def get_executor() -> BackendExecutor:
+    """
+    獲取後端執行器實例
+
+    :return: 後端執行器
+    """
+    return backend_executor
@@ -0,0 +1,147 @@
+from typing import Any, Dict, Optional
+
+from app.cache import TTLCache, SharedTTLCache
+from app.logger import get_logger
+from app.config_manager import get_config
+from app.keyed_lock import get_user_gate
+
+# 獲取日誌記錄器
+logger = get_logger()
+
+# 獲取配置管理器
+config = get_config()
+
+# 冪等鍵的最大長度
+MAX_KEY_LENGTH = 128
+
+
+class IdempotencyStore:
+    """冪等鍵結果儲存，讓重試的請求直接取回第一次的結果"""
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 3600):
+        """
+        初始化冪等鍵結果儲存
+
+        :param max_entries: 最大保存的結果數
+        :param ttl_seconds: 結果保存時間（秒）
+        """
+        self._cache = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+
+    def use_shared_store(self, store) -> None:
+        """
+        改為保存在共用狀態儲存中，重試的請求由其他伺服器工作進程處理時也能取回結果
+
+        :param store: 共用狀態儲存
+        """
+        self._cache = SharedTTLCache(
+            store, "idempotency", self._cache.max_entries, self._cache.ttl_seconds
+        )
+
+    @staticmethod
+    def _cache_key(username: str, key: str) -> str:
+        """
+        計算快取鍵，冪等鍵只在同一帳戶內有效
+
+        :param username: 使用者名稱
+        :param key: 冪等鍵
+        :return: 快取鍵
+        """
+        return f"{username.casefold()}\0{key}"
+
+    @staticmethod
+    def _fingerprint(current_password: str, new_password: str) -> str:
+        """
+        計算請求內容指紋
+
+        :param current_password: 目前密碼
+        :param new_password: 新密碼
+        :return: 指紋
+        """
+        return get_user_gate().fingerprint(current_password, new_password)
+
+    def get(
+        self, key: str, username: str, current_password: str, new_password: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        查詢已完成的結果
+
+        內容與第一次請求不同時視為新的請求，不返回舊結果。
+
+        :param key: 冪等鍵
+        :param username: 使用者名稱
+        :param current_password: 目前密碼
+        :param new_password: 新密碼
+        :return: 第一次請求的結果，沒有時返回 None
+        """
+        entry = self._cache.get(self._cache_key(username, key))
+        if entry is None:
+            return None
+        fingerprint, result = entry
+        if fingerprint != self._fingerprint(current_password, new_password):
+            logger.debug("冪等鍵對應的請求內容不同，視為新的請求")
+            return None
+        return dict(result)
+
+    def put(
+        self,
+        key: str,
+        username: str,
+        current_password: str,
+        new_password: str,
+        result: Dict[str, Any],
+    ) -> None:
+        """
+        保存已完成的結果
+
+        只保存確定的結果（成功、密碼錯誤、新密碼被拒絕）；後端暫時無法使用等帶有
+        retryable 的失敗不保存，恢復後以同一冪等鍵重試會重新執行。
+
+        :param key: 冪等鍵
+        :param username: 使用者名稱
+        :param current_password: 目前密碼
+        :param new_password: 新密碼
+        :param result: 密碼修改結果
+        """
+        if result.get("retryable"):
+            return
+        fingerprint = self._fingerprint(current_password, new_password)
+        self._cache.set(self._cache_key(username, key), (fingerprint, dict(result)))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        獲取統計資料
+
+        :return: 統計資料字典
+        """
+        return self._cache.get_stats()
+
+
+def normalize_key(key: Optional[str]) -> Optional[str]:
+    """
+    檢查並整理冪等鍵
+
+    :param key: 來自標頭或表單的冪等鍵
+    :return: 有效的冪等鍵，無效或未提供時返回 None
+    """
+    if not key:
+        return None
+    key = key.strip()
+    if not key or len(key) > MAX_KEY_LENGTH:
+        return None
+    return key
+
+
+# 創建全局冪等鍵結果儲存實例
+idempotency_store = IdempotencyStore(
+    max_entries=config.get("idempotency", "max_entries", 10000),
+    ttl_seconds=config.get("idempotency", "ttl_seconds", 3600),
+)
+
+
+def get_idempotency_store() -> IdempotencyStore:
+    """
+    獲取冪等鍵結果儲存實例
+
+    :return: 冪等鍵結果儲存
+    """
+    return idempotency_store
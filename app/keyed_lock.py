@@ -0,0 +1,246 @@
+import os
+import hmac
+import time
+import hashlib
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from app.logger import get_logger
+
+# 獲取日誌記錄器
+logger = get_logger()
+
+
+class _Flight:
+    """一次進行中的操作，供相同請求的等待者共用結果"""
+
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class _KeyEntry:
+    """單一帳戶的鎖與進行中操作表"""
+
+    __slots__ = ("lock", "refs", "flights")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.refs = 0
+        self.flights: Dict[str, _Flight] = {}
+
+
+class KeyedSingleFlight:
+    """
+    以帳戶為鍵的操作閘道
+
+    相同帳戶的操作依序執行；參數完全相同且仍在進行中的請求只會執行一次，
+    結果分享給所有等待者。沒有進行中操作的帳戶會立即從表中移除，
+    因此記憶體用量只與同時進行的帳戶數有關。
+
+    以 use_shared_store() 啟用共用狀態儲存後，帳戶鎖與合併相同請求也跨伺服器工作進程生效。
+    """
+
+    # 共用狀態儲存中保存已完成操作結果的快取名稱
+    FLIGHT_NAMESPACE = "user_gate_flights"
+    # 最多保存的已完成操作結果數
+    MAX_FLIGHT_RESULTS = 10000
+
+    def __init__(self):
+        """
+        初始化操作閘道
+        """
+        self._entries: Dict[str, _KeyEntry] = {}
+        self._lock = threading.Lock()
+        # 每個進程隨機產生的指紋金鑰，避免在記憶體中保留可比對的密碼雜湊
+        self._fingerprint_key = os.urandom(32)
+        self._executed = 0
+        self._coalesced = 0
+        self._contended = 0
+        self._shared = None
+        self.lease_seconds = 300.0
+
+    @property
+    def fingerprint_key(self) -> bytes:
+        """
+        指紋金鑰，主進程傳給伺服器工作進程，所有工作進程才能比對彼此的指紋
+        """
+        return self._fingerprint_key
+
+    def set_fingerprint_key(self, key: bytes) -> None:
+        """
+        使用主進程的指紋金鑰
+
+        :param key: 指紋金鑰
+        """
+        self._fingerprint_key = key
+
+    def use_shared_store(self, store, lease_seconds: float = 300.0) -> None:
+        """
+        改為在共用狀態儲存中取得帳戶鎖並合併其他工作進程中相同的進行中請求
+
+        :param store: 共用狀態儲存
+        :param lease_seconds: 帳戶鎖的有效時間（秒），持有的進程異常終止時的最長等待時間
+        """
+        self._shared = store
+        self.lease_seconds = float(lease_seconds)
+
+    def _count(self, name: str) -> None:
+        """
+        增加統計計數，使用共用狀態儲存時計入所有工作進程的合計
+
+        :param name: 計數名稱
+        """
+        if self._shared is not None:
+            self._shared.incr(f"user_gate.{name}")
+            return
+        with self._lock:
+            setattr(self, f"_{name}", getattr(self, f"_{name}") + 1)
+
+    def fingerprint(self, *parts: str) -> str:
+        """
+        計算請求參數的指紋
+
+        :param parts: 請求參數
+        :return: 指紋字串
+        """
+        message = "\0".join(parts).encode("utf-8")
+        return hmac.new(self._fingerprint_key, message, hashlib.sha256).hexdigest()
+
+    def run(self, key: str, fingerprint: str, func: Callable[[], Any]) -> Any:
+        """
+        在帳戶鎖內執行操作，或等待相同的進行中操作並共用其結果
+
+        :param key: 帳戶鍵
+        :param fingerprint: 請求參數指紋
+        :param func: 要執行的操作
+        :return: 操作結果
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _KeyEntry()
+            entry.refs += 1
+            flight = entry.flights.get(fingerprint)
+            leader = flight is None
+            if leader:
+                flight = entry.flights[fingerprint] = _Flight()
+
+        if not leader:
+            self._count("coalesced")
+        try:
+            if not leader:
+                logger.debug("合併相同的進行中請求")
+                flight.event.wait()
+                if flight.error is not None:
+                    raise flight.error
+                return flight.result
+
+            if not entry.lock.acquire(blocking=False):
+                self._count("contended")
+                logger.debug("相同帳戶有其他操作進行中，等待其完成")
+                entry.lock.acquire()
+            try:
+                if self._shared is not None:
+                    flight.result = self._run_shared(key, fingerprint, func)
+                else:
+                    self._count("executed")
+                    flight.result = func()
+                return flight.result
+            except BaseException as e:
+                flight.error = e
+                raise
+            finally:
+                entry.lock.release()
+                # 先移出進行中表，之後到達的請求會重新執行
+                with self._lock:
+                    del entry.flights[fingerprint]
+                flight.event.set()
+        finally:
+            with self._lock:
+                entry.refs -= 1
+                if entry.refs == 0:
+                    del self._entries[key]
+
+    def _run_shared(self, key: str, fingerprint: str, func: Callable[[], Any]) -> Any:
+        """
+        在所有工作進程共用的帳戶鎖內執行操作
+
+        等待帳戶鎖期間，其他工作進程完成了本請求到達時已在進行中的相同操作，
+        則直接共用其結果（結果必須可以 JSON 編碼）。
+
+        :param key: 帳戶鍵
+        :param fingerprint: 請求參數指紋
+        :param func: 要執行的操作
+        :return: 操作結果
+        """
+        store = self._shared
+        arrived = time.time()
+        owner = f"{os.getpid()}:{threading.get_ident()}"
+        if not store.acquire_lock(key, owner, self.lease_seconds, timeout=0):
+            self._count("contended")
+            logger.debug("相同帳戶在其他工作進程中有操作進行中，等待其完成")
+            store.acquire_lock(key, owner, self.lease_seconds)
+        try:
+            flight_key = f"{key}\0{fingerprint}"
+            previous = store.cache_get(self.FLIGHT_NAMESPACE, flight_key)
+            if previous is not None and (
+                previous["arrived"] <= arrived <= previous["finished"]
+            ):
+                self._count("coalesced")
+                logger.debug("合併其他工作進程中相同的進行中請求")
+                return previous["result"]
+
+            self._count("executed")
+            result = func()
+            store.cache_set(
+                self.FLIGHT_NAMESPACE,
+                flight_key,
+                {"arrived": arrived, "finished": time.time(), "result": result},
+                self.lease_seconds,
+                self.MAX_FLIGHT_RESULTS,
+            )
+            return result
+        finally:
+            store.release_lock(key, owner)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        獲取操作閘道統計資料
+
+        :return: 統計資料字典
+        """
+        if self._shared is not None:
+            counters = self._shared.get_counters("user_gate.")
+            with self._lock:
+                active_keys = len(self._entries)
+            return {
+                "active_keys": active_keys,
+                "executed": counters.get("executed", 0),
+                "coalesced": counters.get("coalesced", 0),
+                "contended": counters.get("contended", 0),
+                "shared": True,
+            }
+        with self._lock:
+            return {
+                "active_keys": len(self._entries),
+                "executed": self._executed,
+                "coalesced": self._coalesced,
+                "contended": self._contended,
+            }
+
+
+# 創建全局帳戶操作閘道實例
+user_gate = KeyedSingleFlight()
+
+
+def get_user_gate() -> KeyedSingleFlight:
+    """
+    獲取帳戶操作閘道實例
+
+    :return: 帳戶操作閘道
+    """
+    return user_gate
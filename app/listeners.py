@@ -0,0 +1,244 @@
+import os
+import sys
+import errno
+import socket
+from typing import Any, Dict, List, Optional
+
+from app.logger import get_logger
+
+# 獲取日誌記錄器
+logger = get_logger()
+
+
+class PortInUseError(OSError):
+    """端口已被佔用"""
+
+
+def _is_addr_in_use(error: OSError) -> bool:
+    # Windows 上端口被佔用時為 WSAEADDRINUSE (10048)
+    return error.errno in (errno.EADDRINUSE, getattr(errno, "WSAEADDRINUSE", 10048))
+
+
+def _listen_tcp(family: int, address: tuple, backlog: int) -> socket.socket:
+    """
+    建立、綁定並開始監聽 TCP socket
+
+    :param family: 位址族 AF_INET 或 AF_INET6
+    :param address: 綁定位址
+    :param backlog: 等待接受的連線數上限
+    :return: 監聽中的 socket
+    """
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    try:
+        if sys.platform == "win32":
+            # Windows 的 SO_REUSEADDR 允許其他程序綁定同一端口，改用獨佔綁定
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_EXCLUSIVEADDRUSE, 1)
+        else:
+            # 重新啟動時不受上次連線的 TIME_WAIT 影響
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if family == socket.AF_INET6:
+            # IPv4 與 IPv6 各自綁定，IPv6 socket 不接受 IPv4 映射位址
+            sock.setsockopt(socket.IPPROTO_IPV6, socket.IPV6_V6ONLY, 1)
+        sock.bind(address)
+        sock.listen(backlog)
+    except OSError as e:
+        sock.close()
+        if _is_addr_in_use(e):
+            raise PortInUseError(e.errno, f"{address[0]}:{address[1]} 已被佔用") from e
+        raise
+    return sock
+
+
+def _listen_unix(path: str, backlog: int) -> socket.socket:
+    """
+    建立並監聽 Unix socket，清除上次執行留下的 socket 文件
+
+    :param path: socket 文件路徑
+    :param backlog: 等待接受的連線數上限
+    :return: 監聽中的 socket
+    """
+    if os.path.exists(path):
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(path)
+        except OSError:
+            # 沒有程序在監聽，是上次執行留下的文件
+            os.remove(path)
+        else:
+            raise PortInUseError(errno.EADDRINUSE, f"Unix socket {path} 已被使用")
+        finally:
+            probe.close()
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.bind(path)
+        sock.listen(backlog)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def _tcp_addresses(host: str, ipv6: bool) -> List[tuple]:
+    """
+    依主機設定決定要監聽的 (位址族, 位址)
+
+    :param host: 配置中的主機地址
+    :param ipv6: 是否同時監聽對應的 IPv6 位址
+    :return: (位址族, 主機) 列表，第一個為主要位址
+    """
+    if host in ("0.0.0.0", ""):
+        addresses = [(socket.AF_INET, "0.0.0.0")]
+        if ipv6:
+            addresses.append((socket.AF_INET6, "::"))
+        return addresses
+    if host in ("localhost", "127.0.0.1"):
+        addresses = [(socket.AF_INET, "127.0.0.1")]
+        if ipv6:
+            addresses.append((socket.AF_INET6, "::1"))
+        return addresses
+    if ":" in host:
+        return [(socket.AF_INET6, host.strip("[]"))]
+    return [(socket.AF_INET, host)]
+
+
+class Listeners:
+    """伺服器自行綁定的監聽 socket，交給 uvicorn 使用"""
+
+    def __init__(
+        self,
+        sockets: List[socket.socket],
+        port: int,
+        requested_port: int,
+        unix_socket: Optional[str] = None,
+        backlog: int = 2048,
+    ):
+        """
+        :param sockets: 監聽中的 socket
+        :param port: 實際使用的端口
+        :param requested_port: 配置中的端口
+        :param unix_socket: Unix socket 文件路徑
+        :param backlog: 等待接受的連線數上限
+        """
+        self.sockets = sockets
+        self.port = port
+        self.requested_port = requested_port
+        self.unix_socket = unix_socket
+        self.backlog = backlog
+
+    @property
+    def addresses(self) -> List[str]:
+        """
+        :return: 監聽位址的文字表示
+        """
+        result = []
+        for sock in self.sockets:
+            if sock.family == socket.AF_INET6:
+                result.append(f"[{sock.getsockname()[0]}]:{sock.getsockname()[1]}")
+            elif sock.family == socket.AF_INET:
+                result.append(f"{sock.getsockname()[0]}:{sock.getsockname()[1]}")
+            else:
+                result.append(f"unix:{self.unix_socket}")
+        return result
+
+    def close(self) -> None:
+        """
+        關閉所有 socket 並刪除 Unix socket 文件
+        """
+        for sock in self.sockets:
+            try:
+                sock.close()
+            except OSError:
+                pass
+        if self.unix_socket:
+            try:
+                os.remove(self.unix_socket)
+            except OSError:
+                pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        獲取監聽狀態（端口改用其他值時只記錄在此，不寫入配置文件）
+
+        :return: 狀態字典
+        """
+        return {
+            "addresses": self.addresses,
+            "port": self.port,
+            "configured_port": self.requested_port,
+            "port_fallback": self.port != self.requested_port,
+            "backlog": self.backlog,
+        }
+
+
+def bind_listeners(
+    host: str,
+    port: int,
+    ipv6: bool = True,
+    unix_socket: str = "",
+    backlog: int = 2048,
+    fallback_attempts: int = 0,
+) -> Listeners:
+    """
+    綁定伺服器的所有監聽 socket；端口被佔用時依序嘗試下一個端口
+
+    同一個端口上的 IPv4 與 IPv6 socket 必須都綁定成功，否則整組改用下一個端口。
+    系統不支援 IPv6 時只監聽 IPv4。
+
+    :param host: 主機地址
+    :param port: 端口，0 表示由系統分配
+    :param ipv6: 是否同時監聽 IPv6
+    :param unix_socket: Unix socket 文件路徑，空字串表示不使用（僅 Linux 等支援的系統）
+    :param backlog: 等待接受的連線數上限
+    :param fallback_attempts: 端口被佔用時最多再嘗試的端口數
+    :return: 監聽 socket 集合
+    :raises PortInUseError: 所有嘗試的端口都被佔用
+    :raises OSError: 無法綁定
+    """
+    addresses = _tcp_addresses(host, ipv6)
+    candidate = port
+    for attempt in range(max(0, int(fallback_attempts)) + 1):
+        sockets: List[socket.socket] = []
+        try:
+            for family, address in addresses:
+                bind_port = candidate
+                if sockets and candidate == 0:
+                    # 由系統分配端口時，其他位址使用相同的端口
+                    bind_port = sockets[0].getsockname()[1]
+                try:
+                    sockets.append(_listen_tcp(family, (address, bind_port), backlog))
+                except PortInUseError:
+                    raise
+                except OSError as e:
+                    if family == socket.AF_INET6 and sockets:
+                        logger.warning(
+                            f"無法監聽 IPv6 位址 {address}，只使用 IPv4: {e}"
+                        )
+                        continue
+                    raise
+        except PortInUseError as e:
+            for sock in sockets:
+                sock.close()
+            if candidate == 0 or attempt >= fallback_attempts:
+                raise
+            logger.warning(f"{e}，嘗試端口 {candidate + 1}")
+            candidate += 1
+            continue
+        except OSError:
+            for sock in sockets:
+                sock.close()
+            raise
+        break
+
+    actual_port = sockets[0].getsockname()[1]
+    path = None
+    if unix_socket:
+        if hasattr(socket, "AF_UNIX") and sys.platform != "win32":
+            try:
+                sockets.append(_listen_unix(unix_socket, backlog))
+                path = unix_socket
+            except OSError as e:
+                logger.error(f"無法監聽 Unix socket {unix_socket}: {e}")
+        else:
+            logger.warning("此系統不支援 Unix socket，忽略 server.unix_socket 設定")
+
+    return Listeners(sockets, actual_port, port, path, backlog)
@@ -0,0 +1,358 @@
+import os
+import re
+import time
+import threading
+from datetime import date, datetime, timedelta
+from logging.handlers import BaseRotatingHandler
+from typing import List, Optional, Tuple
+
+# 壓縮後的副檔名
+COMPRESSED_SUFFIX = ".zst"
+
+
+def log_file_name(prefix: str, extension: str, day: str, part: int = 0) -> str:
+    """
+    組合日誌文件名稱
+
+    :param prefix: 文件名稱前綴，例如 password_change
+    :param extension: 副檔名，例如 log
+    :param day: 日期字串 (YYYY-MM-DD)
+    :param part: 同一天內因大小輪替的序號，0 表示目前寫入中的文件
+    :return: 文件名稱，例如 password_change_2024-01-01.2.log
+    """
+    if part:
+        return f"{prefix}_{day}.{part}.{extension}"
+    return f"{prefix}_{day}.{extension}"
+
+
+def parse_log_name(
+    prefix: str, extension: str, name: str
+) -> Optional[Tuple[str, int, bool]]:
+    """
+    解析日誌文件名稱
+
+    :param prefix: 文件名稱前綴
+    :param extension: 副檔名
+    :param name: 文件名稱
+    :return: (日期, 序號, 是否已壓縮)，名稱不符時返回 None
+    """
+    match = re.fullmatch(
+        rf"{re.escape(prefix)}_(\d{{4}}-\d{{2}}-\d{{2}})(?:\.(\d+))?"
+        rf"\.{re.escape(extension)}({re.escape(COMPRESSED_SUFFIX)})?",
+        name,
+    )
+    if match is None:
+        return None
+    return match.group(1), int(match.group(2) or 0), bool(match.group(3))
+
+
+def list_log_files(directory: str, prefix: str, extension: str) -> List[str]:
+    """
+    依時間順序列出日誌文件（同一天內已輪替的部分在前，寫入中的文件最後）
+
+    :param directory: 日誌目錄
+    :param prefix: 文件名稱前綴
+    :param extension: 副檔名
+    :return: 文件路徑列表
+    """
+    entries = []
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return []
+    for name in names:
+        parsed = parse_log_name(prefix, extension, name)
+        if parsed is not None:
+            day, part, _ = parsed
+            # 序號 0 是當天最新的文件
+            entries.append(((day, part or float("inf")), name))
+    entries.sort()
+    return [os.path.join(directory, name) for _, name in entries]
+
+
+class DailyRotatingFileHandler(BaseRotatingHandler):
+    """
+    依日期與大小輪替的檔案處理器
+
+    寫入 prefix_YYYY-MM-DD.ext，跨日時改寫新日期的文件；當天文件超過 max_bytes
+    時重新命名為 prefix_YYYY-MM-DD.N.ext 後繼續寫入新文件。輪替出的文件交給
+    on_rotate 回呼（通常是背景的 LogMaintenance）處理。
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        prefix: str,
+        extension: str = "log",
+        max_bytes: int = 0,
+        encoding: Optional[str] = "utf-8",
+        on_rotate=None,
+    ):
+        """
+        :param directory: 日誌目錄
+        :param prefix: 文件名稱前綴
+        :param extension: 副檔名
+        :param max_bytes: 單個文件的大小上限，0 表示只依日期輪替
+        :param encoding: 文件編碼
+        :param on_rotate: 文件輪替後以文件路徑呼叫的回呼
+        """
+        self.directory = directory
+        self.prefix = prefix
+        self.extension = extension
+        self.max_bytes = max(0, int(max_bytes))
+        self.on_rotate = on_rotate
+        self._size = 0
+        self._day = date.today().isoformat()
+        self._next_rollover = self._next_midnight()
+        super().__init__(self._path(self._day), "a", encoding=encoding)
+
+    def _open(self):
+        stream = super()._open()
+        # 以記錄寫入的位元組數追蹤文件大小，避免每筆記錄都呼叫 tell()
+        self._size = stream.seek(0, os.SEEK_END)
+        return stream
+
+    def format(self, record) -> str:
+        text = super().format(record)
+        self._size += len(text.encode(self.encoding or "utf-8")) + 1
+        return text
+
+    def _path(self, day: str, part: int = 0) -> str:
+        return os.path.abspath(
+            os.path.join(
+                self.directory, log_file_name(self.prefix, self.extension, day, part)
+            )
+        )
+
+    @staticmethod
+    def _next_midnight() -> float:
+        tomorrow = date.today() + timedelta(days=1)
+        return datetime.combine(tomorrow, datetime.min.time()).timestamp()
+
+    def _next_part(self, day: str) -> int:
+        """
+        找出當天下一個可用的輪替序號
+
+        :param day: 日期字串
+        :return: 序號
+        """
+        highest = 0
+        for name in os.listdir(self.directory):
+            parsed = parse_log_name(self.prefix, self.extension, name)
+            if parsed is not None and parsed[0] == day:
+                highest = max(highest, parsed[1])
+        return highest + 1
+
+    def shouldRollover(self, record) -> bool:
+        if record.created >= self._next_rollover:
+            return True
+        # 以目前大小判斷，避免為了計算長度而重複格式化記錄
+        return bool(self.max_bytes) and self._size >= self.max_bytes
+
+    def doRollover(self) -> None:
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+
+        rotated = None
+        today = date.today().isoformat()
+        if today != self._day:
+            rotated = self.baseFilename
+            self._day = today
+            self.baseFilename = self._path(today)
+        elif os.path.exists(self.baseFilename):
+            rotated = self._path(today, self._next_part(today))
+            self.rotate(self.baseFilename, rotated)
+        self._next_rollover = self._next_midnight()
+        self.stream = self._open()
+
+        if rotated and self.on_rotate is not None:
+            self.on_rotate(rotated)
+
+
+class LogMaintenance:
+    """
+    日誌目錄的背景維護：壓縮輪替出的文件、刪除過期文件並維持總容量上限
+
+    只會壓縮或刪除已註冊的處理器所產生的文件，寫入中的文件不會被處理。
+    """
+
+    # 沒有輪替事件時的定期檢查間隔（秒）
+    INTERVAL_SECONDS = 3600
+
+    def __init__(
+        self,
+        directory: str,
+        max_total_bytes: int = 0,
+        retention_days: int = 0,
+        compress: bool = True,
+    ):
+        """
+        :param directory: 日誌目錄
+        :param max_total_bytes: 目錄內所有文件的總容量上限，0 表示不限制
+        :param retention_days: 文件保留天數，0 表示不限制
+        :param compress: 是否以 zstd 壓縮輪替出的文件
+        """
+        self.directory = directory
+        self.max_total_bytes = max(0, int(max_total_bytes))
+        self.retention_days = max(0, int(retention_days))
+        self.compress = compress
+        self.log = None
+        self._handlers: List[Tuple[DailyRotatingFileHandler, bool]] = []
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._zstd_missing = False
+        self.compressed = 0
+        self.deleted = 0
+
+    def register(self, handler: DailyRotatingFileHandler, compress: bool = True):
+        """
+        註冊處理器，輪替出的文件交給本維護線程處理
+
+        :param handler: 檔案處理器
+        :param compress: 是否壓縮此處理器輪替出的文件
+        """
+        handler.on_rotate = lambda path: self.schedule()
+        self._handlers.append((handler, compress and self.compress))
+
+    def start(self) -> None:
+        """
+        啟動背景維護線程，啟動時先處理一次既有文件
+        """
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="log-maintenance", daemon=True
+        )
+        self._thread.start()
+        self.schedule()
+
+    def schedule(self) -> None:
+        """
+        要求維護線程盡快執行一次維護
+        """
+        self._wakeup.set()
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait(self.INTERVAL_SECONDS)
+            self._wakeup.clear()
+            try:
+                self.run_once()
+            except Exception as e:
+                self._report(f"日誌維護失敗: {e}")
+
+    def _report(self, message: str) -> None:
+        if self.log is not None:
+            self.log.warning(message)
+
+    def _active_files(self) -> set:
+        """
+        :return: 所有處理器寫入中的文件路徑
+        """
+        active = set()
+        for handler, _ in self._handlers:
+            handler.acquire()
+            try:
+                active.add(os.path.abspath(handler.baseFilename))
+            finally:
+                handler.release()
+        return active
+
+    def _owner(self, name: str):
+        """
+        找出產生此文件的處理器設定
+
+        :param name: 文件名稱
+        :return: (處理器, 是否壓縮)，不屬於任何處理器時返回 None
+        """
+        for handler, compress in self._handlers:
+            if name.startswith(handler.prefix + "_"):
+                return handler, compress
+        return None
+
+    def _compress_file(self, path: str) -> Optional[str]:
+        """
+        以 zstd 壓縮文件，完成後刪除原文件
+
+        :param path: 文件路徑
+        :return: 壓縮後的文件路徑，無法壓縮時返回 None
+        """
+        try:
+            import zstandard
+        except ImportError:
+            if not self._zstd_missing:
+                self._zstd_missing = True
+                self._report("未安裝 zstandard，輪替出的日誌文件不會被壓縮")
+            return None
+
+        target = path + COMPRESSED_SUFFIX
+        temp_path = target + ".tmp"
+        with open(path, "rb") as source, open(temp_path, "wb") as destination:
+            zstandard.ZstdCompressor(level=3).copy_stream(source, destination)
+        # 保留原文件的修改時間，讓保留期限與排序以原始時間計算
+        stat = os.stat(path)
+        os.utime(temp_path, (stat.st_atime, stat.st_mtime))
+        os.replace(temp_path, target)
+        os.remove(path)
+        self.compressed += 1
+        return target
+
+    def run_once(self) -> None:
+        """
+        執行一次維護：壓縮、刪除過期文件、維持總容量上限
+        """
+        active = self._active_files()
+        files = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if not entry.is_file():
+                continue
+            path = os.path.abspath(entry.path)
+            owner = self._owner(entry.name)
+            if entry.name.endswith(COMPRESSED_SUFFIX + ".tmp"):
+                # 上次壓縮中斷留下的暫存文件
+                os.remove(path)
+                continue
+            if (
+                owner is not None
+                and owner[1]
+                and path not in active
+                and not entry.name.endswith(COMPRESSED_SUFFIX)
+            ):
+                try:
+                    path = self._compress_file(path) or path
+                except OSError as e:
+                    self._report(f"壓縮日誌文件 {entry.name} 失敗: {e}")
+            stat = os.stat(path)
+            total += stat.st_size
+            if owner is not None and path not in active:
+                files.append((stat.st_mtime, stat.st_size, path))
+
+        files.sort()
+        cutoff = time.time() - self.retention_days * 86400
+        for mtime, size, path in files:
+            expired = self.retention_days and mtime < cutoff
+            over_budget = self.max_total_bytes and total > self.max_total_bytes
+            if not expired and not over_budget:
+                continue
+            try:
+                os.remove(path)
+            except OSError as e:
+                self._report(f"刪除日誌文件 {os.path.basename(path)} 失敗: {e}")
+                continue
+            total -= size
+            self.deleted += 1
+
+    def get_stats(self) -> dict:
+        """
+        獲取維護統計資料
+
+        :return: 統計資料字典
+        """
+        return {
+            "max_total_bytes": self.max_total_bytes,
+            "retention_days": self.retention_days,
+            "compressed": self.compressed,
+            "deleted": self.deleted,
+        }
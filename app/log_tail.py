@@ -0,0 +1,305 @@
+import os
+import asyncio
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from app.log_rotation import COMPRESSED_SUFFIX, list_log_files
+from app.logger import get_logger, get_log_folder
+
+# 獲取日誌記錄器
+logger = get_logger()
+
+
+def read_last_lines(
+    path: str, count: int, end: int, block_size: int = 8192
+) -> List[str]:
+    """
+    從文件的 end 位置往前讀取最後 count 行，只讀取需要的區塊
+
+    :param path: 文件路徑
+    :param count: 行數
+    :param end: 讀取的結束位置（位元組）
+    :param block_size: 每次往前讀取的大小
+    :return: 行列表（舊到新）
+    """
+    if count <= 0 or end <= 0:
+        return []
+    blocks = []
+    newlines = 0
+    position = end
+    with open(path, "rb") as f:
+        # 需要 count + 1 個換行才能確定第一行的開頭
+        while position > 0 and newlines <= count:
+            size = min(block_size, position)
+            position -= size
+            f.seek(position)
+            block = f.read(size)
+            blocks.append(block)
+            newlines += block.count(b"\n")
+    data = b"".join(reversed(blocks))
+    lines = data.split(b"\n")
+    if lines and lines[-1] == b"":
+        lines.pop()
+    if position > 0:
+        # 第一段不是完整的行
+        lines = lines[1:]
+    return [
+        line.decode("utf-8", errors="replace").rstrip("\r") for line in lines[-count:]
+    ]
+
+
+class TailSubscription:
+    """日誌串流的訂閱者，新的行以批次放入事件迴圈中的佇列"""
+
+    # 每個訂閱者最多累積的批次數，超過時丟棄並計數
+    MAX_PENDING_BATCHES = 256
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        """
+        :param loop: 訂閱者所在的事件迴圈
+        """
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=self.MAX_PENDING_BATCHES)
+        self.dropped = 0
+        self.closed = False
+
+    def deliver(self, lines: List[str]) -> None:
+        """
+        在事件迴圈中放入一批新的行（由 call_soon_threadsafe 呼叫）
+
+        :param lines: 新的行
+        """
+        try:
+            self.queue.put_nowait(lines)
+        except asyncio.QueueFull:
+            self.dropped += len(lines)
+
+    def close(self) -> None:
+        """
+        結束串流（在事件迴圈中呼叫），佇列中以 None 表示結束
+        """
+        self.closed = True
+        try:
+            self.queue.put_nowait(None)
+        except asyncio.QueueFull:
+            pass
+
+
+class LogFollower:
+    """
+    追蹤寫入中的日誌文件並將新增的行分送給所有訂閱者
+
+    所有訂閱者共用一個追蹤線程，沒有訂閱者時線程結束。每次輪詢都重新開啟文件，
+    不會持有文件導致 Windows 上的日誌輪替失敗；文件跨日或依大小輪替時，
+    先讀完舊文件剩下的內容再切換到新文件。
+    """
+
+    # 每次讀取的最大位元組數
+    READ_CHUNK = 1024 * 1024
+
+    def __init__(
+        self,
+        directory: str,
+        prefix: str = "password_change",
+        extension: str = "log",
+        poll_interval: float = 0.5,
+    ):
+        """
+        :param directory: 日誌目錄
+        :param prefix: 文件名稱前綴
+        :param extension: 副檔名
+        :param poll_interval: 輪詢間隔（秒）
+        """
+        self.directory = directory
+        self.prefix = prefix
+        self.extension = extension
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._subscribers: Dict[TailSubscription, None] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        # 追蹤中的文件、其 inode 與已分送到的位置（只含完整的行）
+        self._path: Optional[str] = None
+        self._inode = 0
+        self._position = 0
+        self.rotations = 0
+
+    def _active_path(self) -> Optional[str]:
+        """
+        :return: 寫入中的日誌文件路徑，沒有日誌文件時返回 None
+        """
+        files = list_log_files(self.directory, self.prefix, self.extension)
+        if not files or files[-1].endswith(COMPRESSED_SUFFIX):
+            return None
+        return files[-1]
+
+    def _rotated_path(self) -> Optional[str]:
+        """
+        依 inode 找出追蹤中的文件輪替後的新名稱
+
+        :return: 文件路徑，找不到（例如已被壓縮）時返回 None
+        """
+        for path in reversed(
+            list_log_files(self.directory, self.prefix, self.extension)
+        ):
+            try:
+                if os.stat(path).st_ino == self._inode:
+                    return path
+            except OSError:
+                continue
+        return None
+
+    def _sync(self) -> None:
+        """
+        檢查文件是否輪替並讀取新增的行（持有 _lock 時呼叫）
+        """
+        path = self._active_path()
+        if path is None:
+            return
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return
+        if self._path is None:
+            # 從目前文件的結尾開始追蹤
+            self._path, self._inode, self._position = path, stat.st_ino, stat.st_size
+            return
+        if path != self._path or stat.st_ino != self._inode:
+            old_path = self._path if path != self._path else self._rotated_path()
+            if old_path is not None:
+                self._read(old_path)
+            self._path, self._inode, self._position = path, stat.st_ino, 0
+            self.rotations += 1
+        elif stat.st_size < self._position:
+            # 文件被截斷
+            self._position = 0
+        self._read(path)
+
+    def _read(self, path: str) -> None:
+        """
+        從目前位置讀取完整的行並分送給訂閱者
+
+        :param path: 文件路徑
+        """
+        try:
+            f = open(path, "rb")
+        except OSError:
+            return
+        with f:
+            while True:
+                f.seek(self._position)
+                data = f.read(self.READ_CHUNK)
+                end = data.rfind(b"\n")
+                if end < 0:
+                    # 沒有完整的行，寫到一半的行留到下次讀取
+                    return
+                self._position += end + 1
+                self._publish(
+                    [
+                        line.decode("utf-8", errors="replace").rstrip("\r")
+                        for line in data[:end].split(b"\n")
+                    ]
+                )
+                if len(data) < self.READ_CHUNK:
+                    return
+
+    def _publish(self, lines: List[str]) -> None:
+        for subscription in list(self._subscribers):
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, lines)
+            except RuntimeError:
+                # 事件迴圈已關閉
+                self._subscribers.pop(subscription, None)
+
+    def _run(self) -> None:
+        """
+        追蹤線程主迴圈，沒有訂閱者時結束
+        """
+        while True:
+            stopped = self._stop.wait(self.poll_interval)
+            with self._lock:
+                if stopped or not self._subscribers:
+                    # 下次訂閱時從文件結尾重新開始追蹤
+                    self._thread = None
+                    self._path = None
+                    return
+                try:
+                    self._sync()
+                except Exception as e:
+                    logger.warning(f"追蹤日誌文件失敗: {e}")
+
+    def subscribe(
+        self, loop: asyncio.AbstractEventLoop, count: int
+    ) -> Tuple[TailSubscription, List[str]]:
+        """
+        訂閱新增的行，並取得目前追蹤位置之前的最後 count 行
+
+        :param loop: 訂閱者所在的事件迴圈
+        :param count: 先返回的行數
+        :return: (訂閱者, 最後 count 行)
+        """
+        subscription = TailSubscription(loop)
+        with self._lock:
+            self._sync()
+            lines = []
+            if self._path is not None:
+                try:
+                    lines = read_last_lines(self._path, count, self._position)
+                except OSError:
+                    pass
+            self._subscribers[subscription] = None
+            if self._thread is None:
+                self._stop.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name="log-follower", daemon=True
+                )
+                self._thread.start()
+        return subscription, lines
+
+    def unsubscribe(self, subscription: TailSubscription) -> None:
+        """
+        取消訂閱
+
+        :param subscription: 訂閱者
+        """
+        with self._lock:
+            self._subscribers.pop(subscription, None)
+
+    def stop(self) -> None:
+        """
+        停止追蹤線程並結束所有訂閱者的串流，應用程式關閉前呼叫
+        """
+        self._stop.set()
+        with self._lock:
+            subscribers, self._subscribers = list(self._subscribers), {}
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.close)
+            except RuntimeError:
+                pass
+
+    def get_stats(self) -> Dict:
+        """
+        獲取追蹤統計資料
+
+        :return: 統計資料字典
+        """
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "file": os.path.basename(self._path) if self._path else None,
+                "rotations": self.rotations,
+            }
+
+
+# 創建全局日誌追蹤器實例
+log_follower = LogFollower(get_log_folder())
+
+
+def get_log_follower() -> LogFollower:
+    """
+    獲取日誌追蹤器實例
+
+    :return: 日誌追蹤器
+    """
+    return log_follower
@@ -1,9 +1,336 @@
 import os
 import sys
 import json
+import queue
+import atexit
 import logging
+import threading
+import multiprocessing
 from datetime import datetime
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener
+
+from app.log_rotation import DailyRotatingFileHandler, LogMaintenance
+from app.audit_index import AuditIndex, AUDIT_PREFIX, AUDIT_EXTENSION
+from app.request_context import RequestIdFilter
+
+
+class LazyMessage:
+    """
+    延遲格式化的日誌訊息
+
+    記錄日誌時只保存欄位，處理器實際輸出時才呼叫 __str__ 或 fields()。
+    子類的實例建立後不可修改，才能不經複製直接交給寫入線程。
+    """
+
+    __slots__ = ()
+
+    # 是否寫入審計日誌
+    audit = False
+
+    def fields(self):
+        """
+        :return: 結構化欄位字典
+        """
+        return {}
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """將記錄格式化為單行 JSON，延遲格式化的訊息會展開為結構化欄位"""
+
+    def format(self, record):
+        data = {
+            "time": datetime.fromtimestamp(record.created).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+        }
+        request_id = getattr(record, "request_id", "-")
+        if request_id != "-":
+            data["request_id"] = request_id
+        if isinstance(record.msg, LazyMessage):
+            data.update(record.msg.fields())
+        else:
+            data["message"] = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data["exception"] = record.exc_text
+        return json.dumps(data, ensure_ascii=False)
+
+
+class AuditRecordFilter(logging.Filter):
+    """只接受審計事件的過濾器"""
+
+    def filter(self, record):
+        return getattr(record.msg, "audit", False)
+
+
+class _DeferredFlushMixin:
+    """寫入線程批次處理記錄時延後 flush，整批寫完後再 flush 一次"""
+
+    defer_flush = False
+
+    def flush(self):
+        if not self.defer_flush:
+            super().flush()
+
+
+class BatchStreamHandler(_DeferredFlushMixin, logging.StreamHandler):
+    """可批次 flush 的主控台處理器"""
+
+
+class BatchRotatingFileHandler(_DeferredFlushMixin, DailyRotatingFileHandler):
+    """可批次 flush、依日期與大小輪替的檔案處理器"""
+
+
+class IndexedAuditHandler(BatchRotatingFileHandler):
+    """寫入審計日誌並同時記錄每行位元組位置索引的處理器"""
+
+    def __init__(self, directory, index, max_bytes=0):
+        """
+        :param directory: 日誌目錄
+        :param index: 審計日誌索引
+        :param max_bytes: 單個文件的大小上限
+        """
+        self.index = index
+        super().__init__(directory, AUDIT_PREFIX, AUDIT_EXTENSION, max_bytes=max_bytes)
+        # 開始寫入前先補齊寫入中文件的索引，之後的記錄才能直接接在後面
+        index.rebuild_file(self.baseFilename)
+
+    def format(self, record):
+        offset = self._size
+        text = super().format(record)
+        fields = record.msg.fields() if isinstance(record.msg, LazyMessage) else {}
+        self.index.add(self.baseFilename, record.created, offset, fields)
+        return text
+
+    def flush(self):
+        super().flush()
+        # 日誌內容寫入後才寫入索引，查詢不會讀到尚未寫入的位置
+        if not self.defer_flush:
+            self.index.flush()
+
+    def rotate(self, source, dest):
+        super().rotate(source, dest)
+        self.index.flush()
+        self.index.rename(source, dest)
+
+
+class ForwardingLogHandler(QueueHandler):
+    """
+    將記錄轉送到父進程的處理器，由子進程（伺服器工作進程、後端工作進程）的寫入線程使用
+
+    記錄已由 QueuedLogHandler 整理為可序列化的形式，審計事件保持為延遲格式化的訊息，
+    主進程才能同樣寫入審計日誌與索引。
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class StartupBufferHandler(logging.Handler):
+    """套用日誌配置前暫存記錄的處理器，超過上限的記錄只計數"""
+
+    CAPACITY = 10000
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+        self.dropped = 0
+
+    def emit(self, record):
+        if len(self.records) < self.CAPACITY:
+            self.records.append(record)
+        else:
+            self.dropped += 1
+
+    def drain(self):
+        """
+        取出所有暫存的記錄
+
+        :return: 記錄列表
+        """
+        self.acquire()
+        try:
+            records, self.records = self.records, []
+        finally:
+            self.release()
+        return records
+
+
+class LogWriter:
+    """日誌寫入線程，從佇列取出記錄並批次交給實際的處理器"""
+
+    # 每批最多處理的記錄數
+    BATCH_SIZE = 256
+
+    def __init__(self, log_queue, handlers):
+        """
+        :param log_queue: 日誌記錄佇列
+        :param handlers: 實際輸出的處理器列表
+        """
+        self.queue = log_queue
+        self.handlers = handlers
+        self._dispatch_lock = threading.Lock()
+        self._thread = None
+        self.running = False
+        self.batches = 0
+        self.written = 0
+
+    def start(self):
+        """啟動寫入線程"""
+        self.running = True
+        self._thread = threading.Thread(
+            target=self._run, name="log-writer", daemon=True
+        )
+        self._thread.start()
+
+    def dispatch(self, records):
+        """
+        將一批記錄交給處理器並在最後 flush
+
+        :param records: 日誌記錄列表
+        """
+        with self._dispatch_lock:
+            for handler in self.handlers:
+                handler.defer_flush = True
+            try:
+                for record in records:
+                    for handler in self.handlers:
+                        if record.levelno >= handler.level:
+                            handler.handle(record)
+            finally:
+                for handler in self.handlers:
+                    handler.defer_flush = False
+                    handler.flush()
+            self.batches += 1
+            self.written += len(records)
+
+    def _run(self):
+        """寫入線程主迴圈，收到 None 時結束"""
+        stopping = False
+        while not stopping:
+            records = [self.queue.get()]
+            while len(records) < self.BATCH_SIZE:
+                try:
+                    records.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            if records[-1] is None:
+                stopping = True
+            records = [record for record in records if record is not None]
+            if records:
+                self.dispatch(records)
+
+    def is_alive(self):
+        """
+        :return: 寫入線程是否正在運行
+        """
+        return self.running and self._thread is not None and self._thread.is_alive()
+
+    def stop(self, timeout=5.0):
+        """
+        寫入佇列中剩餘的記錄後停止寫入線程
+
+        :param timeout: 等待的最長時間（秒）
+        """
+        if not self.running:
+            return
+        self.running = False
+        self.queue.put(None)
+        self._thread.join(timeout)
+        for handler in self.handlers:
+            handler.flush()
+
+
+class QueuedLogHandler(QueueHandler):
+    """將記錄放入有界佇列的處理器，佇列滿時依策略阻塞或丟棄記錄"""
+
+    POLICIES = ("block", "drop_debug", "drop_oldest")
+
+    def __init__(self, log_queue, writer, policy="drop_debug"):
+        """
+        :param log_queue: 有界的日誌記錄佇列
+        :param writer: 日誌寫入線程
+        :param policy: 佇列滿時的策略：block 等待、drop_debug 丟棄 DEBUG 記錄、
+            drop_oldest 丟棄最舊的記錄
+        """
+        super().__init__(log_queue)
+        self.writer = writer
+        self.policy = policy if policy in self.POLICIES else "drop_debug"
+        self._stats_lock = threading.Lock()
+        self.enqueued = 0
+        self.dropped = {}
+
+    def _count_drop(self, record):
+        with self._stats_lock:
+            self.dropped[record.levelname] = self.dropped.get(record.levelname, 0) + 1
+
+    def prepare(self, record):
+        # 延遲格式化的訊息不可修改，直接交給寫入線程格式化
+        if isinstance(record.msg, LazyMessage) and not record.exc_info:
+            return record
+        return super().prepare(record)
+
+    def emit(self, record):
+        # 寫入線程停止後（應用程式關閉期間）直接同步輸出
+        if not self.writer.running:
+            self.writer.dispatch([record])
+            return
+        try:
+            self.enqueue(self.prepare(record))
+        except Exception:
+            self.handleError(record)
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if self.policy == "drop_debug" and record.levelno <= logging.DEBUG:
+                self._count_drop(record)
+                return
+            if self.policy == "drop_oldest":
+                while True:
+                    try:
+                        oldest = self.queue.get_nowait()
+                        if oldest is None:
+                            # 不可丟棄停止信號
+                            self.queue.put_nowait(None)
+                            self.writer.dispatch([record])
+                            return
+                        self._count_drop(oldest)
+                    except queue.Empty:
+                        pass
+                    try:
+                        self.queue.put_nowait(record)
+                        break
+                    except queue.Full:
+                        continue
+            else:
+                self.queue.put(record)
+        with self._stats_lock:
+            self.enqueued += 1
+
+    def get_stats(self):
+        """
+        獲取日誌佇列統計資料
+
+        :return: 統計資料字典
+        """
+        with self._stats_lock:
+            dropped = dict(self.dropped)
+            enqueued = self.enqueued
+        return {
+            "policy": self.policy,
+            "queue_size": self.queue.maxsize,
+            "queued": self.queue.qsize(),
+            "enqueued": enqueued,
+            "written": self.writer.written,
+            "batches": self.writer.batches,
+            "writer_alive": self.writer.is_alive(),
+            "dropped": sum(dropped.values()),
+            "dropped_by_level": dropped,
+        }
 
 
 class Logger:
@@ -11,26 +338,37 @@ class Logger:
 
     DEFAULT_LOG_LEVEL = logging.INFO
     DEFAULT_MAX_FILE_SIZE_MB = 10
-    DEFAULT_BACKUP_COUNT = 5
+    DEFAULT_MAX_TOTAL_SIZE_MB = 500
+    DEFAULT_RETENTION_DAYS = 90
+    DEFAULT_COMPRESS_ROTATED = True
+    DEFAULT_QUEUE_SIZE = 10000
+    DEFAULT_QUEUE_FULL_POLICY = "drop_debug"
+    DEFAULT_AUDIT_LOG = True
 
     def __init__(self, log_level=None):
         """
         初始化日誌記錄器
 
-        :param log_level: 日誌級別，預設為INFO
+        配置由配置管理器載入後以 configure() 套用；在此之前的記錄先暫存在記憶體中，
+        套用配置後再依配置的級別寫入。
+
+        :param log_level: 日誌級別，預設使用配置中的級別
         """
         self.logger = logging.getLogger("password_change_app")
-        self.config = self._load_config()
-
-        # 設置日誌級別
-        if log_level is None:
-            # 從配置獲取日誌級別
-            log_level_str = self.config.get("logging", {}).get("level", "INFO")
-            log_level = self._get_log_level_from_str(log_level_str)
-
-        self.logger.setLevel(log_level)
+        self.log_level = log_level
         self.log_folder = self._get_log_folder()
-        self._setup_logger()
+        self.configured = False
+        self.logging_config = {}
+        self.maintenance = None
+        self.audit_index = None
+        self.child_listeners = []
+
+        # 套用配置前先記錄所有級別，套用後再依配置的級別過濾
+        self.logger.setLevel(logging.DEBUG)
+        self.startup_handler = StartupBufferHandler()
+        self.startup_handler.addFilter(RequestIdFilter())
+        self.logger.addHandler(self.startup_handler)
+        atexit.register(self._flush_startup_records)
 
     def _get_log_level_from_str(self, level_str):
         """
@@ -48,63 +386,9 @@ class Logger:
         }
         return level_map.get(level_str.upper(), logging.INFO)
 
-    def _load_config(self):
-        """
-        載入配置文件，如果不存在則返回空字典
-
-        :return: 配置字典
-        """
-        # 獲取配置文件路徑
-        config_path = self._get_config_path("config.json")
-
-        # 如果配置文件存在，載入它
-        if os.path.exists(config_path):
-            try:
-                with open(config_path, "r", encoding="utf-8") as f:
-                    return json.load(f)
-            except Exception:
-                # 如果無法載入配置，使用默認值
-                pass
-
-        # 返回空字典
-        return {}
-
-    def _get_config_path(self, config_file):
-        """
-        獲取配置文件的完整路徑
-
-        :param config_file: 配置文件名稱
-        :return: 配置文件完整路徑
-        """
-        # 嘗試多個可能的路徑位置
-        possible_paths = []
-
-        # 確定應用程式根目錄
-        if getattr(sys, "frozen", False):
-            # 如果是打包後的執行檔 (PyInstaller 或 Nuitka)
-            base_dir = os.path.dirname(os.path.abspath(sys.executable))
-            possible_paths.append(os.path.join(base_dir, config_file))
-
-            # Nuitka 打包後可能的其他路徑
-            possible_paths.append(os.path.join(os.path.dirname(base_dir), config_file))
-            possible_paths.append(config_file)  # 當前工作目錄
-        else:
-            # 如果是直接執行的 Python 程式
-            base_dir = os.path.dirname(os.path.abspath(__file__))
-            possible_paths.append(os.path.join(base_dir, config_file))
-            possible_paths.append(config_file)  # 當前工作目錄
-
-        # 嘗試找到存在的配置文件
-        for path in possible_paths:
-            if os.path.exists(path):
-                return path
-
-        # 如果找不到存在的配置文件，使用第一個路徑作為默認路徑
-        return possible_paths[0]
-
     def _get_log_folder(self):
         """
-        獲取日誌文件夾路徑
+        獲取日誌文件夾路徑，使用第一個可以創建的目錄
 
         :return: 日誌文件夾路徑
         """
@@ -124,64 +408,161 @@ class Logger:
             possible_log_dirs.append(os.path.join(base_dir, "logs"))
             possible_log_dirs.append("logs")  # 相對於當前工作目錄
 
-        # 使用第一個路徑作為日誌目錄
-        log_dir = possible_log_dirs[0]
-
-        # 確保目錄存在
-        for dir_path in possible_log_dirs:
-            os.makedirs(dir_path, exist_ok=True)
-
-        # 嘗試寫入測試文件，確認目錄可寫
         for dir_path in possible_log_dirs:
             try:
-                test_file = os.path.join(dir_path, ".test_write")
-                with open(test_file, "w") as f:
-                    f.write("test")
-                os.remove(test_file)
-                log_dir = dir_path
-                break
-            except (IOError, PermissionError):
+                os.makedirs(dir_path, exist_ok=True)
+                return dir_path
+            except OSError:
                 continue
 
-        return log_dir
+        # 都無法創建時使用第一個路徑，開啟日誌文件時會回報錯誤
+        return possible_log_dirs[0]
+
+    def configure(self, logging_config):
+        """
+        套用日誌配置：建立處理器並寫入套用前暫存的記錄
+
+        :param logging_config: 配置中的 logging 區段（支援 get(key, default)）
+        """
+        if self.configured:
+            return
+        self.configured = True
+        self.logging_config = logging_config
+        if self.log_level is None:
+            self.log_level = self._get_log_level_from_str(
+                logging_config.get("level", "INFO")
+            )
+        self.logger.setLevel(self.log_level)
+        if multiprocessing.current_process().name != "MainProcess":
+            # 子進程（伺服器工作進程、後端工作進程）不寫入日誌文件，也不執行輪替與索引維護，
+            # 記錄暫存到 forward_to() 開始轉送給父進程為止。spawn 啟動的子進程在匯入主模組前
+            # 就已設定進程名稱，parent_process() 則要到匯入之後才可用
+            return
+        self.logger.removeHandler(self.startup_handler)
+        self._setup_logger(logging_config)
+        self._replay_startup_records()
+
+    def _replay_startup_records(self):
+        """
+        依配置的級別寫入套用前暫存的記錄
+        """
+        for record in self.startup_handler.drain():
+            if record.levelno >= self.log_level:
+                self.queue_handler.handle(record)
+
+    def forward_to(self, log_queue, audit_queries=True):
+        """
+        子進程：將記錄轉送到父進程寫入，並轉送之前暫存的記錄
+
+        :param log_queue: 父進程接收記錄的 multiprocessing 佇列
+        :param audit_queries: 是否需要讀取審計日誌索引以查詢（後端工作進程不需要）
+        """
+        self.logger.removeHandler(self.startup_handler)
+        # 審計日誌與索引由主進程寫入，伺服器工作進程只讀取索引以查詢
+        if audit_queries and self.logging_config.get(
+            "audit_log", self.DEFAULT_AUDIT_LOG
+        ):
+            self.audit_index = AuditIndex(self.log_folder)
+        self._start_writer([ForwardingLogHandler(log_queue)], self.logging_config)
+        self._replay_startup_records()
+
+    def listen_to_children(self, log_queue):
+        """
+        父進程：接收子進程轉送的記錄，交給本進程的寫入線程寫入
+
+        :param log_queue: multiprocessing 佇列
+        """
+        listener = QueueListener(log_queue, self.queue_handler)
+        listener.start()
+        self.child_listeners.append(listener)
+
+    def _flush_startup_records(self):
+        """
+        程式結束前仍未套用配置時，以默認配置寫入暫存的記錄，避免遺失
+        """
+        if not self.configured and self.startup_handler.records:
+            self.configure({})
+            self.writer.stop()
+
+    def _setup_logger(self, logging_config):
+        """
+        設置日誌格式和處理器
 
-    def _setup_logger(self):
-        """設置日誌格式和處理器"""
+        :param logging_config: 配置中的 logging 區段
+        """
         # 清除之前的處理器
         if self.logger.handlers:
             self.logger.handlers.clear()
 
-        # 格式化器
+        # 格式化器（request_id 由佇列處理器上的過濾器標記）
         formatter = logging.Formatter(
-            "%(asctime)s - %(levelname)s - %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
+            "%(asctime)s - %(levelname)s - [%(request_id)s] %(message)s",
+            datefmt="%Y-%m-%d %H:%M:%S",
         )
 
         # 控制台處理器
-        console_handler = logging.StreamHandler()
+        console_handler = BatchStreamHandler()
         console_handler.setFormatter(formatter)
-        self.logger.addHandler(console_handler)
-
-        # 檔案處理器 - 每日日誌文件
-        today = datetime.now().strftime("%Y-%m-%d")
-        log_file = os.path.join(self.log_folder, f"password_change_{today}.log")
+        self.console_handler = console_handler
 
-        # 從配置獲取日誌文件大小和備份數量
-        max_file_size_mb = self.config.get("logging", {}).get(
+        # 從配置獲取日誌文件大小與保留設定
+        max_file_size_mb = logging_config.get(
             "max_file_size_mb", self.DEFAULT_MAX_FILE_SIZE_MB
         )
-        backup_count = self.config.get("logging", {}).get(
-            "backup_count", self.DEFAULT_BACKUP_COUNT
+        max_total_size_mb = logging_config.get(
+            "max_total_size_mb", self.DEFAULT_MAX_TOTAL_SIZE_MB
+        )
+        retention_days = logging_config.get(
+            "retention_days", self.DEFAULT_RETENTION_DAYS
+        )
+
+        # 輪替出的文件由背景線程壓縮，並依保留天數與總容量上限刪除最舊的文件
+        self.maintenance = LogMaintenance(
+            self.log_folder,
+            max_total_bytes=max_total_size_mb * 1024 * 1024,
+            retention_days=retention_days,
+            compress=logging_config.get(
+                "compress_rotated", self.DEFAULT_COMPRESS_ROTATED
+            ),
         )
 
-        # 使用 RotatingFileHandler 限制單個日誌文件大小
-        file_handler = RotatingFileHandler(
-            log_file,
-            maxBytes=max_file_size_mb * 1024 * 1024,  # 轉換為字節
-            backupCount=backup_count,  # 備份數量
-            encoding="utf-8",
+        # 檔案處理器 - 每日日誌文件，跨日或超過大小限制時輪替
+        file_handler = BatchRotatingFileHandler(
+            self.log_folder,
+            "password_change",
+            "log",
+            max_bytes=max_file_size_mb * 1024 * 1024,  # 轉換為字節
         )
         file_handler.setFormatter(formatter)
-        self.logger.addHandler(file_handler)
+        self.maintenance.register(file_handler)
+        handlers = [console_handler, file_handler]
+
+        # 審計事件另外以 JSON Lines 格式寫入 audit_*.jsonl（不壓縮，以便直接查詢），
+        # 並在 logs/.index 中維護每行的位元組位置索引
+        self.audit_index = None
+        if logging_config.get("audit_log", self.DEFAULT_AUDIT_LOG):
+            self.audit_index = AuditIndex(self.log_folder)
+            audit_handler = IndexedAuditHandler(
+                self.log_folder,
+                self.audit_index,
+                max_bytes=max_file_size_mb * 1024 * 1024,
+            )
+            audit_handler.setFormatter(JsonLinesFormatter())
+            audit_handler.addFilter(AuditRecordFilter())
+            self.maintenance.register(audit_handler, compress=False)
+            handlers.append(audit_handler)
+
+        self._start_writer(handlers, logging_config)
+        self.maintenance.log = self.logger
+        self.maintenance.start()
+        if self.audit_index is not None:
+            # 其餘文件的索引在背景補齊
+            threading.Thread(
+                target=self.audit_index.rebuild,
+                args=(audit_handler.baseFilename,),
+                name="audit-index",
+                daemon=True,
+            ).start()
 
         # 記錄應用程式啟動
         self.logger.info("=" * 50)
@@ -189,9 +570,29 @@ class Logger:
         self.logger.info(f"日誌存儲在: {self.log_folder}")
         self.logger.info(f"日誌級別: {logging.getLevelName(self.logger.level)}")
         self.logger.info(
-            f"日誌文件大小限制: {max_file_size_mb}MB，保留 {backup_count} 個備份"
+            f"日誌文件大小限制: {max_file_size_mb}MB，總容量上限: {max_total_size_mb}MB，"
+            f"保留 {retention_days} 天"
         )
 
+    def _start_writer(self, handlers, logging_config):
+        """
+        建立日誌佇列並啟動寫入線程
+
+        :param handlers: 實際輸出的處理器列表
+        :param logging_config: 配置中的 logging 區段
+        """
+        # 實際的輸出由寫入線程執行，記錄日誌的線程只需將記錄放入佇列
+        queue_size = logging_config.get("queue_size", self.DEFAULT_QUEUE_SIZE)
+        policy = logging_config.get("queue_full_policy", self.DEFAULT_QUEUE_FULL_POLICY)
+        log_queue = queue.Queue(maxsize=max(1, int(queue_size)))
+        self.writer = LogWriter(log_queue, handlers)
+        self.queue_handler = QueuedLogHandler(log_queue, self.writer, policy)
+        # 在記錄日誌的線程中標記請求識別碼，寫入線程中已讀不到請求的上下文
+        self.queue_handler.addFilter(RequestIdFilter())
+        self.logger.addHandler(self.queue_handler)
+        self.writer.start()
+        atexit.register(self.writer.stop)
+
     def get_logger(self):
         """
         獲取日誌記錄器實例
@@ -221,7 +622,8 @@ class Logger:
 
 
 # 創建全局日誌記錄器實例
-app_logger = Logger().get_logger()
+logger_instance = Logger()
+app_logger = logger_instance.get_logger()
 
 
 def get_logger():
@@ -231,3 +633,94 @@ def get_logger():
     :return: 日誌記錄器
     """
     return app_logger
+
+
+def set_console_level(level):
+    """
+    設置主控台日誌的輸出級別（不影響日誌文件）
+
+    :param level: logging級別常數
+    """
+    logger_instance.console_handler.setLevel(level)
+
+
+def set_log_level(level_name):
+    """
+    設置日誌記錄器的級別
+
+    :param level_name: 字符串日誌級別
+    """
+    level = logging.getLevelName(level_name.upper())
+    if isinstance(level, int) and level != app_logger.level:
+        app_logger.setLevel(level)
+        app_logger.info(f"日誌級別已變更為: {logging.getLevelName(level)}")
+
+
+def get_log_stats():
+    """
+    獲取日誌佇列統計資料
+
+    :return: 統計資料字典
+    """
+    maintenance = logger_instance.maintenance
+    return {
+        **logger_instance.queue_handler.get_stats(),
+        # 伺服器工作進程不維護日誌文件
+        "maintenance": maintenance.get_stats() if maintenance is not None else None,
+    }
+
+
+def configure_logging(logging_config):
+    """
+    套用日誌配置，由配置管理器在載入配置後呼叫一次
+
+    :param logging_config: 配置中的 logging 區段
+    """
+    logger_instance.configure(logging_config)
+
+
+def forward_logging(log_queue, audit_queries=True):
+    """
+    子進程將日誌轉送給父進程寫入
+
+    :param log_queue: 父進程接收記錄的 multiprocessing 佇列
+    :param audit_queries: 是否需要讀取審計日誌索引以查詢
+    """
+    logger_instance.forward_to(log_queue, audit_queries)
+
+
+def receive_worker_logs(log_queue):
+    """
+    開始接收子進程（伺服器工作進程或後端工作進程）轉送的日誌
+
+    :param log_queue: multiprocessing 佇列
+    """
+    logger_instance.listen_to_children(log_queue)
+
+
+def get_log_folder():
+    """
+    獲取日誌目錄
+
+    :return: 日誌目錄路徑
+    """
+    return logger_instance.log_folder
+
+
+def get_audit_index():
+    """
+    獲取審計日誌索引
+
+    :return: 審計日誌索引，未啟用審計日誌時返回 None
+    """
+    return logger_instance.audit_index
+
+
+def shutdown_logging():
+    """
+    寫入佇列中剩餘的日誌並停止寫入線程，之後的日誌改為同步輸出
+    """
+    # 先接收完子進程已轉送的記錄
+    while logger_instance.child_listeners:
+        logger_instance.child_listeners.pop().stop()
+    logger_instance.writer.stop()
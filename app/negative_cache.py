@@ -0,0 +1,160 @@
+from typing import Any, Dict
+
+from app.cache import TTLCache, SharedTTLCache
+from app.logger import get_logger
+from app.config_manager import get_config
+from app.keyed_lock import get_user_gate
+
+# 獲取日誌記錄器
+logger = get_logger()
+
+# 獲取配置管理器
+config = get_config()
+
+
+class NegativeCache:
+    """
+    否定結果快取
+
+    記錄後端確認不存在的使用者，以及近期驗證失敗的帳戶與密碼組合，
+    讓重複的錯誤請求不必再呼叫 LogonUser。密碼只以每個進程隨機金鑰的
+    HMAC 指紋保存。
+    """
+
+    def __init__(
+        self,
+        unknown_user_ttl: float = 300,
+        failed_verify_ttl: float = 10,
+        max_entries: int = 10000,
+    ):
+        """
+        初始化否定結果快取
+
+        :param unknown_user_ttl: 不存在的使用者保存時間（秒）
+        :param failed_verify_ttl: 驗證失敗的組合保存時間（秒）
+        :param max_entries: 每種快取的最大項目數
+        """
+        self._unknown_users = TTLCache(max_entries, unknown_user_ttl)
+        self._failed_verifications = TTLCache(max_entries, failed_verify_ttl)
+
+    def use_shared_store(self, store) -> None:
+        """
+        改為保存在共用狀態儲存中，所有伺服器工作進程共用否定結果
+
+        :param store: 共用狀態儲存
+        """
+        self._unknown_users = SharedTTLCache(
+            store,
+            "unknown_users",
+            self._unknown_users.max_entries,
+            self._unknown_users.ttl_seconds,
+        )
+        self._failed_verifications = SharedTTLCache(
+            store,
+            "failed_verifications",
+            self._failed_verifications.max_entries,
+            self._failed_verifications.ttl_seconds,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        """
+        是否啟用否定結果快取
+        """
+        return config.snapshot.negative_cache.enabled
+
+    @staticmethod
+    def _user_key(username: str) -> str:
+        """
+        計算使用者鍵（Windows 帳戶名稱不區分大小寫）
+
+        :param username: 使用者名稱
+        :return: 使用者鍵
+        """
+        return username.casefold()
+
+    def _credential_key(self, username: str, password: str) -> str:
+        """
+        計算帳戶與密碼組合的指紋
+
+        :param username: 使用者名稱
+        :param password: 密碼
+        :return: 指紋
+        """
+        return get_user_gate().fingerprint(self._user_key(username), password)
+
+    def is_known_failure(self, username: str, password: str) -> bool:
+        """
+        檢查是否為已知會失敗的驗證
+
+        :param username: 使用者名稱
+        :param password: 密碼
+        :return: 使用者不存在或此組合近期驗證失敗時返回 True
+        """
+        if not self.enabled:
+            return False
+        if self._unknown_users.get(self._user_key(username)):
+            return True
+        return bool(
+            self._failed_verifications.get(self._credential_key(username, password))
+        )
+
+    def record_unknown_user(self, username: str) -> None:
+        """
+        記錄不存在的使用者
+
+        :param username: 使用者名稱
+        """
+        if self.enabled:
+            self._unknown_users.set(self._user_key(username), True)
+
+    def record_failed_verification(self, username: str, password: str) -> None:
+        """
+        記錄驗證失敗的帳戶與密碼組合
+
+        :param username: 使用者名稱
+        :param password: 密碼
+        """
+        if self.enabled:
+            self._failed_verifications.set(
+                self._credential_key(username, password), True
+            )
+
+    def record_password_changed(self, username: str, new_password: str) -> None:
+        """
+        密碼修改成功後移除與新密碼衝突的否定結果
+
+        :param username: 使用者名稱
+        :param new_password: 新密碼
+        """
+        self._unknown_users.delete(self._user_key(username))
+        self._failed_verifications.delete(self._credential_key(username, new_password))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        獲取統計資料
+
+        :return: 統計資料字典
+        """
+        return {
+            "enabled": self.enabled,
+            "unknown_users": self._unknown_users.get_stats(),
+            "failed_verifications": self._failed_verifications.get_stats(),
+        }
+
+
+# 創建全局否定結果快取實例
+negative_cache = NegativeCache(
+    unknown_user_ttl=config.get("negative_cache", "unknown_user_ttl_seconds", 300),
+    failed_verify_ttl=config.get("negative_cache", "failed_verify_ttl_seconds", 10),
+    max_entries=config.get("negative_cache", "max_entries", 10000),
+)
+
+
+def get_negative_cache() -> NegativeCache:
+    """
+    獲取否定結果快取實例
+
+    :return: 否定結果快取
+    """
+    return negative_cache
@@ -0,0 +1,357 @@
+import time
+import queue
+import threading
+import multiprocessing
+from typing import Any, Dict, Optional
+
+from app.logger import get_logger, forward_logging, receive_worker_logs
+from app.request_context import get_request_id, request_id_var
+
+# 獲取日誌記錄器
+logger = get_logger()
+
+
+def _worker_main(conn, settings: Dict[str, Any], log_queue) -> None:
+    """
+    工作進程入口，在子進程中創建真正的憑證後端並處理呼叫
+
+    :param conn: 與主進程通訊的管道
+    :param settings: backend 配置區段（不含進程隔離設定）
+    :param log_queue: 將日誌轉送給主進程的佇列
+    """
+    # 日誌文件只由主進程寫入、輪替與壓縮
+    forward_logging(log_queue, audit_queries=False)
+
+    from app.backends import create_backend
+
+    backend = create_backend(settings)
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            break
+        if message is None:
+            break
+
+        # 請求識別碼隨每次呼叫傳入，子進程中的日誌也能標記
+        method, args, request_id = message
+        request_id_var.set(request_id)
+        try:
+            result = getattr(backend, method)(*args)
+            conn.send(("ok", result))
+        except Exception as e:
+            conn.send(("error", type(e).__name__, str(e)))
+
+
+class _Worker:
+    """工作進程的包裝，記錄管道與呼叫次數"""
+
+    def __init__(self, context, settings: Dict[str, Any], log_queue):
+        """
+        啟動工作進程
+
+        :param context: multiprocessing 上下文
+        :param settings: backend 配置區段
+        :param log_queue: 工作進程轉送日誌的佇列
+        """
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main, args=(child_conn, settings, log_queue), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.calls = 0
+
+    def stop(self, kill: bool = False) -> None:
+        """
+        停止工作進程
+
+        :param kill: 是否強制終止
+        """
+        try:
+            if kill:
+                self.process.kill()
+            else:
+                self.conn.send(None)
+        except Exception:
+            pass
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(timeout=1)
+        self.conn.close()
+
+
+class ProcessBackendPool:
+    """憑證後端進程池，將後端呼叫隔離在預先啟動的子進程中執行"""
+
+    def __init__(
+        self,
+        settings: Dict[str, Any],
+        workers: int = 2,
+        max_calls_per_worker: int = 1000,
+        call_timeout: float = 30.0,
+    ):
+        """
+        初始化並預先啟動工作進程
+
+        :param settings: 在子進程中創建後端所用的 backend 配置區段
+        :param workers: 工作進程數量
+        :param max_calls_per_worker: 工作進程處理多少次呼叫後回收
+        :param call_timeout: 單次呼叫的預設期限（秒）
+        """
+        self.settings = settings
+        self.workers = max(1, int(workers))
+        self.max_calls_per_worker = max(1, int(max_calls_per_worker))
+        self.call_timeout = float(call_timeout)
+        self._context = multiprocessing.get_context("spawn")
+        self._log_queue = self._context.Queue()
+        receive_worker_logs(self._log_queue)
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._closed = False
+        # 縮減工作進程數後尚待停止的工作進程數，由歸還或取代工作進程時扣除
+        self._retiring = 0
+        self._calls = 0
+        self._errors = 0
+        self._timeouts = 0
+        self._crashes = 0
+        self._recycled = 0
+        self._spawned = 0
+
+        for _ in range(self.workers):
+            self._idle.put(self._spawn())
+        logger.info(
+            f"後端進程池已啟動, 工作進程數: {self.workers}, "
+            f"回收門檻: {self.max_calls_per_worker} 次, 呼叫期限: {self.call_timeout}s"
+        )
+
+    def _spawn(self) -> _Worker:
+        """
+        啟動新的工作進程
+
+        :return: 工作進程
+        """
+        worker = _Worker(self._context, self.settings, self._log_queue)
+        with self._stats_lock:
+            self._spawned += 1
+        logger.debug(f"已啟動後端工作進程 pid={worker.process.pid}")
+        return worker
+
+    def _replace(self, worker: _Worker, kill: bool) -> None:
+        """
+        停止工作進程並以新進程取代
+
+        :param worker: 要取代的工作進程
+        :param kill: 是否強制終止
+        """
+        worker.stop(kill=kill)
+        if self._closed or self._take_retirement():
+            return
+        try:
+            self._idle.put(self._spawn())
+        except Exception as e:
+            logger.error(f"無法啟動替代的後端工作進程: {e}")
+
+    def _take_retirement(self) -> bool:
+        """
+        工作進程數已縮減時，認領一個待停止的名額
+
+        :return: 是否應停止工作進程而不放回或取代
+        """
+        with self._stats_lock:
+            if self._retiring <= 0:
+                return False
+            self._retiring -= 1
+            return True
+
+    def _release(self, worker: _Worker) -> None:
+        """
+        將工作進程放回閒置佇列，工作進程數已縮減時改為停止
+
+        :param worker: 完成呼叫的工作進程
+        """
+        if self._take_retirement():
+            threading.Thread(target=worker.stop, daemon=True).start()
+        else:
+            self._idle.put(worker)
+
+    def _grow(self, count: int) -> None:
+        """
+        啟動額外的工作進程
+
+        :param count: 要啟動的數量
+        """
+        for _ in range(count):
+            if self._closed:
+                return
+            # 啟動期間又縮減時，尚未啟動的進程直接抵銷待停止的名額
+            if self._take_retirement():
+                continue
+            try:
+                self._idle.put(self._spawn())
+            except Exception as e:
+                logger.error(f"無法啟動新增的後端工作進程: {e}")
+                return
+
+    def resize(
+        self, workers: int, max_calls_per_worker: int, call_timeout: float
+    ) -> None:
+        """
+        調整工作進程數、回收門檻與呼叫期限（可能在配置監看線程中呼叫）
+
+        增加的工作進程在背景中啟動；減少時先停止閒置的工作進程，
+        其餘在完成目前的呼叫後停止。
+
+        :param workers: 工作進程數量
+        :param max_calls_per_worker: 工作進程處理多少次呼叫後回收
+        :param call_timeout: 單次呼叫的預設期限（秒）
+        """
+        workers = max(1, int(workers))
+        max_calls_per_worker = max(1, int(max_calls_per_worker))
+        call_timeout = float(call_timeout)
+        with self._stats_lock:
+            if (
+                workers == self.workers
+                and max_calls_per_worker == self.max_calls_per_worker
+                and call_timeout == self.call_timeout
+            ):
+                return
+            delta = workers - self.workers
+            self.workers = workers
+            self.max_calls_per_worker = max_calls_per_worker
+            self.call_timeout = call_timeout
+            if delta > 0:
+                # 先取消尚未執行的縮減，不足的部分再啟動新進程
+                cancelled = min(delta, self._retiring)
+                self._retiring -= cancelled
+                delta -= cancelled
+            elif delta < 0:
+                self._retiring -= delta
+        if delta > 0:
+            threading.Thread(target=self._grow, args=(delta,), daemon=True).start()
+        elif delta < 0:
+            while self._retiring > 0:
+                try:
+                    worker = self._idle.get_nowait()
+                except queue.Empty:
+                    break
+                self._release(worker)
+        logger.info(
+            f"後端進程池已調整, 工作進程數: {workers}, "
+            f"回收門檻: {max_calls_per_worker} 次, 呼叫期限: {call_timeout}s"
+        )
+
+    def _replace_in_background(self, worker: _Worker, kill: bool) -> None:
+        """
+        在背景線程中取代工作進程，避免阻塞呼叫端
+
+        :param worker: 要取代的工作進程
+        :param kill: 是否強制終止
+        """
+        threading.Thread(target=self._replace, args=(worker, kill), daemon=True).start()
+
+    def call(self, method: str, *args, timeout: Optional[float] = None) -> Any:
+        """
+        在工作進程中呼叫後端方法
+
+        :param method: 後端方法名稱
+        :param args: 方法參數
+        :param timeout: 本次呼叫的期限（秒），預設使用 call_timeout
+        :return: 後端方法的返回值
+        :raises BackendTimeoutError: 呼叫超過期限
+        :raises BackendError: 後端錯誤或工作進程異常終止
+        """
+        from app.backends import (
+            BackendError,
+            BackendRejectedError,
+            BackendTimeoutError,
+        )
+
+        if self._closed:
+            raise BackendError("後端進程池已關閉")
+
+        timeout = self.call_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        try:
+            worker = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            with self._stats_lock:
+                self._timeouts += 1
+            raise BackendTimeoutError(f"等待後端工作進程超過 {timeout:.1f} 秒")
+
+        with self._stats_lock:
+            self._calls += 1
+        worker.calls += 1
+
+        try:
+            worker.conn.send((method, args, get_request_id()))
+            remaining = max(0.0, deadline - time.monotonic())
+            if not worker.conn.poll(remaining):
+                with self._stats_lock:
+                    self._timeouts += 1
+                logger.warning(
+                    f"後端呼叫 {method} 超過期限 {timeout:.1f} 秒，"
+                    f"終止工作進程 pid={worker.process.pid}"
+                )
+                self._replace_in_background(worker, kill=True)
+                raise BackendTimeoutError(f"後端呼叫超過 {timeout:.1f} 秒未回應")
+            reply = worker.conn.recv()
+        except (EOFError, OSError) as e:
+            with self._stats_lock:
+                self._crashes += 1
+            logger.error(
+                f"後端工作進程 pid={worker.process.pid} 異常終止 "
+                f"(exitcode={worker.process.exitcode})"
+            )
+            self._replace_in_background(worker, kill=True)
+            raise BackendError(f"後端工作進程異常終止: {e}") from e
+
+        # 達到回收門檻的工作進程在背景中替換
+        if worker.calls >= self.max_calls_per_worker:
+            with self._stats_lock:
+                self._recycled += 1
+            logger.debug(f"回收後端工作進程 pid={worker.process.pid}")
+            self._replace_in_background(worker, kill=False)
+        else:
+            self._release(worker)
+
+        if reply[0] == "ok":
+            return reply[1]
+        with self._stats_lock:
+            self._errors += 1
+        # 保留明確拒絕的異常類型，斷路器才能與後端故障區分
+        if reply[1] == BackendRejectedError.__name__:
+            raise BackendRejectedError(reply[2])
+        raise BackendError(f"{reply[1]}: {reply[2]}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        獲取進程池統計資料
+
+        :return: 統計資料字典
+        """
+        with self._stats_lock:
+            return {
+                "workers": self.workers,
+                "idle": self._idle.qsize(),
+                "calls": self._calls,
+                "errors": self._errors,
+                "timeouts": self._timeouts,
+                "crashes": self._crashes,
+                "recycled": self._recycled,
+                "spawned": self._spawned,
+            }
+
+    def shutdown(self) -> None:
+        """
+        停止所有閒置的工作進程
+        """
+        self._closed = True
+        logger.info("關閉後端進程池")
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            worker.stop()
@@ -0,0 +1,280 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.logger import get_logger
+from app.config_manager import get_config
+from app.shared_state import SharedStateBusyError
+
+# 獲取日誌記錄器
+logger = get_logger()
+
+# 獲取配置管理器
+config = get_config()
+
+
+class TokenBucketLimiter:
+    """以鍵區分的令牌桶限流器，使用 LRU 淘汰限制記憶體用量"""
+
+    def __init__(
+        self, rate_per_minute: float = 30, burst: int = 10, max_entries: int = 10000
+    ):
+        """
+        初始化限流器
+
+        :param rate_per_minute: 每分鐘補充的令牌數
+        :param burst: 令牌桶容量（允許的瞬間請求數）
+        :param max_entries: 最多追蹤的鍵數量
+        """
+        self._lock = threading.Lock()
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+        self._allowed = 0
+        self._rejected = 0
+        self._evicted = 0
+        self.configure(rate_per_minute, burst, max_entries)
+
+    def configure(self, rate_per_minute: float, burst: int, max_entries: int) -> None:
+        """
+        更新限流參數，已追蹤的令牌桶保留目前的令牌數
+
+        :param rate_per_minute: 每分鐘補充的令牌數
+        :param burst: 令牌桶容量
+        :param max_entries: 最多追蹤的鍵數量
+        """
+        with self._lock:
+            self.rate = max(0.0, float(rate_per_minute)) / 60.0
+            self.burst = max(1, int(burst))
+            self.max_entries = max(1, int(max_entries))
+            while len(self._buckets) > self.max_entries:
+                self._buckets.popitem(last=False)
+                self._evicted += 1
+
+    def allow(self, key: str) -> Tuple[bool, float]:
+        """
+        嘗試為指定鍵取得一個令牌
+
+        :param key: 限流鍵
+        :return: (是否允許, 建議重試前等待的秒數)
+        """
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = [float(self.burst), now]
+                self._buckets[key] = bucket
+                if len(self._buckets) > self.max_entries:
+                    self._buckets.popitem(last=False)
+                    self._evicted += 1
+            else:
+                self._buckets.move_to_end(key)
+                tokens = bucket[0] + (now - bucket[1]) * self.rate
+                bucket[0] = min(float(self.burst), tokens)
+                bucket[1] = now
+
+            if bucket[0] >= 1.0:
+                bucket[0] -= 1.0
+                self._allowed += 1
+                return True, 0.0
+
+            self._rejected += 1
+            retry_after = (1.0 - bucket[0]) / self.rate if self.rate > 0 else 60.0
+            return False, retry_after
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        獲取限流器統計資料
+
+        :return: 統計資料字典
+        """
+        with self._lock:
+            return {
+                "rate_per_minute": self.rate * 60.0,
+                "burst": self.burst,
+                "tracked_keys": len(self._buckets),
+                "max_entries": self.max_entries,
+                "allowed": self._allowed,
+                "rejected": self._rejected,
+                "evicted": self._evicted,
+            }
+
+
+class SharedTokenBucketLimiter:
+    """令牌桶保存在共用狀態儲存中的限流器，所有伺服器工作進程共用同一組令牌桶"""
+
+    def __init__(
+        self,
+        store,
+        scope: str,
+        rate_per_minute: float = 30,
+        burst: int = 10,
+        max_entries: int = 10000,
+    ):
+        """
+        初始化限流器
+
+        :param store: 共用狀態儲存
+        :param scope: 令牌桶類別，不同限流器的令牌桶與統計分開保存
+        :param rate_per_minute: 每分鐘補充的令牌數
+        :param burst: 令牌桶容量（允許的瞬間請求數）
+        :param max_entries: 最多追蹤的鍵數量
+        """
+        self.store = store
+        self.scope = scope
+        self.configure(rate_per_minute, burst, max_entries)
+
+    def configure(self, rate_per_minute: float, burst: int, max_entries: int) -> None:
+        """
+        更新限流參數，已追蹤的令牌桶保留目前的令牌數
+
+        :param rate_per_minute: 每分鐘補充的令牌數
+        :param burst: 令牌桶容量
+        :param max_entries: 最多追蹤的鍵數量
+        """
+        self.rate = max(0.0, float(rate_per_minute)) / 60.0
+        self.burst = max(1, int(burst))
+        self.max_entries = max(1, int(max_entries))
+
+    def allow(self, key: str) -> Tuple[bool, float]:
+        """
+        嘗試為指定鍵取得一個令牌
+
+        :param key: 限流鍵
+        :return: (是否允許, 建議重試前等待的秒數)
+        """
+        try:
+            return self.store.take_token(
+                self.scope, key, self.rate, self.burst, self.max_entries
+            )
+        except SharedStateBusyError as e:
+            # 共用狀態儲存長時間忙碌時放行，避免限流本身造成請求失敗
+            logger.warning(f"限流檢查略過: {e}")
+            return True, 0.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        獲取限流器統計資料（所有工作進程合計）
+
+        :return: 統計資料字典
+        """
+        counters = self.store.get_counters(f"rate_limit.{self.scope}.")
+        return {
+            "rate_per_minute": self.rate * 60.0,
+            "burst": self.burst,
+            "tracked_keys": self.store.bucket_count(self.scope),
+            "max_entries": self.max_entries,
+            "allowed": counters.get("allowed", 0),
+            "rejected": counters.get("rejected", 0),
+            "evicted": counters.get("evicted", 0),
+            "shared": True,
+        }
+
+
+class RateLimiter:
+    """密碼修改請求限流器，分別依來源 IP 與使用者名稱限流"""
+
+    def __init__(self):
+        """
+        依配置初始化限流器
+        """
+        max_entries = config.get("rate_limit", "max_entries", 10000)
+        self.ip_limiter = TokenBucketLimiter(
+            config.get("rate_limit", "ip_requests_per_minute", 30),
+            config.get("rate_limit", "ip_burst", 10),
+            max_entries,
+        )
+        self.user_limiter = TokenBucketLimiter(
+            config.get("rate_limit", "user_requests_per_minute", 5),
+            config.get("rate_limit", "user_burst", 3),
+            max_entries,
+        )
+
+    def apply_config(self, snapshot) -> None:
+        """
+        套用配置快照中的限流設定
+
+        :param snapshot: 配置快照
+        """
+        settings = snapshot.rate_limit
+        self.ip_limiter.configure(
+            settings.ip_requests_per_minute, settings.ip_burst, settings.max_entries
+        )
+        self.user_limiter.configure(
+            settings.user_requests_per_minute, settings.user_burst, settings.max_entries
+        )
+
+    def use_shared_store(self, store) -> None:
+        """
+        改為使用共用狀態儲存中的令牌桶，限制不會因請求分散到多個伺服器工作進程而放寬
+
+        :param store: 共用狀態儲存
+        """
+        self.ip_limiter = SharedTokenBucketLimiter(
+            store,
+            "ip",
+            self.ip_limiter.rate * 60.0,
+            self.ip_limiter.burst,
+            self.ip_limiter.max_entries,
+        )
+        self.user_limiter = SharedTokenBucketLimiter(
+            store,
+            "user",
+            self.user_limiter.rate * 60.0,
+            self.user_limiter.burst,
+            self.user_limiter.max_entries,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        """
+        是否啟用限流
+        """
+        return config.snapshot.rate_limit.enabled
+
+    def check(
+        self, client_ip: Optional[str], username: Optional[str]
+    ) -> Tuple[bool, float]:
+        """
+        檢查請求是否超過限制
+
+        :param client_ip: 來源 IP，None 時不檢查
+        :param username: 使用者名稱，None 時不檢查
+        :return: (是否允許, 建議重試前等待的秒數)
+        """
+        if not self.enabled:
+            return True, 0.0
+        if client_ip:
+            allowed, retry_after = self.ip_limiter.allow(client_ip)
+            if not allowed:
+                return False, retry_after
+        if username:
+            allowed, retry_after = self.user_limiter.allow(username.casefold())
+            if not allowed:
+                return False, retry_after
+        return True, 0.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        獲取限流統計資料
+
+        :return: 統計資料字典
+        """
+        return {
+            "enabled": self.enabled,
+            "ip": self.ip_limiter.get_stats(),
+            "user": self.user_limiter.get_stats(),
+        }
+
+
+# 創建全局限流器實例
+rate_limiter = RateLimiter()
+config.subscribe(rate_limiter.apply_config)
+
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    獲取限流器實例
+
+    :return: 限流器
+    """
+    return rate_limiter
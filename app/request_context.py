@@ -0,0 +1,90 @@
+import re
+import uuid
+import logging
+from contextvars import ContextVar
+from typing import Optional
+
+# 目前請求的識別碼，沒有請求時為 None
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# 請求與回應中攜帶識別碼的標頭
+REQUEST_ID_HEADER = "X-Request-ID"
+
+# 接受呼叫端提供的識別碼時的格式限制，避免寫入任意內容到日誌
+_VALID_REQUEST_ID = re.compile(r"[A-Za-z0-9._:-]{1,64}")
+
+
+def new_request_id() -> str:
+    """
+    產生新的請求識別碼
+
+    :return: 16 個十六進位字元的識別碼
+    """
+    return uuid.uuid4().hex[:16]
+
+
+def get_request_id() -> Optional[str]:
+    """
+    獲取目前請求的識別碼
+
+    :return: 識別碼，不在請求中時返回 None
+    """
+    return request_id_var.get()
+
+
+class RequestIdFilter(logging.Filter):
+    """
+    在記錄上標記目前請求的識別碼（record.request_id），沒有請求時為 "-"
+
+    必須加在記錄日誌的線程所經過的處理器上，寫入線程中已讀不到請求的上下文。
+    """
+
+    def filter(self, record):
+        if not hasattr(record, "request_id"):
+            record.request_id = request_id_var.get() or "-"
+        return True
+
+
+class RequestIdMiddleware:
+    """
+    為每個 HTTP 請求設定識別碼的 ASGI 中介層
+
+    接受呼叫端以 X-Request-ID 標頭提供的識別碼（格式不符時重新產生），
+    並在回應中以同一個標頭返回。
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._header = REQUEST_ID_HEADER.lower().encode("latin-1")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope.get("headers", []):
+            if name == self._header:
+                candidate = value.decode("latin-1")
+                if _VALID_REQUEST_ID.fullmatch(candidate):
+                    request_id = candidate
+                break
+        request_id = request_id or new_request_id()
+        encoded = request_id.encode("latin-1")
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                headers = [
+                    (name, value)
+                    for name, value in message.get("headers", [])
+                    if name.lower() != self._header
+                ]
+                headers.append((self._header, encoded))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = request_id_var.set(request_id)
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(token)
@@ -0,0 +1,249 @@
+import time
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Dict, Optional
+
+from app.logger import get_logger
+from app.backends import (
+    BackendError,
+    BackendRejectedError,
+    BackendTimeoutError,
+    CredentialBackend,
+)
+
+# 獲取日誌記錄器
+logger = get_logger()
+
+
+class CircuitOpenError(BackendError):
+    """斷路器開啟時拋出的異常，表示後端暫停接受呼叫"""
+
+
+class CircuitBreaker:
+    """斷路器類，在後端連續失敗時暫停呼叫並定時試探恢復"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        初始化斷路器
+
+        :param failure_threshold: 連續失敗多少次後開啟
+        :param reset_timeout: 開啟後經過多少秒進入半開狀態試探
+        """
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_timeout = float(reset_timeout)
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._rejected = 0
+        self._opened_count = 0
+        self._last_error: Optional[str] = None
+
+    def configure(self, failure_threshold: int, reset_timeout: float) -> None:
+        """
+        更新斷路器門檻，已開啟的斷路器依新的秒數進入半開狀態
+
+        :param failure_threshold: 連續失敗多少次後開啟
+        :param reset_timeout: 開啟後經過多少秒進入半開狀態試探
+        """
+        with self._lock:
+            self.failure_threshold = max(1, int(failure_threshold))
+            self.reset_timeout = float(reset_timeout)
+
+    def before_call(self) -> None:
+        """
+        呼叫後端前檢查是否允許呼叫
+
+        :raises CircuitOpenError: 斷路器開啟中或半開狀態已有試探呼叫
+        """
+        with self._lock:
+            if self._state == self.CLOSED:
+                return
+            if self._state == self.OPEN:
+                remaining = self._opened_at + self.reset_timeout - time.monotonic()
+                if remaining > 0:
+                    self._rejected += 1
+                    raise CircuitOpenError(
+                        f"帳戶服務暫時無法使用，請於 {int(remaining) + 1} 秒後再試"
+                    )
+                logger.info("斷路器進入半開狀態，允許一次試探呼叫")
+                self._state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self._probe_in_flight:
+                self._rejected += 1
+                raise CircuitOpenError("帳戶服務正在恢復中，請稍後再試")
+            self._probe_in_flight = True
+
+    def record_success(self) -> None:
+        """
+        記錄一次成功的呼叫
+        """
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info("後端呼叫成功，斷路器關閉")
+            self._state = self.CLOSED
+            self._consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self, error: BaseException) -> None:
+        """
+        記錄一次失敗的呼叫
+
+        :param error: 呼叫拋出的異常
+        """
+        with self._lock:
+            self._consecutive_failures += 1
+            self._last_error = str(error)
+            self._probe_in_flight = False
+            if self._state == self.HALF_OPEN or (
+                self._state == self.CLOSED
+                and self._consecutive_failures >= self.failure_threshold
+            ):
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._opened_count += 1
+                logger.error(
+                    f"後端連續失敗 {self._consecutive_failures} 次，斷路器開啟 "
+                    f"{self.reset_timeout:.0f} 秒: {error}"
+                )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        獲取斷路器狀態
+
+        :return: 狀態字典
+        """
+        with self._lock:
+            retry_after = 0.0
+            if self._state == self.OPEN:
+                retry_after = max(
+                    0.0, self._opened_at + self.reset_timeout - time.monotonic()
+                )
+            return {
+                "state": self._state,
+                "consecutive_failures": self._consecutive_failures,
+                "failure_threshold": self.failure_threshold,
+                "reset_timeout_seconds": self.reset_timeout,
+                "retry_after_seconds": retry_after,
+                "opened_count": self._opened_count,
+                "rejected": self._rejected,
+                "last_error": self._last_error,
+            }
+
+
+class ResilientBackend(CredentialBackend):
+    """為憑證後端加上各階段期限與斷路器的包裝"""
+
+    def __init__(
+        self,
+        inner: CredentialBackend,
+        verify_timeout: float = 15.0,
+        set_timeout: float = 15.0,
+        breaker: Optional[CircuitBreaker] = None,
+        max_concurrent_calls: int = 8,
+    ):
+        """
+        初始化包裝後端
+
+        :param inner: 實際的憑證後端
+        :param verify_timeout: 驗證與查詢階段的期限（秒）
+        :param set_timeout: 設置密碼階段的期限（秒）
+        :param breaker: 斷路器
+        :param max_concurrent_calls: 同時執行的後端呼叫數上限
+        """
+        self.inner = inner
+        self.name = inner.name
+        self.verify_timeout = float(verify_timeout)
+        self.set_timeout = float(set_timeout)
+        self.breaker = breaker or CircuitBreaker()
+        self.max_concurrent_calls = max(1, int(max_concurrent_calls))
+        # 進程隔離後端可以自行終止逾時的呼叫，其他後端改在獨立線程中等待期限
+        self._pool = None
+        if not inner.supports_deadline:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_concurrent_calls,
+                thread_name_prefix="backend-call",
+            )
+
+    def apply_config(self, snapshot) -> None:
+        """
+        套用配置快照中的期限、斷路器門檻與後端呼叫線程數，並轉交給實際的後端
+
+        :param snapshot: 配置快照
+        """
+        settings = snapshot.resilience
+        self.verify_timeout = float(settings.verify_timeout_seconds)
+        self.set_timeout = float(settings.set_timeout_seconds)
+        self.breaker.configure(
+            settings.breaker_failure_threshold, settings.breaker_reset_seconds
+        )
+        max_concurrent_calls = max(1, int(settings.max_concurrent_calls))
+        if self._pool is not None and max_concurrent_calls != self.max_concurrent_calls:
+            # 執行中的呼叫留在舊的線程池中完成
+            old_pool = self._pool
+            self._pool = ThreadPoolExecutor(
+                max_workers=max_concurrent_calls, thread_name_prefix="backend-call"
+            )
+            old_pool.shutdown(wait=False)
+        self.max_concurrent_calls = max_concurrent_calls
+        self.inner.apply_config(snapshot)
+
+    def _call(self, method: str, timeout: float, *args) -> Any:
+        """
+        在期限與斷路器保護下呼叫後端方法
+
+        只有逾時、連線與 RPC 等後端故障計入斷路器，BackendRejectedError 直接拋出
+
+        :param method: 後端方法名稱
+        :param timeout: 期限（秒）
+        :param args: 方法參數
+        :return: 後端方法的返回值
+        """
+        self.breaker.before_call()
+        try:
+            if self._pool is None:
+                result = self.inner.call(method, *args, timeout=timeout)
+            else:
+                future = self._pool.submit(
+                    contextvars.copy_context().run, getattr(self.inner, method), *args
+                )
+                try:
+                    result = future.result(timeout=timeout)
+                except FutureTimeoutError:
+                    # 無法中斷執行中的線程，呼叫會在背景中結束
+                    future.cancel()
+                    raise BackendTimeoutError(f"後端呼叫超過 {timeout:g} 秒未回應")
+        except BackendRejectedError:
+            # 明確的拒絕（密碼原則、使用者不存在）表示後端正常回應，不計入失敗
+            self.breaker.record_success()
+            raise
+        except Exception as e:
+            self.breaker.record_failure(e)
+            if isinstance(e, BackendTimeoutError):
+                logger.warning(f"後端呼叫 {method} 逾時: {e}")
+            raise
+        self.breaker.record_success()
+        return result
+
+    def check_credentials(self, username: str, password: str) -> str:
+        return self._call("check_credentials", self.verify_timeout, username, password)
+
+    def set_password(self, username: str, new_password: str) -> None:
+        self._call("set_password", self.set_timeout, username, new_password)
+
+    def lookup_user(self, username: str) -> Optional[Dict[str, Any]]:
+        return self._call("lookup_user", self.verify_timeout, username)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.inner.get_stats(), "breaker": self.breaker.get_stats()}
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+        self.inner.shutdown()
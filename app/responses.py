@@ -0,0 +1,16 @@
+from starlette.types import Receive, Scope, Send
+from fastapi.responses import StreamingResponse
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    邊讀取請求主體邊輸出回應的串流回應
+
+    StreamingResponse 在部分 ASGI 版本下會同時呼叫 receive() 監聽斷線，
+    這會搶走尚未讀取的請求主體，因此這裡只負責輸出回應。
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
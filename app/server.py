@@ -0,0 +1,40 @@
+import threading
+
+import uvicorn
+
+
+class ReadyServer(uvicorn.Server):
+    """
+    啟動完成時發出通知的 uvicorn 伺服器
+
+    uvicorn 完成應用程式啟動並開始監聽後才設定 ready；啟動失敗或伺服器結束時
+    也會設定，呼叫端以 started 判斷是否真的已在監聽。
+    """
+
+    def __init__(self, config: uvicorn.Config):
+        super().__init__(config)
+        self.ready = threading.Event()
+
+    async def startup(self, sockets=None) -> None:
+        try:
+            await super().startup(sockets=sockets)
+        finally:
+            # 成功時 started 為 True；應用程式啟動失敗時 uvicorn 只設定 should_exit
+            self.ready.set()
+
+    def run(self, sockets=None) -> None:
+        try:
+            super().run(sockets=sockets)
+        finally:
+            # 綁定失敗時 uvicorn 以 sys.exit 結束，等待的一方也要能被喚醒
+            self.ready.set()
+
+    def wait_until_ready(self, timeout: float) -> bool:
+        """
+        等待伺服器開始監聽
+
+        :param timeout: 等待的最長時間（秒）
+        :return: 伺服器是否已開始監聽
+        """
+        self.ready.wait(timeout)
+        return self.started and not self.should_exit
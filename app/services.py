@@ -1,11 +1,14 @@
-import win32net
-import win32api
-import win32netcon
-import win32security
+import time
+import logging
 from typing import Dict, Any
 
 from app.logger import get_logger, Logger
+from app.audit import get_audit_log
 from app.config_manager import get_config
+from app.backends import get_backend, BackendRejectedError, BackendTimeoutError
+from app.resilience import CircuitOpenError
+from app.keyed_lock import get_user_gate
+from app.negative_cache import get_negative_cache
 
 # 獲取日誌記錄器
 logger = get_logger()
@@ -13,6 +16,28 @@ logger = get_logger()
 # 獲取配置管理器
 config = get_config()
 
+# 獲取帳戶操作閘道
+user_gate = get_user_gate()
+
+# 獲取否定結果快取
+negative_cache = get_negative_cache()
+
+# 獲取審計事件記錄器
+audit_log = get_audit_log()
+
+
+def _elapsed_ms(started_at: float) -> float:
+    """
+    計算從 started_at 到現在經過的毫秒數
+
+    Args:
+        started_at: time.perf_counter() 的起始值
+
+    Returns:
+        經過的毫秒數
+    """
+    return (time.perf_counter() - started_at) * 1000
+
 
 class PasswordService:
     @staticmethod
@@ -22,6 +47,8 @@ class PasswordService:
         """
         修改 Windows 使用者的密碼
 
+        同一帳戶的修改依序執行，完全相同的進行中請求只會呼叫後端一次
+
         Args:
             username: Windows 使用者名稱
             current_password: 目前密碼
@@ -30,81 +57,170 @@ class PasswordService:
         Returns:
             包含操作結果的字典
         """
-        # 檢查是否需要記錄用戶操作
-        log_user_actions = config.get("security", "log_user_actions", True)
-        # 檢查是否啟用密碼遮罩
-        enable_password_masking = config.get(
-            "security", "enable_password_masking", True
+        # Windows 帳戶名稱不區分大小寫
+        key = username.casefold()
+        fingerprint = user_gate.fingerprint(current_password, new_password)
+        started_at = time.perf_counter()
+        result = user_gate.run(
+            key,
+            fingerprint,
+            lambda: PasswordService._change_password(
+                username, current_password, new_password
+            ),
+        )
+        audit_log.event(
+            "completed",
+            "success" if result["success"] else "failure",
+            username,
+            _elapsed_ms(started_at),
+            level=logging.INFO if result["success"] else logging.WARNING,
+            **({} if result["success"] else {"reason": result["message"]}),
         )
+        return dict(result)
 
-        if log_user_actions:
-            logger.info(f"嘗試修改用戶 '{username}' 的密碼")
-            if enable_password_masking:
-                safe_current_pwd = Logger.format_password_log(current_password)
-                safe_new_pwd = Logger.format_password_log(new_password)
-                logger.debug(
-                    f"用戶: {username}, 當前密碼: {safe_current_pwd}, 新密碼: {safe_new_pwd}"
-                )
-        else:
-            logger.info("嘗試修改用戶密碼")
+    @staticmethod
+    def _change_password(
+        username: str, current_password: str, new_password: str
+    ) -> Dict[str, Any]:
+        """
+        修改 Windows 使用者的密碼
+
+        每個階段記錄一個審計事件，整體結果由 change_password 記錄
+
+        Args:
+            username: Windows 使用者名稱
+            current_password: 目前密碼
+            new_password: 新密碼
+
+        Returns:
+            包含操作結果的字典；後端暫時無法使用等重試可能成功的失敗帶有 retryable=True
+        """
+        # 只在 DEBUG 級別且啟用密碼遮罩時記錄遮罩後的密碼
+        if (
+            audit_log.enabled_for(logging.DEBUG)
+            and config.snapshot.security.enable_password_masking
+        ):
+            audit_log.event(
+                "request",
+                "received",
+                username,
+                level=logging.DEBUG,
+                current_password=Logger.format_password_log(current_password),
+                new_password=Logger.format_password_log(new_password),
+            )
 
+        stage = "verify"
+        started_at = time.perf_counter()
         try:
-            # 嘗試驗證目前使用者憑證
-            domain = win32api.GetComputerName()
-            logger.debug(f"使用電腦名稱作為域: {domain}")
+            # 獲取憑證後端
+            backend = get_backend()
 
             # 驗證目前密碼是否正確
-            try:
-                if log_user_actions:
-                    logger.info(f"驗證用戶 '{username}' 的當前密碼")
-                else:
-                    logger.info("驗證當前密碼")
-                hUser = win32security.LogonUser(
-                    username,
-                    domain,
-                    current_password,
-                    win32security.LOGON32_LOGON_NETWORK,
-                    win32security.LOGON32_PROVIDER_DEFAULT,
-                )
-                hUser.Close()
-                if log_user_actions:
-                    logger.info(f"用戶 '{username}' 的當前密碼驗證成功")
-                else:
-                    logger.info("當前密碼驗證成功")
-            except Exception as e:
-                error_msg = f"密碼驗證失敗: {str(e)}"
-                logger.error(error_msg)
-                if log_user_actions:
-                    logger.error(
-                        f"用戶 '{username}' 的密碼驗證失敗: 密碼不正確或用戶不存在"
+            if negative_cache.is_known_failure(username, current_password):
+                # 使用者不存在或相同密碼近期已驗證失敗，不再呼叫後端
+                verified = False
+                outcome = "cached_rejected"
+            else:
+                try:
+                    checked = backend.check_credentials(username, current_password)
+                except (CircuitOpenError, BackendTimeoutError) as e:
+                    # 後端無法使用時直接告知，避免誤報為密碼錯誤
+                    audit_log.event(
+                        stage,
+                        "unavailable",
+                        username,
+                        _elapsed_ms(started_at),
+                        level=logging.ERROR,
+                        error=str(e),
                     )
-                else:
-                    logger.error("密碼驗證失敗: 密碼不正確或用戶不存在")
+                    return {"success": False, "message": str(e), "retryable": True}
+                except Exception as e:
+                    audit_log.event(
+                        stage,
+                        "error",
+                        username,
+                        _elapsed_ms(started_at),
+                        level=logging.ERROR,
+                        error=str(e),
+                    )
+                    # 後端錯誤而非密碼錯誤，不可告知密碼不正確，重試可能成功
+                    return {
+                        "success": False,
+                        "message": "無法驗證目前密碼，請稍後再試",
+                        "retryable": True,
+                    }
+                verified = checked == backend.VERIFIED
+                outcome = "success" if verified else "rejected"
+                PasswordService._record_verification(
+                    backend, username, current_password, checked
+                )
+            audit_log.event(
+                stage,
+                outcome,
+                username,
+                _elapsed_ms(started_at),
+                level=logging.DEBUG,
+            )
+
+            if not verified:
                 return {"success": False, "message": "目前密碼不正確或使用者不存在"}
 
             # 修改密碼
-            if log_user_actions:
-                logger.info(f"開始修改用戶 '{username}' 的密碼")
-            else:
-                logger.info("開始修改密碼")
-
-            user_info = {
-                "name": username,
-                "password": new_password,
-                "flags": win32netcon.UF_SCRIPT | win32netcon.UF_NORMAL_ACCOUNT,
-            }
-            win32net.NetUserSetInfo(None, username, 1003, user_info)
-            success_msg = f"使用者 {username} 的密碼已成功修改"
-
-            if log_user_actions:
-                logger.info(success_msg)
-            else:
-                logger.info("密碼已成功修改")
+            stage = "set_password"
+            started_at = time.perf_counter()
+            backend.set_password(username, new_password)
+            negative_cache.record_password_changed(username, new_password)
+            audit_log.event(
+                stage, "success", username, _elapsed_ms(started_at), level=logging.DEBUG
+            )
 
-            return {"success": True, "message": success_msg}
+            return {"success": True, "message": f"使用者 {username} 的密碼已成功修改"}
 
         except Exception as e:
             error_msg = f"無法修改密碼: {str(e)}"
-            logger.error(error_msg)
-            logger.exception("密碼修改過程中發生異常")
-            return {"success": False, "message": error_msg}
+            audit_log.event(
+                stage,
+                "error",
+                username,
+                _elapsed_ms(started_at),
+                level=logging.ERROR,
+                error=str(e),
+            )
+            logger.debug("密碼修改過程中發生異常", exc_info=True)
+            result = {"success": False, "message": error_msg}
+            if not isinstance(e, BackendRejectedError):
+                # 新密碼不符合原則等明確的拒絕重試仍會失敗，其餘錯誤可能是暫時的
+                result["retryable"] = True
+            return result
+
+    @staticmethod
+    def _record_verification(
+        backend, username: str, password: str, checked: str
+    ) -> None:
+        """
+        將確定的驗證失敗記錄到否定結果快取
+
+        密碼過期、帳戶鎖定等帳戶狀態隨時可能改變，不記錄。LogonUser 無法區分
+        使用者不存在與密碼錯誤，密碼錯誤時再查詢一次使用者是否存在；查詢同樣受
+        驗證期限與斷路器保護，查詢失敗時不記錄。
+
+        Args:
+            backend: 憑證後端
+            username: Windows 使用者名稱
+            password: 驗證的密碼
+            checked: 後端返回的驗證結果
+        """
+        if not negative_cache.enabled:
+            return
+        if checked == backend.UNKNOWN_USER:
+            negative_cache.record_unknown_user(username)
+        elif checked == backend.WRONG_PASSWORD:
+            try:
+                exists = backend.lookup_user(username) is not None
+            except Exception as e:
+                logger.debug(f"查詢使用者 {username} 失敗，不記錄否定結果: {e}")
+                return
+            if exists:
+                negative_cache.record_failed_verification(username, password)
+            else:
+                negative_cache.record_unknown_user(username)
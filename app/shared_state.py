@@ -0,0 +1,437 @@
+import os
+import json
+import time
+import shutil
+import sqlite3
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Optional, Tuple
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (
+    scope TEXT NOT NULL,
+    key TEXT NOT NULL,
+    tokens REAL NOT NULL,
+    updated REAL NOT NULL,
+    PRIMARY KEY (scope, key)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS cache (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    expires REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS cache_expires ON cache (namespace, expires);
+CREATE TABLE IF NOT EXISTS locks (
+    key TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    pid INTEGER NOT NULL,
+    expires REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+class SharedStateBusyError(RuntimeError):
+    """其他進程持有寫入鎖，在期限內無法完成寫入"""
+
+
+_INCREMENT = (
+    "INSERT INTO counters (name, value) VALUES (?, ?) "
+    "ON CONFLICT (name) DO UPDATE SET value = value + excluded.value"
+)
+
+
+class SharedStateStore:
+    """
+    多個伺服器工作進程共用的狀態儲存（SQLite，WAL 模式）
+
+    保存限流令牌桶、快取項目、帳戶鎖與統計計數。每個線程使用自己的連線，
+    需要讀取後寫入的操作以 BEGIN IMMEDIATE 先取得寫入鎖，跨進程也是原子操作。
+    時間一律使用 time.time()，各進程的時鐘才能比較。
+
+    令牌桶、快取與計數的寫入位於請求路徑上，只等待寫入鎖 fast_timeout 秒，
+    逾時時拋出 SharedStateBusyError 由呼叫端放行或視為未命中；帳戶鎖的操作影響正確性，
+    等待 busy_timeout 秒。讀取在 WAL 模式下不會等待寫入。
+    """
+
+    # 每個進程每寫入多少次令牌桶或快取，清理一次過期的項目
+    PRUNE_INTERVAL = 256
+
+    def __init__(
+        self, path: str, busy_timeout: float = 10.0, fast_timeout: float = 0.5
+    ):
+        """
+        開啟（必要時建立）狀態儲存
+
+        :param path: 資料庫文件路徑
+        :param busy_timeout: 帳戶鎖操作等待其他進程釋放寫入鎖的最長時間（秒）
+        :param fast_timeout: 令牌桶、快取與計數寫入等待寫入鎖的最長時間（秒）
+        """
+        self.path = path
+        self.busy_timeout = float(busy_timeout)
+        self.fast_timeout = float(fast_timeout)
+        self._local = threading.local()
+        self._writes = 0
+        db = self._connection()
+        db.execute("PRAGMA journal_mode=WAL")
+        db.executescript(_SCHEMA)
+
+    @classmethod
+    def create_temporary(cls) -> "SharedStateStore":
+        """
+        在只有目前使用者能存取的暫存目錄中建立新的狀態儲存
+
+        :return: 狀態儲存，不再使用時以 destroy() 刪除
+        """
+        directory = tempfile.mkdtemp(prefix="password_change_")
+        return cls(os.path.join(directory, "shared_state.db"))
+
+    def destroy(self) -> None:
+        """
+        關閉目前線程的連線並刪除 create_temporary() 建立的暫存目錄
+        """
+        db = getattr(self._local, "db", None)
+        if db is not None:
+            db.close()
+            self._local.db = None
+        shutil.rmtree(os.path.dirname(self.path), ignore_errors=True)
+
+    def _connection(self, timeout: Optional[float] = None) -> sqlite3.Connection:
+        """
+        :param timeout: 等待寫入鎖的最長時間（秒），預設為 busy_timeout
+        :return: 目前線程的連線
+        """
+        timeout = self.busy_timeout if timeout is None else timeout
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=timeout, isolation_level=None)
+            # WAL 模式下 NORMAL 只在檢查點時同步，狀態只在執行期間使用，不需每次寫入都同步
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+            self._local.timeout = timeout
+        elif self._local.timeout != timeout:
+            db.execute(f"PRAGMA busy_timeout = {int(timeout * 1000)}")
+            self._local.timeout = timeout
+        return db
+
+    @contextmanager
+    def _transaction(self, timeout: Optional[float] = None):
+        """
+        在寫入交易中執行，區塊內的讀取與寫入不會與其他進程交錯
+
+        :param timeout: 等待寫入鎖的最長時間（秒），預設為 busy_timeout
+        :raises SharedStateBusyError: 在期限內無法取得寫入鎖
+        """
+        db = self._connection(timeout)
+        try:
+            db.execute("BEGIN IMMEDIATE")
+        except sqlite3.OperationalError as e:
+            raise SharedStateBusyError(f"共用狀態儲存忙碌: {e}") from e
+        try:
+            yield db
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+
+    def _should_prune(self) -> bool:
+        self._writes += 1
+        return self._writes % self.PRUNE_INTERVAL == 0
+
+    def take_token(
+        self, scope: str, key: str, rate: float, burst: int, max_entries: int
+    ) -> Tuple[bool, float]:
+        """
+        嘗試從令牌桶取得一個令牌
+
+        :param scope: 令牌桶類別，例如 ip、user
+        :param key: 限流鍵
+        :param rate: 每秒補充的令牌數
+        :param burst: 令牌桶容量
+        :param max_entries: 此類別最多保存的令牌桶數
+        :return: (是否允許, 建議重試前等待的秒數)
+        :raises SharedStateBusyError: 在 fast_timeout 內無法取得寫入鎖
+        """
+        now = time.time()
+        with self._transaction(self.fast_timeout) as db:
+            row = db.execute(
+                "SELECT tokens, updated FROM buckets WHERE scope = ? AND key = ?",
+                (scope, key),
+            ).fetchone()
+            if row is None:
+                tokens = float(burst)
+            else:
+                tokens = min(float(burst), row[0] + max(0.0, now - row[1]) * rate)
+            allowed = tokens >= 1.0
+            if allowed:
+                tokens -= 1.0
+            db.execute(
+                "INSERT OR REPLACE INTO buckets (scope, key, tokens, updated) "
+                "VALUES (?, ?, ?, ?)",
+                (scope, key, tokens, now),
+            )
+            db.execute(
+                _INCREMENT,
+                (f"rate_limit.{scope}.{'allowed' if allowed else 'rejected'}", 1),
+            )
+            if self._should_prune():
+                self._prune_buckets(db, scope, rate, burst, max_entries, now)
+
+        if allowed:
+            return True, 0.0
+        return False, (1.0 - tokens) / rate if rate > 0 else 60.0
+
+    def _prune_buckets(
+        self,
+        db: sqlite3.Connection,
+        scope: str,
+        rate: float,
+        burst: int,
+        max_entries: int,
+        now: float,
+    ) -> None:
+        """
+        刪除已補滿的令牌桶（與不存在相同），仍超過上限時刪除最久未使用的令牌桶
+        """
+        if rate > 0:
+            db.execute(
+                "DELETE FROM buckets WHERE scope = ? AND ? - tokens <= (? - updated) * ?",
+                (scope, float(burst), now, rate),
+            )
+        count = db.execute(
+            "SELECT COUNT(*) FROM buckets WHERE scope = ?", (scope,)
+        ).fetchone()[0]
+        if count > max_entries:
+            db.execute(
+                "DELETE FROM buckets WHERE scope = ? AND key IN ("
+                "SELECT key FROM buckets WHERE scope = ? ORDER BY updated LIMIT ?)",
+                (scope, scope, count - max_entries),
+            )
+            db.execute(_INCREMENT, (f"rate_limit.{scope}.evicted", count - max_entries))
+
+    def cache_get(self, namespace: str, key: str) -> Any:
+        """
+        獲取快取項目（只讀取，失效的項目由寫入時的清理刪除）
+
+        :param namespace: 快取名稱
+        :param key: 鍵
+        :return: 快取值（JSON 解碼後），不存在或已失效時返回 None
+        """
+        row = (
+            self._connection()
+            .execute(
+                "SELECT value FROM cache WHERE namespace = ? AND key = ? AND expires > ?",
+                (namespace, key, time.time()),
+            )
+            .fetchone()
+        )
+        return None if row is None else json.loads(row[0])
+
+    def cache_set(
+        self, namespace: str, key: str, value: Any, ttl: float, max_entries: int
+    ) -> None:
+        """
+        設置快取項目
+
+        :param namespace: 快取名稱
+        :param key: 鍵
+        :param value: 可 JSON 編碼的值
+        :param ttl: 存活時間（秒）
+        :param max_entries: 此快取最多保存的項目數
+        :raises SharedStateBusyError: 在 fast_timeout 內無法取得寫入鎖
+        """
+        now = time.time()
+        encoded = json.dumps(value, ensure_ascii=False)
+        with self._transaction(self.fast_timeout) as db:
+            db.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, expires) "
+                "VALUES (?, ?, ?, ?)",
+                (namespace, key, encoded, now + ttl),
+            )
+            if self._should_prune():
+                self._prune_cache(db, namespace, max_entries, now)
+
+    def _prune_cache(
+        self, db: sqlite3.Connection, namespace: str, max_entries: int, now: float
+    ) -> None:
+        """
+        刪除已失效的項目，仍超過上限時刪除最早失效的項目
+        """
+        expired = db.execute(
+            "DELETE FROM cache WHERE namespace = ? AND expires <= ?", (namespace, now)
+        ).rowcount
+        if expired:
+            db.execute(_INCREMENT, (f"cache.{namespace}.expirations", expired))
+        count = db.execute(
+            "SELECT COUNT(*) FROM cache WHERE namespace = ?", (namespace,)
+        ).fetchone()[0]
+        if count > max_entries:
+            db.execute(
+                "DELETE FROM cache WHERE namespace = ? AND key IN ("
+                "SELECT key FROM cache WHERE namespace = ? ORDER BY expires LIMIT ?)",
+                (namespace, namespace, count - max_entries),
+            )
+            db.execute(
+                _INCREMENT, (f"cache.{namespace}.evictions", count - max_entries)
+            )
+
+    def cache_delete(self, namespace: str, key: str) -> None:
+        """
+        刪除快取項目
+
+        :param namespace: 快取名稱
+        :param key: 鍵
+        :raises SharedStateBusyError: 在 fast_timeout 內無法取得寫入鎖
+        """
+        with self._transaction(self.fast_timeout) as db:
+            db.execute(
+                "DELETE FROM cache WHERE namespace = ? AND key = ?", (namespace, key)
+            )
+
+    def cache_clear(self, namespace: str) -> None:
+        """
+        清空快取
+
+        :param namespace: 快取名稱
+        :raises SharedStateBusyError: 在 fast_timeout 內無法取得寫入鎖
+        """
+        with self._transaction(self.fast_timeout) as db:
+            db.execute("DELETE FROM cache WHERE namespace = ?", (namespace,))
+
+    def cache_size(self, namespace: str) -> int:
+        """
+        :param namespace: 快取名稱
+        :return: 保存中的項目數（含尚未清理的失效項目）
+        """
+        return (
+            self._connection()
+            .execute("SELECT COUNT(*) FROM cache WHERE namespace = ?", (namespace,))
+            .fetchone()[0]
+        )
+
+    def acquire_lock(
+        self, key: str, owner: str, lease: float, timeout: Optional[float] = None
+    ) -> bool:
+        """
+        取得跨進程的鎖，鎖被佔用時輪詢等待
+
+        持有者的進程異常終止時，由主進程以 release_locks_of() 釋放；
+        鎖在 lease 秒後也會自動失效。
+
+        :param key: 鎖的鍵
+        :param owner: 持有者識別（同一進程中也須唯一）
+        :param lease: 鎖的有效時間（秒）
+        :param timeout: 最長等待時間（秒），0 表示不等待，None 表示一直等待
+        :return: 是否取得鎖
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        delay = 0.005
+        while True:
+            now = time.time()
+            try:
+                with self._transaction() as db:
+                    row = db.execute(
+                        "SELECT expires FROM locks WHERE key = ?", (key,)
+                    ).fetchone()
+                    if row is None or row[0] <= now:
+                        db.execute(
+                            "INSERT OR REPLACE INTO locks (key, owner, pid, expires) "
+                            "VALUES (?, ?, ?, ?)",
+                            (key, owner, os.getpid(), now + lease),
+                        )
+                        return True
+            except SharedStateBusyError:
+                # 與鎖被佔用相同，依期限繼續等待
+                pass
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(delay)
+            delay = min(delay * 2, 0.1)
+
+    def release_lock(self, key: str, owner: str) -> None:
+        """
+        釋放鎖（只釋放自己持有的鎖）
+
+        :param key: 鎖的鍵
+        :param owner: 持有者識別
+        """
+        self._connection().execute(
+            "DELETE FROM locks WHERE key = ? AND owner = ?", (key, owner)
+        )
+
+    def release_locks_of(self, pid: int) -> int:
+        """
+        釋放指定進程持有的所有鎖，工作進程異常終止後由主進程呼叫
+
+        :param pid: 進程識別碼
+        :return: 釋放的鎖數量
+        """
+        return (
+            self._connection()
+            .execute("DELETE FROM locks WHERE pid = ?", (pid,))
+            .rowcount
+        )
+
+    def incr(self, name: str, amount: int = 1) -> None:
+        """
+        增加計數
+
+        :param name: 計數名稱
+        :param amount: 增加的數量
+        """
+        self._connection().execute(_INCREMENT, (name, amount))
+
+    def add_counters(self, amounts: Dict[str, int]) -> None:
+        """
+        在同一個交易中增加多個計數，供在進程內累計後批次寫入
+
+        :param amounts: 計數名稱 -> 增加的數量
+        :raises SharedStateBusyError: 在 fast_timeout 內無法取得寫入鎖
+        """
+        with self._transaction(self.fast_timeout) as db:
+            db.executemany(_INCREMENT, amounts.items())
+
+    def get_counters(self, prefix: str = "") -> Dict[str, int]:
+        """
+        獲取計數
+
+        :param prefix: 只返回以此開頭的計數，返回的名稱會去掉此前綴
+        :return: 計數名稱 -> 值
+        """
+        rows = self._connection().execute(
+            "SELECT name, value FROM counters WHERE substr(name, 1, ?) = ?",
+            (len(prefix), prefix),
+        )
+        return {name[len(prefix) :]: value for name, value in rows}
+
+    def bucket_count(self, scope: str) -> int:
+        """
+        :param scope: 令牌桶類別
+        :return: 保存中的令牌桶數
+        """
+        return (
+            self._connection()
+            .execute("SELECT COUNT(*) FROM buckets WHERE scope = ?", (scope,))
+            .fetchone()[0]
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        獲取狀態儲存統計資料
+
+        :return: 統計資料字典
+        """
+        db = self._connection()
+        return {
+            "path": self.path,
+            "buckets": db.execute("SELECT COUNT(*) FROM buckets").fetchone()[0],
+            "cache_entries": db.execute("SELECT COUNT(*) FROM cache").fetchone()[0],
+            "locks": db.execute("SELECT COUNT(*) FROM locks").fetchone()[0],
+            "counters": self.get_counters(),
+        }
@@ -0,0 +1,138 @@
+import sys
+import time
+import threading
+from typing import Dict, List, Optional, Tuple
+
+
+class _TimedLoader:
+    """包裝模組載入器，記錄執行模組內容（含其匯入的子模組）的時間"""
+
+    def __init__(self, loader, name: str, profiler: "StartupProfiler"):
+        self._loader = loader
+        self._name = name
+        self._profiler = profiler
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._profiler._enter(self._name)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._leave(self._name)
+
+
+class _TimingFinder:
+    """放在 sys.meta_path 最前面的尋找器，為找到的模組換上計時的載入器"""
+
+    def __init__(self, profiler: "StartupProfiler"):
+        self._profiler = profiler
+
+    def find_spec(self, name, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                spec.loader = _TimedLoader(spec.loader, name, self._profiler)
+            return spec
+        return None
+
+
+class StartupProfiler:
+    """
+    啟動計時器，以 --profile-startup 啟動時記錄各模組匯入耗時與各啟動階段耗時
+
+    未啟用時 mark() 不做任何事，不影響一般啟動。
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.started = time.perf_counter()
+        self._last = self.started
+        self.phases: List[Tuple[str, float]] = []
+        # 模組名稱 -> [總耗時, 自身耗時]
+        self.imports: Dict[str, List[float]] = {}
+        # 各線程各自的匯入堆疊，伺服器線程也會延遲匯入模組
+        self._stacks: Dict[int, List[List]] = {}
+        self._finder: Optional[_TimingFinder] = None
+
+    def enable(self) -> None:
+        """
+        開始記錄，必須在匯入其他模組之前呼叫
+        """
+        if self.enabled:
+            return
+        self.enabled = True
+        self._finder = _TimingFinder(self)
+        sys.meta_path.insert(0, self._finder)
+
+    def _enter(self, name: str) -> None:
+        stack = self._stacks.setdefault(threading.get_ident(), [])
+        stack.append([name, time.perf_counter(), 0.0])
+
+    def _leave(self, name: str) -> None:
+        stack = self._stacks[threading.get_ident()]
+        _, started, children = stack.pop()
+        elapsed = time.perf_counter() - started
+        self.imports[name] = [elapsed, elapsed - children]
+        if stack:
+            stack[-1][2] += elapsed
+
+    def mark(self, phase: str) -> None:
+        """
+        記錄從上一個階段結束到現在的耗時
+
+        :param phase: 階段名稱
+        """
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+
+    def report(self, top: int = 20) -> str:
+        """
+        產生啟動耗時報告
+
+        :param top: 列出匯入耗時最多的模組數
+        :return: 報告文字
+        """
+        if self._finder in sys.meta_path:
+            sys.meta_path.remove(self._finder)
+
+        lines = ["啟動階段耗時:"]
+        for phase, elapsed in self.phases:
+            lines.append(f"  {elapsed * 1000:9.1f} ms  {phase}")
+        total = self._last - self.started
+        lines.append(f"  {total * 1000:9.1f} ms  合計")
+
+        lines.append(f"匯入耗時最多的模組 (前 {top} 名，總耗時含子模組):")
+        lines.append(f"  {'總耗時':>10}  {'自身':>10}  模組")
+        ranked = sorted(self.imports.items(), key=lambda item: item[1][0], reverse=True)
+        for name, (cumulative, own) in ranked[:top]:
+            lines.append(f"  {cumulative * 1000:8.1f}ms  {own * 1000:8.1f}ms  {name}")
+        own_total = sum(own for _, own in self.imports.values())
+        lines.append(
+            f"共匯入 {len(self.imports)} 個模組，耗時 {own_total * 1000:.1f} ms"
+        )
+        return "\n".join(lines)
+
+
+# 創建全局啟動計時器實例
+startup_profiler = StartupProfiler()
+
+
+def get_startup_profiler() -> StartupProfiler:
+    """
+    獲取啟動計時器實例
+
+    :return: 啟動計時器
+    """
+    return startup_profiler
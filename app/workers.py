@@ -0,0 +1,203 @@
+import time
+import threading
+import multiprocessing
+from multiprocessing.connection import wait
+from typing import Any, Callable, List, Optional, Sequence
+
+from app.logger import get_logger
+
+# 獲取日誌記錄器
+logger = get_logger()
+
+# 伺服器工作進程的名稱前綴
+WORKER_NAME_PREFIX = "server-worker"
+
+# 工作進程開始監聽後送給主進程的訊息
+WORKER_READY = "ready"
+
+
+class _WorkerSlot:
+    """一個工作進程位置，工作進程異常結束時以新的進程取代"""
+
+    def __init__(self, index: int):
+        """
+        :param index: 工作進程編號
+        """
+        self.index = index
+        self.process = None
+        self.conn = None
+        self.started_at = 0.0
+        self.restarts = 0
+
+
+class WorkerSupervisor:
+    """
+    伺服器工作進程管理
+
+    以 spawn 啟動多個工作進程，呼叫 target(index, conn, *args)：工作進程開始監聽後以 conn
+    送出 WORKER_READY，之後 conn 收到任何訊息或連線中斷（主進程結束）時結束。
+    通知使用各自的管道而非共用的 Event，被強制終止的工作進程不會留下未釋放的鎖。
+    異常結束（結束碼不為 0）的工作進程會重新啟動。
+    """
+
+    # 同一位置兩次啟動之間的最短間隔（秒），避免啟動即失敗時不斷重新啟動
+    RESTART_DELAY = 1.0
+
+    def __init__(
+        self,
+        target: Callable,
+        args: Sequence[Any],
+        workers: int = 2,
+        on_exit: Optional[Callable[[int], None]] = None,
+    ):
+        """
+        :param target: 工作進程入口，必須是模組層級的函數
+        :param args: 傳給 target 的其他參數（socket 會複製給子進程）
+        :param workers: 工作進程數量
+        :param on_exit: 工作進程結束後以其 pid 呼叫，例如釋放其持有的鎖
+        """
+        self.target = target
+        self.args = tuple(args)
+        self.workers = max(1, int(workers))
+        self.on_exit = on_exit
+        self._context = multiprocessing.get_context("spawn")
+        self._slots: List[_WorkerSlot] = [_WorkerSlot(i) for i in range(self.workers)]
+        self._lock = threading.Lock()
+        self._stopping = False
+        self._monitor = None
+
+    def _spawn(self, slot: _WorkerSlot) -> None:
+        """
+        在指定位置啟動工作進程
+
+        :param slot: 工作進程位置
+        """
+        if slot.conn is not None:
+            slot.conn.close()
+        slot.conn, child_conn = self._context.Pipe()
+        # 工作進程可能再啟動後端工作進程，因此不能是 daemon 進程
+        slot.process = self._context.Process(
+            target=self.target,
+            args=(slot.index, child_conn, *self.args),
+            name=f"{WORKER_NAME_PREFIX}-{slot.index}",
+        )
+        slot.process.start()
+        child_conn.close()
+        slot.started_at = time.monotonic()
+        logger.info(f"已啟動伺服器工作進程 {slot.index}, pid={slot.process.pid}")
+
+    def start(self) -> None:
+        """
+        啟動所有工作進程與監控線程
+        """
+        with self._lock:
+            for slot in self._slots:
+                self._spawn(slot)
+        self._monitor = threading.Thread(
+            target=self._run_monitor, name="worker-monitor", daemon=True
+        )
+        self._monitor.start()
+
+    def wait_until_ready(self, timeout: float) -> bool:
+        """
+        等待所有工作進程開始監聽
+
+        :param timeout: 等待的最長時間（秒）
+        :return: 是否全部已開始監聽，有工作進程在啟動期間結束時立即返回 False
+        """
+        deadline = time.monotonic() + timeout
+        for slot in self._slots:
+            while not slot.conn.poll(0.05):
+                if not slot.process.is_alive() or time.monotonic() >= deadline:
+                    return False
+            try:
+                if slot.conn.recv() != WORKER_READY:
+                    return False
+            except (EOFError, OSError):
+                return False
+        return True
+
+    def _run_monitor(self) -> None:
+        """
+        監控線程主迴圈，等待任一工作進程結束並處理
+        """
+        while not self._stopping:
+            with self._lock:
+                sentinels = {slot.process.sentinel: slot for slot in self._slots}
+            for sentinel in wait(list(sentinels), timeout=1.0):
+                self._handle_exit(sentinels[sentinel])
+
+    def _handle_exit(self, slot: _WorkerSlot) -> None:
+        """
+        處理結束的工作進程，異常結束時重新啟動
+
+        :param slot: 工作進程位置
+        """
+        process = slot.process
+        process.join()
+        if self.on_exit is not None:
+            try:
+                self.on_exit(process.pid)
+            except Exception as e:
+                logger.error(f"清理伺服器工作進程 pid={process.pid} 的狀態失敗: {e}")
+        with self._lock:
+            if self._stopping:
+                return
+            if process.exitcode == 0:
+                # 正常結束（例如收到中斷信號），不再重新啟動
+                logger.info(f"伺服器工作進程 {slot.index} 已結束")
+                self._slots.remove(slot)
+                if not self._slots:
+                    self._stopping = True
+                return
+            logger.error(
+                f"伺服器工作進程 {slot.index} (pid={process.pid}) 異常結束 "
+                f"(exitcode={process.exitcode})，重新啟動"
+            )
+        delay = self.RESTART_DELAY - (time.monotonic() - slot.started_at)
+        if delay > 0:
+            time.sleep(delay)
+        with self._lock:
+            if self._stopping:
+                return
+            slot.restarts += 1
+            try:
+                self._spawn(slot)
+            except Exception as e:
+                logger.error(f"無法重新啟動伺服器工作進程 {slot.index}: {e}")
+                self._slots.remove(slot)
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """
+        要求所有工作進程結束並等待，超過時間仍未結束的工作進程強制終止
+
+        :param timeout: 等待的最長時間（秒）
+        """
+        with self._lock:
+            self._stopping = True
+            slots = list(self._slots)
+        # 關閉管道即通知工作進程結束
+        for slot in slots:
+            slot.conn.close()
+        deadline = time.monotonic() + timeout
+        for slot in slots:
+            slot.process.join(max(0.0, deadline - time.monotonic()))
+            if slot.process.is_alive():
+                logger.warning(f"伺服器工作進程 {slot.index} 未在時間內結束，強制終止")
+                slot.process.kill()
+                slot.process.join(1)
+            if self.on_exit is not None:
+                try:
+                    self.on_exit(slot.process.pid)
+                except Exception:
+                    pass
+        if self._monitor is not None:
+            self._monitor.join(2)
+
+    @property
+    def running(self) -> bool:
+        """
+        是否仍有運行中或等待重新啟動的工作進程
+        """
+        with self._lock:
+            return bool(self._slots)
@@ -0,0 +1,144 @@
+"""
+比較舊的逐行 f-string 日誌與結構化審計事件在每個密碼修改請求上的成本
+
+用法: python bench_logging.py [-n 請求數] [--level INFO]
+
+兩種方式都透過與應用程式相同的佇列與寫入線程輸出到暫存目錄，
+分別量測記錄日誌的線程 CPU 時間、整個進程的 CPU 時間以及寫入的位元組數。
+"""
+
+import os
+import sys
+import time
+import queue
+import logging
+import argparse
+import tempfile
+
+from app.logger import (
+    Logger,
+    LogWriter,
+    QueuedLogHandler,
+    BatchRotatingFileHandler,
+    JsonLinesFormatter,
+    AuditRecordFilter,
+)
+from app.audit import AuditLog
+
+USERNAME = "alice"
+CURRENT_PASSWORD = "Current#Passw0rd"
+NEW_PASSWORD = "N3w#Password!"
+
+
+def legacy_request(log: logging.Logger) -> None:
+    """
+    重現改版前路由與服務在一次成功修改中的日誌呼叫
+    """
+    username = USERNAME
+    log.info(f"接收到用戶 '{username}' 的密碼修改請求")
+    log.debug("驗證表單數據")
+    log.info(f"用戶 '{username}' 的表單數據驗證成功")
+    log.info(f"開始執行用戶 '{username}' 的密碼修改")
+    log.info(f"嘗試修改用戶 '{username}' 的密碼")
+    safe_current_pwd = Logger.format_password_log(CURRENT_PASSWORD)
+    safe_new_pwd = Logger.format_password_log(NEW_PASSWORD)
+    log.debug(f"用戶: {username}, 當前密碼: {safe_current_pwd}, 新密碼: {safe_new_pwd}")
+    log.info(f"驗證用戶 '{username}' 的當前密碼")
+    log.info(f"用戶 '{username}' 的當前密碼驗證成功")
+    log.info(f"開始修改用戶 '{username}' 的密碼")
+    log.info(f"使用者 {username} 的密碼已成功修改")
+    log.info(f"用戶 '{username}' 的密碼修改成功")
+
+
+def audit_request(audit: AuditLog) -> None:
+    """
+    重現改版後服務在一次成功修改中記錄的審計事件
+    """
+    if audit.enabled_for(logging.DEBUG):
+        audit.event(
+            "request",
+            "received",
+            USERNAME,
+            level=logging.DEBUG,
+            current_password=Logger.format_password_log(CURRENT_PASSWORD),
+            new_password=Logger.format_password_log(NEW_PASSWORD),
+        )
+    audit.event("verify", "success", USERNAME, 12.5, level=logging.DEBUG)
+    audit.event("set_password", "success", USERNAME, 20.1, level=logging.DEBUG)
+    audit.event("completed", "success", USERNAME, 33.0)
+
+
+def build_pipeline(name: str, directory: str, level: int, audit_file: bool):
+    """
+    建立與應用程式相同結構的日誌管線（不含主控台輸出）
+
+    :return: (日誌記錄器, 寫入線程, 輸出文件列表)
+    """
+    formatter = logging.Formatter(
+        "%(asctime)s - %(levelname)s - %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
+    )
+    handler = BatchRotatingFileHandler(directory, name, "log")
+    handler.setFormatter(formatter)
+    handlers = [handler]
+    files = [handler.baseFilename]
+    if audit_file:
+        audit_handler = BatchRotatingFileHandler(directory, f"{name}_audit", "jsonl")
+        files.append(audit_handler.baseFilename)
+        audit_handler.setFormatter(JsonLinesFormatter())
+        audit_handler.addFilter(AuditRecordFilter())
+        handlers.append(audit_handler)
+
+    log = logging.getLogger(f"bench.{name}")
+    log.propagate = False
+    log.setLevel(level)
+    writer = LogWriter(queue.Queue(maxsize=10000), handlers)
+    log.addHandler(QueuedLogHandler(writer.queue, writer, "block"))
+    writer.start()
+    return log, writer, files
+
+
+def measure(label: str, request, writer, files, count: int) -> None:
+    """
+    執行 count 次請求並輸出量測結果
+    """
+    process_start = time.process_time()
+    thread_start = time.thread_time()
+    wall_start = time.perf_counter()
+    for _ in range(count):
+        request()
+    thread_cpu = time.thread_time() - thread_start
+    writer.stop()
+    wall = time.perf_counter() - wall_start
+    process_cpu = time.process_time() - process_start
+    written = sum(os.path.getsize(path) for path in files)
+    print(
+        f"{label:<8} 呼叫端 CPU {thread_cpu / count * 1e6:7.1f} µs/請求  "
+        f"進程 CPU {process_cpu / count * 1e6:7.1f} µs/請求  "
+        f"寫入 {written / count:6.0f} bytes/請求  "
+        f"總時間 {wall:.2f}s"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="日誌成本基準測試")
+    parser.add_argument("-n", "--requests", type=int, default=20000, help="請求數")
+    parser.add_argument("--level", default="INFO", help="日誌級別")
+    args = parser.parse_args()
+    level = logging.getLevelName(args.level.upper())
+    if not isinstance(level, int):
+        print(f"無效的日誌級別: {args.level}", file=sys.stderr)
+        return 2
+
+    print(f"請求數: {args.requests}, 日誌級別: {logging.getLevelName(level)}")
+    with tempfile.TemporaryDirectory() as directory:
+        log, writer, files = build_pipeline("legacy", directory, level, False)
+        measure("f-string", lambda: legacy_request(log), writer, files, args.requests)
+
+        log, writer, files = build_pipeline("audit", directory, level, True)
+        audit = AuditLog(log)
+        measure("audit", lambda: audit_request(audit), writer, files, args.requests)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
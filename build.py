@@ -63,11 +63,21 @@ def create_default_config():
             "host": "0.0.0.0",
             "port": 18080,
             "auto_open_browser": True,
+            "ipv6": True,
+            "unix_socket": "",
+            "backlog": 2048,
+            "port_fallback_attempts": 10,
+            "workers": 1,
+            "limit_concurrency": 0,
+            "timeout_keep_alive": 5,
+            "loop": "auto",
+            "http": "auto",
         },
         "logging": {
             "level": "INFO",
             "max_file_size_mb": 10,
-            "backup_count": 5,
+            "max_total_size_mb": 500,
+            "retention_days": 90,
         },
         "tray": {
             "enabled": True,
@@ -1,23 +1,68 @@
 import os
 import sys
 import time
+
+# 以 --profile-startup 啟動時記錄各模組的匯入耗時，必須在匯入其他模組之前啟用
+from app.startup_profile import get_startup_profiler
+
+startup_profiler = get_startup_profiler()
+if "--profile-startup" in sys.argv:
+    startup_profiler.enable()
+
+import json
+import logging
+import uuid
 import signal
-import socket
-import uvicorn
+import asyncio
 import threading
 import webbrowser
+import multiprocessing
 from typing import Optional, Tuple
+from datetime import datetime
 from pydantic import ValidationError
 from fastapi import FastAPI, Request, Form
-from fastapi.responses import HTMLResponse
+from fastapi.responses import (
+    HTMLResponse,
+    JSONResponse,
+    Response,
+    StreamingResponse,
+)
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
 from app.models import PasswordChange
+from app.batch import detect_batch_format, iter_lines, run_batch
+from app.responses import DuplexStreamingResponse
 from app.services import PasswordService
-from app.logger import get_logger
-from app.tray_manager import TrayManager
-from app.config_manager import get_config
+from app.executor import get_executor, ExecutorBusyError
+from app.backends import get_backend, get_backend_stats, shutdown_backend
+from app.keyed_lock import get_user_gate
+from app.idempotency import get_idempotency_store, normalize_key
+from app.rate_limit import get_rate_limiter
+from app.negative_cache import get_negative_cache
+from app.logger import (
+    get_logger,
+    get_log_stats,
+    get_audit_index,
+    shutdown_logging,
+    forward_logging,
+    receive_worker_logs,
+)
+from app.audit import get_audit_log
+from app.request_context import RequestIdMiddleware
+from app.admission import AdmissionMiddleware, get_admission_stats
+from app.log_tail import get_log_follower
+from app.config_manager import (
+    get_config,
+    ConfigConflictError,
+    ConfigValidationError,
+)
+from app.config_watcher import start_config_watcher, stop_config_watcher
+from app.listeners import bind_listeners
+from app.shared_state import SharedStateStore
+from app.workers import WorkerSupervisor, WORKER_READY
+
+startup_profiler.mark("匯入模組（含載入配置與設置日誌）")
 
 
 # 設置工作目錄為執行檔所在目錄 (解決 Nuitka 打包後的路徑問題)
@@ -36,15 +81,38 @@ if getattr(sys, "frozen", False):
 # 獲取日誌記錄器
 logger = get_logger()
 
+# 獲取審計事件記錄器
+audit_log = get_audit_log()
+
 # 獲取配置管理器
 config = get_config()
 
+# 獲取後端執行器
+executor = get_executor()
+
+# 獲取冪等鍵結果儲存
+idempotency_store = get_idempotency_store()
+
+# 獲取限流器
+rate_limiter = get_rate_limiter()
+
+# 等待伺服器完成啟動的最長時間（秒）
+SERVER_STARTUP_TIMEOUT = 30
+
 # 定義伺服器停止事件和變數
 stop_event = threading.Event()
+# 關閉流程只執行一次：信號處理、托盤、主循環與 finally 都可能呼叫 shutdown_application
+shutdown_once = threading.Lock()
 server_thread = None
 server_instance = None
+listeners = None
 tray_manager = None
 
+# 多工作進程模式：主進程的工作進程管理與所有進程共用的狀態儲存，以及工作進程自己的編號
+worker_supervisor = None
+shared_state = None
+worker_index = None
+
 
 # 獲取應用程式目錄
 def get_application_path() -> str:
@@ -96,6 +164,12 @@ app_title = config.get("app", "title", "Windows 使用者密碼修改工具")
 app = FastAPI(title=app_title)
 logger.info(f"FastAPI 應用已創建, 標題: {app_title}")
 
+# 過載時讓超出的請求快速失敗；位於識別碼中介層之內，被拒絕的回應同樣帶有 X-Request-ID
+app.add_middleware(AdmissionMiddleware)
+
+# 為每個請求設定識別碼，日誌以此識別碼標記並在回應的 X-Request-ID 標頭中返回
+app.add_middleware(RequestIdMiddleware)
+
 # 設置靜態文件目錄和模板目錄
 static_dir = os.path.join(app_dir, "static")
 templates_dir = os.path.join(app_dir, "templates")
@@ -134,10 +208,31 @@ async def index(
         log_level(f"顯示訊息 - {'成功' if success else '失敗'}: {message}")
 
     return templates.TemplateResponse(
-        "index.html", {"request": request, "message": message, "success": success}
+        "index.html",
+        {
+            "request": request,
+            "message": message,
+            "success": success,
+            "idempotency_key": uuid.uuid4().hex,
+        },
     )
 
 
+# 在請求中存取跨請求的狀態（限流、冪等鍵結果）
+async def call_state(func, *args):
+    """
+    呼叫限流器或冪等鍵結果儲存的方法；多工作進程模式下狀態保存在共用狀態儲存中，
+    寫入可能等待其他工作進程釋放寫入鎖，因此在線程中執行，不阻塞事件迴圈
+
+    :param func: 要呼叫的方法
+    :param args: 方法參數
+    :return: 方法的返回值
+    """
+    if shared_state is None:
+        return func(*args)
+    return await asyncio.to_thread(func, *args)
+
+
 # 密碼修改處理路由
 @app.post("/change-password", response_class=HTMLResponse)
 async def change_password(
@@ -146,6 +241,7 @@ async def change_password(
     current_password: str = Form(...),
     new_password: str = Form(...),
     confirm_password: str = Form(...),
+    idempotency_key: Optional[str] = Form(None),
 ) -> HTMLResponse:
     """
     密碼修改處理路由
@@ -155,19 +251,33 @@ async def change_password(
     :param current_password: 目前密碼
     :param new_password: 新密碼
     :param confirm_password: 確認新密碼
+    :param idempotency_key: 表單中的冪等鍵（Idempotency-Key 標頭優先）
     :return: HTMLResponse
     """
-    # 檢查是否需要記錄用戶操作
-    log_user_actions = config.get("security", "log_user_actions", True)
-
-    if log_user_actions:
-        logger.info(f"接收到用戶 '{username}' 的密碼修改請求")
-    else:
-        logger.info(f"接收到密碼修改請求")
+    # 讀取同一份配置快照，確保整個請求使用一致的設定
+    settings = config.snapshot
+
+    # 在呼叫後端前依來源 IP 與使用者名稱限流
+    client_ip = request.client.host if request.client else None
+    allowed, retry_after = await call_state(rate_limiter.check, client_ip, username)
+    if not allowed:
+        audit_log.event(
+            "rate_limit", "rejected", username, level=logging.WARNING, client=client_ip
+        )
+        return templates.TemplateResponse(
+            "index.html",
+            {
+                "request": request,
+                "message": "請求過於頻繁，請稍後再試",
+                "success": False,
+                "idempotency_key": idempotency_key,
+            },
+            status_code=429,
+            headers={"Retry-After": str(int(retry_after) + 1)},
+        )
 
     try:
         # 使用模型驗證數據
-        logger.debug("驗證表單數據")
         password_data = PasswordChange(
             username=username,
             current_password=current_password,
@@ -175,35 +285,51 @@ async def change_password(
             confirm_password=confirm_password,
         )
 
-        if log_user_actions:
-            logger.info(f"用戶 '{username}' 的表單數據驗證成功")
-        else:
-            logger.info("表單數據驗證成功")
-
-        # 執行密碼修改
-        if log_user_actions:
-            logger.info(f"開始執行用戶 '{username}' 的密碼修改")
-        else:
-            logger.info("開始執行密碼修改操作")
+        # 重試的請求直接返回第一次的結果，不再呼叫後端
+        key = None
+        if settings.idempotency.enabled:
+            key = normalize_key(
+                request.headers.get("Idempotency-Key") or idempotency_key
+            )
+        result = None
+        if key:
+            result = await call_state(
+                idempotency_store.get,
+                key,
+                password_data.username,
+                password_data.current_password,
+                password_data.new_password,
+            )
+        if result is not None:
+            audit_log.event("idempotency", "replayed", username)
+            return templates.TemplateResponse(
+                "result.html",
+                {
+                    "request": request,
+                    "success": result["success"],
+                    "message": result["message"],
+                },
+                headers={"Idempotent-Replayed": "true"},
+            )
 
-        result = PasswordService.change_password(
+        # 在後端執行緒池中執行，避免阻塞事件迴圈（結果由服務記錄審計事件）
+        result = await executor.run(
+            PasswordService.change_password,
             username=password_data.username,
             current_password=password_data.current_password,
             new_password=password_data.new_password,
         )
+        if key:
+            await call_state(
+                idempotency_store.put,
+                key,
+                password_data.username,
+                password_data.current_password,
+                password_data.new_password,
+                result,
+            )
 
         # 返回結果頁面
-        if result["success"]:
-            if log_user_actions:
-                logger.info(f"用戶 '{username}' 的密碼修改成功")
-            else:
-                logger.info("密碼修改操作成功")
-        else:
-            if log_user_actions:
-                logger.warning(f"用戶 '{username}' 的密碼修改失敗: {result['message']}")
-            else:
-                logger.warning(f"密碼修改操作失敗: {result['message']}")
-
         return templates.TemplateResponse(
             "result.html",
             {
@@ -217,10 +343,30 @@ async def change_password(
         # 處理驗證錯誤
         errors = e.errors()
         error_message = errors[0]["msg"] if errors else "輸入數據驗證失敗"
-        logger.error(f"表單驗證錯誤: {error_message}")
+        audit_log.event(
+            "validate", "invalid", username, level=logging.WARNING, error=error_message
+        )
+        return templates.TemplateResponse(
+            "index.html",
+            {
+                "request": request,
+                "message": error_message,
+                "success": False,
+                "idempotency_key": idempotency_key,
+            },
+        )
+    except ExecutorBusyError as e:
+        # 後端執行佇列已滿
+        audit_log.event("executor", "rejected", username, level=logging.WARNING)
         return templates.TemplateResponse(
             "index.html",
-            {"request": request, "message": error_message, "success": False},
+            {
+                "request": request,
+                "message": str(e),
+                "success": False,
+                "idempotency_key": idempotency_key,
+            },
+            status_code=503,
         )
     except Exception as e:
         # 處理其他異常
@@ -229,18 +375,261 @@ async def change_password(
         logger.exception("處理密碼修改請求時發生未預期的異常")
         return templates.TemplateResponse(
             "index.html",
-            {"request": request, "message": error_message, "success": False},
+            {
+                "request": request,
+                "message": error_message,
+                "success": False,
+                "idempotency_key": idempotency_key,
+            },
         )
 
 
+# 批次密碼修改路由
+@app.post("/api/change-password/batch")
+async def change_password_batch(request: Request):
+    """
+    批次密碼修改，接受串流的 CSV 或 NDJSON 請求主體，並以 NDJSON 串流回傳每行結果
+
+    :param request: FastAPI 請求對象
+    :return: NDJSON 串流回應
+    """
+    batch_format = detect_batch_format(request.headers.get("content-type", ""))
+    if batch_format is None:
+        return JSONResponse(
+            {
+                "success": False,
+                "message": "僅支援 text/csv 或 application/x-ndjson 格式",
+            },
+            status_code=415,
+        )
+
+    # 並行度不超過後端執行器的容量，避免批次請求自行觸發佇列已滿
+    parallelism = min(
+        config.get("batch", "parallelism", 8),
+        executor.max_workers + executor.queue_size,
+    )
+    max_line_bytes = config.get("batch", "max_line_bytes", 65536)
+    logger.info(f"接收到批次密碼修改請求, 格式: {batch_format}, 並行度: {parallelism}")
+
+    async def handle(password_data: PasswordChange):
+        # 每一行都依使用者名稱限流，避免批次請求成為暴力破解的管道
+        allowed, _ = await call_state(rate_limiter.check, None, password_data.username)
+        if not allowed:
+            audit_log.event(
+                "rate_limit", "rejected", password_data.username, level=logging.WARNING
+            )
+            return {"success": False, "message": "請求過於頻繁，請稍後再試"}
+        return await executor.run(
+            PasswordService.change_password,
+            username=password_data.username,
+            current_password=password_data.current_password,
+            new_password=password_data.new_password,
+        )
+
+    async def stream_results():
+        lines = iter_lines(request.stream(), max_line_bytes)
+        async for result in run_batch(lines, batch_format, handle, parallelism):
+            if "summary" in result:
+                logger.info(f"批次密碼修改完成: {result['summary']}")
+            yield json.dumps(result, ensure_ascii=False) + "\n"
+
+    return DuplexStreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+
+# 健康檢查：存活
+@app.get("/healthz")
+async def healthz():
+    """
+    存活檢查，事件迴圈能回應即返回 200
+    """
+    return {"status": "ok"}
+
+
+# 健康檢查：就緒
+@app.get("/readyz")
+async def readyz():
+    """
+    就緒檢查：伺服器已開始監聽、配置已載入、憑證後端可用（斷路器未開啟）、
+    日誌寫入線程正常，全部通過時返回 200，否則返回 503
+    """
+    backend_stats = get_backend_stats()
+    breaker_state = (backend_stats or {}).get("breaker", {}).get("state")
+    log_stats = get_log_stats()
+    checks = {
+        "server": server_instance is not None and server_instance.started,
+        "config": config.snapshot.version >= 1,
+        "backend": backend_stats is not None and breaker_state != "open",
+        "logging": log_stats["writer_alive"]
+        and log_stats["queued"] < log_stats["queue_size"],
+    }
+    ready = all(checks.values())
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "not_ready", "checks": checks},
+    )
+
+
+# API路由：獲取執行狀態
+@app.get("/api/status")
+def get_status(request: Request):
+    """
+    獲取後端執行狀態，包含執行器、憑證後端與斷路器狀態
+
+    多工作進程模式下統計資料需讀寫共用狀態儲存，以同步路由在線程池中執行
+    """
+    return {
+        "executor": executor.get_stats(),
+        "backend": get_backend_stats(),
+        "user_gate": get_user_gate().get_stats(),
+        "idempotency": idempotency_store.get_stats(),
+        "rate_limit": rate_limiter.get_stats(),
+        "negative_cache": get_negative_cache().get_stats(),
+        "config": config.get_stats(),
+        "logging": get_log_stats(),
+        "log_tail": get_log_follower().get_stats(),
+        "admission": get_admission_stats(),
+        "listeners": listeners.get_stats() if listeners is not None else None,
+        "worker": worker_index,
+        "shared_state": shared_state.get_stats() if shared_state is not None else None,
+    }
+
+
+# API路由：查詢審計事件
+@app.get("/api/audit")
+def query_audit(
+    user: Optional[str] = None,
+    outcome: Optional[str] = None,
+    stage: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    limit: int = 100,
+):
+    """
+    依使用者、結果、階段與時間範圍查詢審計事件（由新到舊），
+    時間為 ISO 8601 格式，未指定時區時以本地時間計算
+    """
+    audit_index = get_audit_index()
+    if audit_index is None:
+        return JSONResponse(
+            status_code=404, content={"success": False, "message": "審計日誌未啟用"}
+        )
+    try:
+        since_time = datetime.fromisoformat(since) if since else None
+        until_time = datetime.fromisoformat(until) if until else None
+    except ValueError as e:
+        return JSONResponse(
+            status_code=400, content={"success": False, "message": f"無效的時間: {e}"}
+        )
+
+    started = time.perf_counter()
+    events = audit_index.query(
+        user=user,
+        outcome=outcome,
+        stage=stage,
+        since=since_time,
+        until=until_time,
+        limit=min(max(1, limit), 1000),
+    )
+    logger.debug(
+        f"審計查詢返回 {len(events)} 筆，耗時 {(time.perf_counter() - started) * 1000:.1f}ms"
+    )
+    return {"count": len(events), "events": events}
+
+
+# API路由：即時追蹤日誌
+@app.get("/api/logs/tail")
+async def tail_logs(lines: int = 100):
+    """
+    以 Server-Sent Events 先返回目前日誌文件的最後 lines 行，之後持續推送新增的行
+    """
+    follower = get_log_follower()
+    loop = asyncio.get_running_loop()
+    subscription, recent = await loop.run_in_executor(
+        None, follower.subscribe, loop, min(max(0, lines), 1000)
+    )
+    logger.info(f"日誌追蹤連線開始，目前 {follower.get_stats()['subscribers']} 個連線")
+
+    async def stream_events():
+        try:
+            for line in recent:
+                yield f"data: {line}\n\n"
+            while not subscription.closed:
+                try:
+                    batch = await asyncio.wait_for(subscription.queue.get(), 15)
+                except asyncio.TimeoutError:
+                    # 定期送出註解，避免閒置連線被代理伺服器關閉
+                    yield ": keep-alive\n\n"
+                    continue
+                if batch is None:
+                    break
+                if subscription.dropped:
+                    yield f"event: dropped\ndata: {subscription.dropped}\n\n"
+                    subscription.dropped = 0
+                yield "".join(f"data: {line}\n\n" for line in batch)
+        finally:
+            follower.unsubscribe(subscription)
+
+    return StreamingResponse(
+        stream_events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # API路由：獲取所有配置
 @app.get("/api/config")
 async def get_all_config(request: Request):
     """
-    獲取所有配置
+    獲取所有配置，支援以 If-None-Match 條件請求
     """
+    snapshot = config.snapshot
+    headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache"}
+    if snapshot.etag_matches(request.headers.get("If-None-Match"), weak=True):
+        logger.debug("配置未變更，返回 304")
+        return Response(status_code=304, headers=headers)
+
     logger.info("通過API獲取所有配置")
-    return config.get_all()
+    return Response(
+        content=snapshot.json_bytes, media_type="application/json", headers=headers
+    )
+
+
+# API路由：批次更新配置
+@app.patch("/api/config")
+async def patch_config(request: Request):
+    """
+    以 {區段: {配置項: 值}} 格式一次更新多個配置，全部有效才會生效
+
+    提供 If-Match 標頭時，只在配置未被其他請求修改時更新。
+    """
+    try:
+        changes = json.loads(await request.body())
+    except ValueError:
+        return JSONResponse(
+            status_code=400,
+            content={"success": False, "message": "請求內容不是有效的 JSON"},
+        )
+
+    try:
+        snapshot = config.patch(changes, request.headers.get("If-Match"))
+    except ConfigConflictError as e:
+        return JSONResponse(
+            status_code=412,
+            content={"success": False, "message": str(e)},
+            headers={"ETag": config.snapshot.etag},
+        )
+    except ConfigValidationError as e:
+        return JSONResponse(
+            status_code=400,
+            content={"success": False, "message": "配置無效", "errors": e.errors},
+        )
+
+    logger.info("通過API批次更新配置")
+    return Response(
+        content=snapshot.json_bytes,
+        media_type="application/json",
+        headers={"ETag": snapshot.etag, "Cache-Control": "no-cache"},
+    )
 
 
 # API路由：更新配置
@@ -263,7 +652,12 @@ async def update_config(request: Request, section: str, key: str, value: str):
         pass
 
     logger.info(f"通過API更新配置: {section}.{key} = {value}")
-    config.set(section, key, value)
+    try:
+        config.set(section, key, value)
+    except ConfigValidationError as e:
+        return JSONResponse(
+            status_code=400, content={"success": False, "message": str(e)}
+        )
     return {"success": True, "message": f"已更新配置 {section}.{key}"}
 
 
@@ -283,55 +677,19 @@ async def reset_config(request: Request, section: Optional[str] = None):
         return {"success": True, "message": "已重置所有配置"}
 
 
-# 檢查端口是否可用
-def is_port_available(host: str, port: int) -> bool:
-    """
-    檢查指定的端口是否可用
-
-    :param host: 主機地址
-    :param port: 端口號
-    :return: 端口是否可用
-    """
-    try:
-        # 創建測試用 socket
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            s.settimeout(1)
-            # 嘗試綁定端口
-            s.bind((host, port))
-            return True
-    except (socket.error, OSError):
-        return False
-
-
-# 尋找可用端口
-def find_available_port(
-    start_port: int, host: str = "0.0.0.0", max_attempts: int = 10
-) -> int:
-    """
-    尋找可用的端口
-
-    :param start_port: 起始端口號
-    :param host: 主機地址
-    :param max_attempts: 最大嘗試次數
-    :return: 可用的端口號
-    """
-    port = start_port
-    for _ in range(max_attempts):
-        if is_port_available(host, port):
-            return port
-        port += 1
-
-    # 如果找不到可用端口，返回 0
-    return 0
-
-
 # 關閉應用的函數
 def shutdown_application():
     """
-    關閉應用程式
+    關閉應用程式，重複呼叫時直接返回
+
+    不停止日誌寫入線程，由 main() 與工作進程入口在記錄最後的訊息後呼叫 shutdown_logging
     """
     global server_instance, stop_event
 
+    # 以不等待的 acquire 判斷並標記，信號處理在關閉途中重入時也不會卡住
+    if not shutdown_once.acquire(blocking=False):
+        return
+
     logger.info("正在關閉應用程式...")
 
     # 觸發停止事件
@@ -343,20 +701,75 @@ def shutdown_application():
         server_instance.should_exit = True
         server_instance.force_exit = True
 
+    # 多工作進程模式下等待工作進程結束（工作進程會轉送剩餘的日誌）
+    if worker_supervisor is not None:
+        logger.info("關閉伺服器工作進程")
+        worker_supervisor.stop()
+
+    # 停止配置監看並寫入尚未保存的配置，結束日誌追蹤連線，關閉後端執行器與憑證後端
+    stop_config_watcher()
+    config.flush()
+    get_log_follower().stop()
+    executor.shutdown(wait=False)
+    shutdown_backend()
+
+    # 關閉監聽 socket 並刪除 Unix socket 文件
+    if listeners is not None:
+        listeners.close()
+
+    # 刪除主進程建立的共用狀態儲存
+    if shared_state is not None and worker_index is None:
+        shared_state.destroy()
+
     logger.info("應用程式關閉完成")
 
 
+# 依配置建立 uvicorn 設定
+def build_uvicorn_config(backlog: int):
+    """
+    建立 uvicorn 設定，套用配置中的連線數上限、keep-alive 期限與事件迴圈及 HTTP 實作
+
+    指定的 uvloop 或 httptools 未安裝時記錄警告並改用 auto。
+
+    :param backlog: 等待接受的連線數上限
+    :return: uvicorn.Config
+    """
+    import uvicorn
+    from importlib.util import find_spec
+
+    settings = config.snapshot.server
+    loop = settings.loop
+    if loop == "uvloop" and find_spec("uvloop") is None:
+        logger.warning("未安裝 uvloop，server.loop 改用 auto")
+        loop = "auto"
+    http = settings.http
+    if http == "httptools" and find_spec("httptools") is None:
+        logger.warning("未安裝 httptools，server.http 改用 auto")
+        http = "auto"
+
+    # 直接使用應用實例而不是字符串引用，socket 已綁定，交給 uvicorn 使用
+    return uvicorn.Config(
+        app=app,
+        log_level="info",
+        backlog=backlog,
+        limit_concurrency=settings.limit_concurrency or None,
+        timeout_keep_alive=settings.timeout_keep_alive,
+        loop=loop,
+        http=http,
+    )
+
+
 # 在獨立線程中運行伺服器
 def run_server_in_thread(host=None, port=None, auto_find_port=True) -> Tuple[bool, int]:
     """
-    在獨立線程中運行伺服器
+    綁定監聽 socket 後在獨立線程中運行伺服器
 
     :param host: 伺服器主機地址
     :param port: 伺服器端口
-    :param auto_find_port: 是否自動尋找可用端口
+    :param auto_find_port: 端口被佔用時是否改用後續的端口（不會寫入配置文件）
     :return: (是否成功啟動, 實際使用的端口)
     """
-    global server_instance, server_thread, stop_event
+    global server_instance, server_thread, stop_event, listeners
 
     # 從配置獲取主機和端口（如果未提供）
     if host is None:
@@ -365,96 +778,193 @@ def run_server_in_thread(host=None, port=None, auto_find_port=True) -> Tuple[boo
     if port is None:
         port = config.get("server", "port", 18080)
 
-    # 檢查端口是否可用
-    if not is_port_available(host, port):
-        logger.warning(f"端口 {port} 已被佔用")
-
-        if auto_find_port:
-            # 尋找可用端口
-            new_port = find_available_port(port + 1, host)
-            if new_port > 0:
-                logger.info(f"自動切換到可用端口: {new_port}")
-                port = new_port
-                # 更新配置
-                config.set("server", "port", port)
-            else:
-                logger.error("無法找到可用端口，無法啟動伺服器")
-                return False, 0
-        else:
-            logger.error(f"端口 {port} 已被佔用，而且未啟用自動端口查找")
-            return False, 0
+    settings = config.snapshot.server
+    try:
+        listeners = bind_listeners(
+            host,
+            port,
+            ipv6=settings.ipv6,
+            unix_socket=settings.unix_socket,
+            backlog=settings.backlog,
+            fallback_attempts=settings.port_fallback_attempts if auto_find_port else 0,
+        )
+    except OSError as e:
+        logger.error(f"無法監聽端口 {port}: {e}")
+        return False, 0
+    if listeners.port != port:
+        logger.warning(f"端口 {port} 已被佔用，本次執行改用端口 {listeners.port}")
+    logger.info(f"監聽位址: {', '.join(listeners.addresses)}")
+    port = listeners.port
 
-    # 創建事件標誌來指示伺服器是否成功啟動
-    server_started = threading.Event()
-    server_start_error = [None]  # 使用列表存儲錯誤，以便能夠在閉包中修改
+    if settings.workers > 1:
+        return run_server_workers(host, port, settings.workers)
 
-    def run():
-        global server_instance
-        try:
-            # 直接使用應用實例而不是字符串引用
-            uvicorn_config = uvicorn.Config(
-                app=app, host=host, port=port, log_level="info"
-            )
-            server_instance = uvicorn.Server(uvicorn_config)
-            server_instance.install_signal_handlers = (
-                lambda: None
-            )  # 禁用 uvicorn 的信號處理
+    # 需要啟動伺服器時才匯入 uvicorn，縮短啟動時間
+    from app.server import ReadyServer
 
-            # 標記伺服器已成功初始化
-            server_started.set()
+    server = ReadyServer(build_uvicorn_config(listeners.backlog))
+    server_instance = server
+    server_error = [None]  # 使用列表存儲錯誤，以便能夠在閉包中修改
 
-            # 運行伺服器
+    def run():
+        try:
             logger.info(f"啟動伺服器於 {host}:{port}")
-            server_instance.run()
-        except Exception as e:
-            logger.error(f"伺服器運行失敗: {str(e)}")
-            logger.exception("伺服器運行異常詳情")
-            server_start_error[0] = str(e)
-            server_started.set()  # 設置事件以解除等待
+            server.run(sockets=listeners.sockets)
+        except BaseException as e:
+            # uvicorn 無法綁定端口時以 sys.exit 結束
+            server_error[0] = e
+            if not isinstance(e, SystemExit):
+                logger.exception(f"伺服器運行失敗: {e}")
 
     server_thread = threading.Thread(target=run, daemon=True)
     server_thread.start()
 
-    # 等待伺服器啟動或出錯
-    server_started.wait(timeout=10)  # 等待最多10秒
-
-    # 檢查是否有啟動錯誤
-    if server_start_error[0] is not None:
-        logger.error(f"伺服器啟動失敗: {server_start_error[0]}")
+    # 等待 uvicorn 完成啟動並開始監聽，啟動失敗時會立即返回
+    if not server.wait_until_ready(timeout=SERVER_STARTUP_TIMEOUT):
+        if server_error[0] is not None or not server_thread.is_alive():
+            logger.error(f"伺服器啟動失敗: {server_error[0] or '應用程式啟動失敗'}")
+        else:
+            logger.error(f"伺服器在 {SERVER_STARTUP_TIMEOUT} 秒內未完成啟動")
+            server.should_exit = True
+        listeners.close()
         return False, 0
 
-    # 給伺服器一點時間來完成初始化
-    time.sleep(2)
+    logger.info(f"伺服器成功啟動於 {host}:{port}")
 
-    # 改進端口檢測邏輯：嘗試連接到服務器而不是檢查端口是否可用
-    def check_server_running():
+    # 如果設置為自動開啟瀏覽器，則開啟
+    if config.get("server", "auto_open_browser", True):
         try:
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                s.settimeout(3)
-                s.connect(("localhost", port))
-                return True
-        except:
-            return False
-
-    # 確認伺服器是否正在運行
-    server_running = check_server_running()
-    if server_running:
-        logger.info(f"伺服器成功啟動於 {host}:{port}")
-
-        # 如果設置為自動開啟瀏覽器，則開啟
-        if config.get("server", "auto_open_browser", True):
-            try:
-                url = f"http://localhost:{port}"
-                logger.info(f"自動開啟瀏覽器訪問: {url}")
-                webbrowser.open(url)
-            except Exception as e:
-                logger.error(f"開啟瀏覽器失敗: {e}")
+            url = f"http://localhost:{port}"
+            logger.info(f"自動開啟瀏覽器訪問: {url}")
+            webbrowser.open(url)
+        except Exception as e:
+            logger.error(f"開啟瀏覽器失敗: {e}")
 
-        return True, port
-    else:
-        logger.error("伺服器看似啟動了，但無法連接，這可能表示啟動失敗")
+    return True, port
+
+
+# 讓限流、冪等鍵、否定結果快取與帳戶鎖使用共用狀態儲存
+def use_shared_state(store: SharedStateStore) -> None:
+    """
+    將跨請求的狀態改為保存在所有伺服器工作進程共用的狀態儲存中
+
+    :param store: 共用狀態儲存
+    """
+    global shared_state
+
+    shared_state = store
+    rate_limiter.use_shared_store(store)
+    idempotency_store.use_shared_store(store)
+    get_negative_cache().use_shared_store(store)
+    get_user_gate().use_shared_store(store)
+
+
+# 以多個工作進程運行伺服器
+def run_server_workers(host: str, port: int, workers: int) -> Tuple[bool, int]:
+    """
+    啟動共用已綁定 socket 的伺服器工作進程，日誌由主進程統一寫入
+
+    :param host: 伺服器主機地址
+    :param port: 伺服器端口
+    :param workers: 工作進程數量
+    :return: (是否成功啟動, 實際使用的端口)
+    """
+    global worker_supervisor, shared_state
+
+    shared_state = SharedStateStore.create_temporary()
+    log_queue = multiprocessing.get_context("spawn").Queue()
+    receive_worker_logs(log_queue)
+
+    # 工作進程異常終止時釋放其持有的帳戶鎖
+    worker_supervisor = WorkerSupervisor(
+        run_server_worker,
+        (
+            listeners.sockets,
+            log_queue,
+            shared_state.path,
+            get_user_gate().fingerprint_key,
+        ),
+        workers=workers,
+        on_exit=shared_state.release_locks_of,
+    )
+    logger.info(f"啟動 {workers} 個伺服器工作進程於 {host}:{port}")
+    worker_supervisor.start()
+
+    if not worker_supervisor.wait_until_ready(timeout=SERVER_STARTUP_TIMEOUT):
+        logger.error("伺服器工作進程啟動失敗")
+        worker_supervisor.stop()
+        listeners.close()
         return False, 0
 
+    logger.info(f"伺服器成功啟動於 {host}:{port}, 工作進程數: {workers}")
+    if config.get("server", "auto_open_browser", True):
+        try:
+            url = f"http://localhost:{port}"
+            logger.info(f"自動開啟瀏覽器訪問: {url}")
+            webbrowser.open(url)
+        except Exception as e:
+            logger.error(f"開啟瀏覽器失敗: {e}")
+
+    return True, port
+
+
+# 伺服器工作進程入口
+def run_server_worker(
+    index, conn, sockets, log_queue, state_path, fingerprint_key
+) -> None:
+    """
+    伺服器工作進程入口，在主進程綁定的 socket 上運行 uvicorn
+
+    本模組在工作進程中已重新匯入，配置與各元件都已建立；日誌在此之前暫存在記憶體中。
+
+    :param index: 工作進程編號
+    :param conn: 與主進程的管道，開始監聽後送出通知，收到訊息或中斷時結束
+    :param sockets: 監聽 socket
+    :param log_queue: 將日誌轉送給主進程的佇列
+    :param state_path: 共用狀態儲存的路徑
+    :param fingerprint_key: 主進程的指紋金鑰，各工作進程的指紋才能互相比對
+    """
+    global server_instance, worker_index
+
+    worker_index = index
+    forward_logging(log_queue)
+    get_user_gate().set_fingerprint_key(fingerprint_key)
+    use_shared_state(SharedStateStore(state_path))
+
+    try:
+        get_backend()
+    except Exception as e:
+        logger.error(f"初始化憑證後端失敗: {e}")
+    start_config_watcher()
+
+    from app.server import ReadyServer
+
+    server = ReadyServer(build_uvicorn_config(config.snapshot.server.backlog))
+    server_instance = server
+
+    def watch():
+        # 開始監聽後通知主進程，之後等待主進程要求結束（主進程結束時管道會中斷）
+        try:
+            if server.wait_until_ready(timeout=SERVER_STARTUP_TIMEOUT):
+                conn.send(WORKER_READY)
+            conn.recv()
+        except (EOFError, OSError):
+            pass
+        server.should_exit = True
+
+    threading.Thread(target=watch, name="worker-watch", daemon=True).start()
+
+    # uvicorn 結束後會重新發出收到的中斷信號，忽略後工作進程才會以結束碼 0 結束，
+    # 主進程不會將其視為異常而重新啟動
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    logger.info(f"伺服器工作進程 {index} 已啟動, pid={os.getpid()}")
+    try:
+        server.run(sockets=sockets)
+    finally:
+        shutdown_application()
+        shutdown_logging()
+
 
 # 初始化系統托盤
 def initialize_tray(server_port):
@@ -471,6 +981,9 @@ def initialize_tray(server_port):
         logger.info("系統托盤功能已被禁用")
         return None
 
+    # 托盤依賴 pystray 與 PIL，啟用時才匯入
+    from app.tray_manager import TrayManager
+
     # 創建並啟動托盤管理器
     tray_manager = TrayManager(
         server_url=f"http://localhost:{server_port}",
@@ -481,11 +994,30 @@ def initialize_tray(server_port):
     return tray_manager
 
 
+# 量測啟動後的首個回應並輸出啟動耗時報告
+def report_startup_profile(port: int) -> None:
+    """
+    請求首頁直到收到第一個位元組，之後輸出啟動耗時報告
+
+    :param port: 伺服器端口
+    """
+    import urllib.request
+
+    try:
+        with urllib.request.urlopen(f"http://localhost:{port}/", timeout=10) as r:
+            r.read(1)
+    except Exception as e:
+        logger.error(f"請求首頁失敗: {e}")
+    startup_profiler.mark("首個回應")
+    print(startup_profiler.report(), flush=True)
+
+
 # 應用程式入口
 def main():
     """
     應用程式入口
     """
+    startup_profiler.mark("建立應用程式")
     try:
         app_title = config.get("app", "title", "Windows 使用者密碼修改工具")
         logger.info(f"啟動 {app_title}")
@@ -502,6 +1034,18 @@ def main():
         except Exception as e:
             logger.error(f"無法列出模板文件: {e}")
 
+        # 預先創建憑證後端（進程隔離模式下會在此啟動工作進程）；
+        # 多工作進程模式下由各伺服器工作進程自行創建
+        if config.get("server", "workers", 1) <= 1:
+            try:
+                get_backend()
+            except Exception as e:
+                logger.error(f"初始化憑證後端失敗: {e}")
+        startup_profiler.mark("初始化憑證後端")
+
+        # 監看配置文件，變更時不必重啟即可套用
+        start_config_watcher()
+
         # 嘗試啟動伺服器
         logger.info("開始啟動伺服器...")
         success, actual_port = run_server_in_thread(auto_find_port=True)
@@ -509,6 +1053,13 @@ def main():
         if not success:
             logger.error("伺服器啟動失敗，應用程式將退出")
             return 1
+        startup_profiler.mark("啟動伺服器")
+
+        # --profile-startup 只量測啟動耗時，輸出報告後結束
+        if startup_profiler.enabled:
+            report_startup_profile(actual_port)
+            shutdown_application()
+            return 0
 
         # 初始化系統托盤
         try:
@@ -529,9 +1080,12 @@ def main():
         logger.info("應用程式初始化完成，進入主循環")
 
         try:
-            # 等待停止信號
+            # 等待停止信號（多工作進程模式下所有工作進程都已結束時也會結束）
             while not stop_event.is_set():
                 stop_event.wait(1)
+                if worker_supervisor is not None and not worker_supervisor.running:
+                    logger.info("所有伺服器工作進程都已結束")
+                    shutdown_application()
         except KeyboardInterrupt:
             logger.info("收到鍵盤中斷信號")
             shutdown_application()
@@ -539,16 +1093,20 @@ def main():
             logger.error(f"主循環發生異常: {str(e)}")
             logger.exception("主循環中發生未預期的異常")
             return 1
-        finally:
-            logger.info("應用程式退出")
 
         return 0
     except Exception as e:
         logger.critical(f"應用程式啟動失敗: {e}")
         logger.exception("應用程式啟動過程中發生未預期的嚴重異常")
         return 1
+    finally:
+        # 最後的訊息寫入後才停止日誌寫入線程
+        logger.info("應用程式退出")
+        shutdown_logging()
 
 
 # 啟動應用
 if __name__ == "__main__":
+    # 支援打包後的執行檔啟動後端工作進程
+    multiprocessing.freeze_support()
     sys.exit(main())
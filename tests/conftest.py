@@ -0,0 +1,157 @@
+import os
+import json
+import uuid
+import shutil
+import tempfile
+import threading
+
+import pytest
+
+# 應用程式在匯入時讀取目前目錄的 config.json，匯入前先切換到暫存目錄並寫入測試配置：
+# 使用記憶體憑證後端，停用限流與否定結果快取，個別測試再以 configure 啟用需要的功能
+TEST_CONFIG = {
+    "server": {"auto_open_browser": False},
+    "tray": {"enabled": False},
+    "backend": {"type": "memory", "isolation": "none"},
+    "rate_limit": {"enabled": False},
+    "negative_cache": {"enabled": False},
+    "config_watch": {"enabled": False},
+}
+
+PASSWORD = "Old#Passw0rd"
+NEW_PASSWORD = "New#Passw0rd"
+
+_workdir = tempfile.mkdtemp(prefix="pwdchange-test-")
+with open(os.path.join(_workdir, "config.json"), "w", encoding="utf-8") as f:
+    json.dump(TEST_CONFIG, f)
+os.chdir(_workdir)
+
+# 日誌記錄器在匯入時決定日誌目錄（預設為專案中的 app/logs），
+# 在配置管理器套用日誌配置、開啟日誌文件之前改為暫存目錄
+from app.logger import logger_instance  # noqa: E402
+
+logger_instance.log_folder = os.path.join(_workdir, "logs")
+os.makedirs(logger_instance.log_folder, exist_ok=True)
+
+
+class BackendGate:
+    """讓後端驗證呼叫停在閘門前，模擬處理中的請求"""
+
+    def __init__(self):
+        self.entered = threading.Event()
+        self.released = threading.Event()
+
+    def release(self) -> None:
+        """
+        放行所有停在閘門前的呼叫
+        """
+        self.released.set()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def application():
+    """
+    測試結束時如同關閉應用程式一樣寫入配置並停止日誌線程，再刪除暫存目錄
+
+    配置文件以相對路徑寫入，pytest 結束時會切換回原本的工作目錄，
+    必須在此之前寫入，否則結束時寫入的是專案中的 config.json。
+    """
+    from app.config_manager import get_config
+    from app.logger import shutdown_logging
+
+    yield
+    get_config().flush()
+    shutdown_logging()
+    shutil.rmtree(_workdir, ignore_errors=True)
+
+
+@pytest.fixture(scope="session")
+def client():
+    """
+    整個測試過程共用的測試用戶端
+    """
+    from fastapi.testclient import TestClient
+
+    import main
+
+    with TestClient(main.app) as client:
+        yield client
+
+
+@pytest.fixture
+def configure():
+    """
+    套用配置變更，測試結束後還原為原本的值
+    """
+    from app.config_manager import get_config
+
+    config = get_config()
+    original = {}
+
+    def apply(changes):
+        for section, values in changes.items():
+            for key in values:
+                original.setdefault(section, {}).setdefault(
+                    key, config.get(section, key)
+                )
+        config.patch(changes)
+
+    yield apply
+    if original:
+        config.patch(original)
+
+
+@pytest.fixture
+def user():
+    """
+    在記憶體後端建立本測試專用的使用者
+
+    :return: 使用者名稱
+    """
+    from app.backends import get_backend
+
+    username = f"user-{uuid.uuid4().hex[:8]}"
+    get_backend().inner.add_user(username, PASSWORD)
+    return username
+
+
+@pytest.fixture
+def change_password(client):
+    """
+    以表單送出密碼修改請求的函數
+    """
+
+    def post(username, current_password=PASSWORD, headers=None):
+        return client.post(
+            "/change-password",
+            data={
+                "username": username,
+                "current_password": current_password,
+                "new_password": NEW_PASSWORD,
+                "confirm_password": NEW_PASSWORD,
+            },
+            headers=headers,
+        )
+
+    return post
+
+
+@pytest.fixture
+def backend_gate(monkeypatch):
+    """
+    讓記憶體後端的驗證呼叫等待閘門放行，測試結束時自動放行
+    """
+    from app.backends import get_backend
+
+    inner = get_backend().inner
+    check_credentials = inner.check_credentials
+    gate = BackendGate()
+
+    def gated(username, password):
+        gate.entered.set()
+        gate.released.wait(10)
+        return check_credentials(username, password)
+
+    monkeypatch.setattr(inner, "check_credentials", gated)
+    yield gate
+    gate.release()
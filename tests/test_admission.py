@@ -0,0 +1,91 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from app import admission
+from app.admission import AdmissionController
+
+
+def test_controller_queues_then_rejects():
+    controller = AdmissionController(max_concurrent=1, max_pending=1, pending_timeout=5)
+
+    async def scenario():
+        assert await controller.acquire()
+        waiter = asyncio.ensure_future(controller.acquire())
+        await asyncio.sleep(0)
+        # 執行與等待名額都已用完
+        assert not await controller.acquire()
+        controller.release()
+        assert await waiter
+        controller.release()
+
+    asyncio.run(scenario())
+    stats = controller.get_stats()
+    assert stats["active"] == 0
+    assert stats["queued"] == 1
+    assert stats["rejected"] == 1
+
+
+def test_controller_times_out_waiting_requests():
+    controller = AdmissionController(
+        max_concurrent=1, max_pending=1, pending_timeout=0.05
+    )
+
+    async def scenario():
+        assert await controller.acquire()
+        assert not await controller.acquire()
+        controller.release()
+
+    asyncio.run(scenario())
+    stats = controller.get_stats()
+    assert stats["timed_out"] == 1
+    assert stats["pending"] == 0
+
+
+def test_slot_handed_over_at_timeout_is_returned(monkeypatch):
+    controller = AdmissionController(max_concurrent=1, max_pending=2, pending_timeout=5)
+
+    async def hand_over_then_time_out(waiter, timeout):
+        # 名額在逾時的同時轉交給等待者
+        controller.release()
+        assert waiter.done()
+        raise asyncio.TimeoutError
+
+    async def scenario():
+        assert await controller.acquire()
+        with monkeypatch.context() as patch:
+            patch.setattr(admission.asyncio, "wait_for", hand_over_then_time_out)
+            assert not await controller.acquire()
+        assert controller.get_stats()["active"] == 0
+        assert await controller.acquire()
+        controller.release()
+
+    asyncio.run(scenario())
+    assert controller.get_stats()["timed_out"] == 1
+
+
+def test_change_password_returns_503_when_saturated(
+    client, user, change_password, backend_gate, configure
+):
+    configure(
+        {
+            "admission": {
+                "max_concurrent": 1,
+                "max_pending": 0,
+                "retry_after_seconds": 3,
+            }
+        }
+    )
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        first = pool.submit(change_password, user)
+        assert backend_gate.entered.wait(5)
+
+        response = change_password(user, current_password="other")
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "3"
+        assert response.json()["success"] is False
+
+        # 不呼叫後端的路由不受准入控制
+        assert client.get("/api/status").status_code == 200
+
+        backend_gate.release()
+        assert first.result(timeout=10).status_code == 200
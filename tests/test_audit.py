@@ -0,0 +1,94 @@
+import json
+import logging
+
+import pytest
+
+from app.audit import AuditEvent, AuditLog
+from app.logger import JsonLinesFormatter, get_logger
+from app.request_context import RequestIdFilter, request_id_var
+from app.services import PasswordService
+from conftest import PASSWORD, NEW_PASSWORD
+
+
+class CollectingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@pytest.fixture
+def target():
+    target = logging.getLogger("test_audit")
+    target.propagate = False
+    target.setLevel(logging.INFO)
+    target.collected = CollectingHandler()
+    target.addHandler(target.collected)
+    yield target
+    target.removeHandler(target.collected)
+
+
+def test_event_fields_and_text():
+    event = AuditEvent(
+        "password_change", "verify", "rejected", "alice", 12.345, {"reason": "x"}
+    )
+    assert event.fields() == {
+        "event": "password_change",
+        "stage": "verify",
+        "outcome": "rejected",
+        "user": "alice",
+        "duration_ms": 12.3,
+        "reason": "x",
+    }
+    assert str(event) == "password_change.verify: rejected user='alice' 12.3ms reason=x"
+
+
+def test_disabled_level_creates_no_event(target):
+    audit = AuditLog(target)
+    audit.event("verify", "success", "alice", level=logging.DEBUG)
+    assert target.collected.records == []
+    assert not audit.enabled_for(logging.DEBUG)
+
+
+def test_user_is_omitted_when_user_actions_are_not_logged(target, configure):
+    configure({"security": {"log_user_actions": False}})
+    AuditLog(target).event("completed", "success", "alice")
+    (record,) = target.collected.records
+    assert "user" not in record.msg.fields()
+
+
+def test_json_lines_formatter_expands_event_fields():
+    record = logging.makeLogRecord(
+        {
+            "msg": AuditEvent("password_change", "completed", "success", "alice"),
+            "levelno": logging.INFO,
+            "levelname": "INFO",
+        }
+    )
+    token = request_id_var.set("req-1")
+    try:
+        RequestIdFilter().filter(record)
+    finally:
+        request_id_var.reset(token)
+    data = json.loads(JsonLinesFormatter().format(record))
+    assert data["request_id"] == "req-1"
+    assert data["stage"] == "completed"
+    assert data["user"] == "alice"
+    assert "message" not in data
+
+
+def test_password_change_emits_completed_event(user):
+    collected = CollectingHandler()
+    get_logger().addHandler(collected)
+    try:
+        result = PasswordService.change_password(user, PASSWORD, NEW_PASSWORD)
+    finally:
+        get_logger().removeHandler(collected)
+    assert result["success"] is True
+
+    events = [r.msg for r in collected.records if isinstance(r.msg, AuditEvent)]
+    assert [(e.stage, e.outcome, e.user) for e in events] == [
+        ("completed", "success", user)
+    ]
@@ -0,0 +1,126 @@
+import os
+import json
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.audit import AuditEvent
+from app.audit_index import ENTRY, AuditIndex
+
+# CRC32 相同的兩個使用者名稱
+COLLIDING_USERS = ("plumless", "buckeroo")
+
+
+def audit_line(user, outcome="success", stage="completed", when=None):
+    when = when or datetime.now()
+    data = {"time": when.isoformat(timespec="milliseconds"), "level": "INFO"}
+    data.update(AuditEvent("password_change", stage, outcome, user).fields())
+    return json.dumps(data) + "\n"
+
+
+@pytest.fixture
+def audit_file(tmp_path):
+    """
+    寫入審計日誌文件並補齊索引
+
+    :return: 以行列表寫入文件的函數，返回 (索引, 文件路徑)
+    """
+    day = datetime.now().date().isoformat()
+    path = tmp_path / f"audit_{day}.jsonl"
+
+    def write(*lines):
+        with open(path, "a", encoding="utf-8") as f:
+            f.writelines(lines)
+        index = AuditIndex(str(tmp_path))
+        index.rebuild()
+        return index, str(path)
+
+    return write
+
+
+def test_query_filters_and_returns_newest_first(audit_file):
+    now = datetime.now()
+    index, _ = audit_file(
+        audit_line("alice", when=now - timedelta(seconds=3)),
+        audit_line("bob", when=now - timedelta(seconds=2)),
+        audit_line("Alice", "rejected", "verify", when=now - timedelta(seconds=1)),
+        audit_line("alice", when=now),
+    )
+    events = index.query(user="ALICE")
+    assert [(e["user"], e["outcome"]) for e in events] == [
+        ("alice", "success"),
+        ("Alice", "rejected"),
+        ("alice", "success"),
+    ]
+    assert len(index.query(user="alice", limit=2)) == 2
+    assert [e["user"] for e in index.query(outcome="rejected")] == ["Alice"]
+    assert [e["user"] for e in index.query(stage="completed", user="bob")] == ["bob"]
+
+
+def test_query_by_time_range(audit_file):
+    now = datetime.now()
+    index, _ = audit_file(
+        audit_line("old", when=now - timedelta(hours=2)),
+        audit_line("recent", when=now - timedelta(minutes=5)),
+    )
+    since = now - timedelta(hours=1)
+    assert [e["user"] for e in index.query(since=since)] == ["recent"]
+    assert [e["user"] for e in index.query(until=since)] == ["old"]
+
+
+def test_crc_collision_is_rechecked_against_the_event(audit_file):
+    index, _ = audit_file(*(audit_line(user) for user in COLLIDING_USERS))
+    assert [e["user"] for e in index.query(user="plumless")] == ["plumless"]
+    assert [e["user"] for e in index.query(user="buckeroo")] == ["buckeroo"]
+
+
+def test_rebuild_resumes_after_last_indexed_line(audit_file, tmp_path):
+    index, path = audit_file(audit_line("alice"))
+    # 寫到一半的行不建立索引
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(audit_line("bob").rstrip("\n"))
+    assert index.rebuild() == 0
+
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("\n")
+    assert index.rebuild() == 1
+    assert [e["user"] for e in index.query()] == ["bob", "alice"]
+
+
+def test_rebuild_drops_partial_index_entry(audit_file):
+    index, path = audit_file(audit_line("alice"), audit_line("bob"))
+    index_path = index._index_path(path)
+    with open(index_path, "r+b") as f:
+        f.truncate(ENTRY.size * 2 - 5)
+    assert index.rebuild_file(path) == 1
+    assert [e["user"] for e in index.query()] == ["bob", "alice"]
+
+
+def test_rename_moves_index_with_rotated_file(audit_file, tmp_path):
+    index, path = audit_file(audit_line("alice"))
+    rotated = path.replace(".jsonl", ".1.jsonl")
+    os.replace(path, rotated)
+    index.rename(path, rotated)
+    assert [e["user"] for e in index.query()] == ["alice"]
+
+
+def test_audit_endpoint_returns_events_for_user(client, user, change_password):
+    change_password(user)
+    change_password(user, "wrong")
+
+    def events():
+        return client.get("/api/audit", params={"user": user}).json()["events"]
+
+    deadline = time.monotonic() + 5
+    while len(events()) < 2 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert [(e["stage"], e["outcome"]) for e in events()] == [
+        ("completed", "failure"),
+        ("completed", "success"),
+    ]
+
+
+def test_audit_endpoint_rejects_invalid_time(client):
+    response = client.get("/api/audit", params={"since": "yesterday"})
+    assert response.status_code == 400
@@ -0,0 +1,152 @@
+import sys
+import types
+
+import pytest
+
+from app.backends import (
+    BackendError,
+    BackendRejectedError,
+    CredentialBackend,
+    MemoryBackend,
+    Win32Backend,
+    create_backend,
+)
+from app.services import PasswordService
+from conftest import PASSWORD, NEW_PASSWORD
+
+
+class WinError(Exception):
+    """模擬 pywintypes.error，帶有 winerror 屬性"""
+
+    def __init__(self, winerror):
+        super().__init__(winerror, "API", f"錯誤 {winerror}")
+        self.winerror = winerror
+
+
+@pytest.fixture
+def win32(monkeypatch):
+    """
+    以假的 pywin32 模組創建 Win32Backend，可設定各 API 拋出的錯誤碼
+    """
+    errors = {}
+
+    def fail(api):
+        if api in errors:
+            raise WinError(errors[api])
+
+    handle = types.SimpleNamespace(Close=lambda: None)
+
+    def logon_user(*args):
+        fail("LogonUser")
+        return handle
+
+    def set_info(*args):
+        fail("NetUserSetInfo")
+
+    def get_info(server, username, level):
+        fail("NetUserGetInfo")
+        return {"name": username}
+
+    modules = {
+        "win32api": types.SimpleNamespace(GetComputerName=lambda: "HOST"),
+        "win32net": types.SimpleNamespace(
+            NetUserSetInfo=set_info, NetUserGetInfo=get_info
+        ),
+        "win32netcon": types.SimpleNamespace(UF_SCRIPT=1, UF_NORMAL_ACCOUNT=512),
+        "win32security": types.SimpleNamespace(
+            LogonUser=logon_user, LOGON32_LOGON_NETWORK=3, LOGON32_PROVIDER_DEFAULT=0
+        ),
+    }
+    for name, module in modules.items():
+        monkeypatch.setitem(sys.modules, name, module)
+    backend = Win32Backend()
+    backend.errors = errors
+    return backend
+
+
+def test_memory_backend_reports_each_outcome():
+    backend = MemoryBackend(users={"alice": "secret"})
+    assert backend.check_credentials("alice", "secret") == backend.VERIFIED
+    assert backend.check_credentials("alice", "wrong") == backend.WRONG_PASSWORD
+    assert backend.check_credentials("nobody", "secret") == backend.UNKNOWN_USER
+    assert backend.verify_credentials("alice", "secret") is True
+    assert backend.verify_credentials("nobody", "secret") is False
+
+
+def test_memory_backend_sets_password_and_rejects_unknown_user():
+    backend = MemoryBackend(users={"alice": "secret"})
+    backend.set_password("alice", "changed")
+    assert backend.verify_credentials("alice", "changed")
+    with pytest.raises(BackendRejectedError):
+        backend.set_password("nobody", "changed")
+    assert backend.lookup_user("alice") == {"name": "alice"}
+    assert backend.lookup_user("nobody") is None
+
+
+def test_memory_backend_injects_errors():
+    backend = MemoryBackend(users={"alice": "secret"}, error_rate=1.0)
+    with pytest.raises(BackendError):
+        backend.check_credentials("alice", "secret")
+
+
+def test_create_backend_by_type():
+    backend = create_backend({"type": "memory", "memory_users": {"alice": "x"}})
+    assert isinstance(backend, MemoryBackend)
+    assert backend.verify_credentials("alice", "x")
+    with pytest.raises(ValueError):
+        create_backend({"type": "ldap"})
+
+
+def test_base_backend_requires_implementation():
+    with pytest.raises(NotImplementedError):
+        CredentialBackend().check_credentials("alice", "secret")
+
+
+@pytest.mark.parametrize(
+    "winerror, outcome",
+    [
+        (1326, CredentialBackend.WRONG_PASSWORD),
+        (1327, CredentialBackend.ACCOUNT_UNUSABLE),
+        (1330, CredentialBackend.ACCOUNT_UNUSABLE),
+        (1331, CredentialBackend.ACCOUNT_UNUSABLE),
+        (1909, CredentialBackend.ACCOUNT_UNUSABLE),
+    ],
+)
+def test_win32_maps_logon_errors_to_outcomes(win32, winerror, outcome):
+    win32.errors["LogonUser"] = winerror
+    assert win32.check_credentials("alice", "secret") == outcome
+
+
+def test_win32_logon_failures_are_backend_errors(win32):
+    assert win32.check_credentials("alice", "secret") == win32.VERIFIED
+    # ERROR_NO_LOGON_SERVERS 等其他錯誤碼是後端故障，不是憑證錯誤
+    win32.errors["LogonUser"] = 1311
+    with pytest.raises(BackendError):
+        win32.check_credentials("alice", "secret")
+
+
+def test_win32_set_password_distinguishes_rejections(win32):
+    win32.errors["NetUserSetInfo"] = 2245
+    with pytest.raises(BackendRejectedError):
+        win32.set_password("alice", "short")
+    win32.errors["NetUserSetInfo"] = 53
+    with pytest.raises(BackendError) as raised:
+        win32.set_password("alice", "Long#Passw0rd")
+    assert not isinstance(raised.value, BackendRejectedError)
+
+
+def test_win32_lookup_user(win32):
+    assert win32.lookup_user("alice") == {"name": "alice"}
+    win32.errors["NetUserGetInfo"] = 2221
+    assert win32.lookup_user("nobody") is None
+    win32.errors["NetUserGetInfo"] = 53
+    with pytest.raises(BackendError):
+        win32.lookup_user("alice")
+
+
+def test_password_service_uses_configured_backend(user):
+    result = PasswordService.change_password(user, PASSWORD, NEW_PASSWORD)
+    assert result["success"] is True
+    result = PasswordService.change_password(user, PASSWORD, NEW_PASSWORD)
+    assert result["success"] is False
+    assert "retryable" not in result
@@ -0,0 +1,190 @@
+import json
+import asyncio
+
+import pytest
+
+from app.batch import (
+    BatchFormatError,
+    RowParser,
+    detect_batch_format,
+    iter_lines,
+    run_batch,
+)
+from conftest import PASSWORD, NEW_PASSWORD
+
+
+async def chunks(*parts):
+    for part in parts:
+        yield part
+
+
+async def collect(iterator):
+    return [item async for item in iterator]
+
+
+def change(username, current=PASSWORD, new=NEW_PASSWORD):
+    return {"username": username, "current_password": current, "new_password": new}
+
+
+@pytest.mark.parametrize(
+    "content_type, expected",
+    [
+        ("text/csv", "csv"),
+        ("text/csv; charset=utf-8", "csv"),
+        ("Application/X-NDJSON", "ndjson"),
+        ("application/jsonl", "ndjson"),
+        ("application/json", None),
+        ("", None),
+    ],
+)
+def test_detect_batch_format(content_type, expected):
+    assert detect_batch_format(content_type) == expected
+
+
+def test_iter_lines_joins_lines_split_across_chunks():
+    lines = asyncio.run(
+        collect(iter_lines(chunks(b"al", b"ice\r\nbo", b"", b"b\ncarol"), 64))
+    )
+    assert lines == [b"alice", b"bob", b"carol"]
+
+
+def test_iter_lines_rejects_overlong_line():
+    async def run():
+        return await collect(iter_lines(chunks(b"ok\n", b"x" * 20), 16))
+
+    with pytest.raises(BatchFormatError):
+        asyncio.run(run())
+
+
+def test_csv_parser_reads_header_with_bom():
+    parser = RowParser("csv")
+    assert parser.parse("\ufeffusername,current_password,new_password") is None
+    assert parser.parse("alice,old,new") == {
+        "username": "alice",
+        "current_password": "old",
+        "new_password": "new",
+    }
+    with pytest.raises(BatchFormatError):
+        parser.parse("alice,old")
+
+
+def test_csv_parser_requires_username_column():
+    with pytest.raises(BatchFormatError):
+        RowParser("csv").parse("user,password")
+
+
+def test_ndjson_parser_requires_objects():
+    parser = RowParser("ndjson")
+    assert parser.parse('{"username": "alice"}') == {"username": "alice"}
+    with pytest.raises(BatchFormatError):
+        parser.parse("[1, 2]")
+    with pytest.raises(BatchFormatError):
+        parser.parse("{broken")
+
+
+def test_run_batch_reports_each_line_and_summary():
+    async def handler(data):
+        return {"success": data.username != "bob", "message": data.username}
+
+    lines = [
+        json.dumps(change("alice")).encode(),
+        b"",
+        json.dumps(change("bob")).encode(),
+        b"not json",
+        json.dumps(dict(change("carol"), confirm_password="other")).encode(),
+    ]
+    results = asyncio.run(collect(run_batch(chunks(*lines), "ndjson", handler)))
+    summary = results.pop()["summary"]
+    by_line = {result["line"]: result for result in results}
+
+    assert summary == {"total": 4, "succeeded": 1, "failed": 3}
+    assert by_line[1]["success"] is True
+    assert by_line[3]["message"] == "bob"
+    assert by_line[4]["success"] is False
+    assert "確認密碼與新密碼不符" in by_line[5]["message"]
+
+
+def test_run_batch_stops_after_invalid_csv_header():
+    async def handler(data):
+        raise AssertionError("標題列無效時不應處理任何資料行")
+
+    lines = [b"name,password", b"alice,old"]
+    results = asyncio.run(collect(run_batch(chunks(*lines), "csv", handler)))
+    assert results[-1]["summary"] == {"total": 1, "succeeded": 0, "failed": 1}
+
+
+def test_run_batch_reads_input_only_when_a_slot_is_free():
+    consumed = []
+
+    async def source():
+        for i in range(10):
+            consumed.append(i)
+            yield json.dumps(change(f"user{i}")).encode()
+
+    async def scenario():
+        release = asyncio.Event()
+        active = 0
+        peak = 0
+
+        async def handler(data):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await release.wait()
+            active -= 1
+            return {"success": True, "message": "ok"}
+
+        task = asyncio.ensure_future(
+            collect(run_batch(source(), "ndjson", handler, parallelism=2))
+        )
+        for _ in range(10):
+            await asyncio.sleep(0)
+        # 兩行處理中時不再讀取輸入
+        assert len(consumed) == 2
+        release.set()
+        results = await task
+        return peak, results
+
+    peak, results = asyncio.run(scenario())
+    assert peak == 2
+    assert results[-1]["summary"]["succeeded"] == 10
+
+
+def test_batch_endpoint_streams_ndjson_results(client, user):
+    body = "\n".join(
+        json.dumps(row) for row in [change(user), change(f"{user}-missing")]
+    )
+    response = client.post(
+        "/api/change-password/batch",
+        content=body.encode(),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    results = [json.loads(line) for line in response.text.splitlines()]
+    assert results[-1]["summary"] == {"total": 2, "succeeded": 1, "failed": 1}
+    assert {r["username"]: r["success"] for r in results[:-1]} == {
+        user: True,
+        f"{user}-missing": False,
+    }
+
+
+def test_batch_endpoint_accepts_csv(client, user):
+    body = f"username,current_password,new_password\n{user},{PASSWORD},{NEW_PASSWORD}\n"
+    response = client.post(
+        "/api/change-password/batch",
+        content=body.encode(),
+        headers={"Content-Type": "text/csv"},
+    )
+    results = [json.loads(line) for line in response.text.splitlines()]
+    assert results[0]["success"] is True
+    assert results[-1]["summary"]["succeeded"] == 1
+
+
+def test_batch_endpoint_rejects_unknown_format(client):
+    response = client.post(
+        "/api/change-password/batch",
+        content=b"{}",
+        headers={"Content-Type": "application/json"},
+    )
+    assert response.status_code == 415
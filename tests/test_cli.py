@@ -0,0 +1,97 @@
+import csv
+import json
+import time
+import threading
+
+from app import cli
+from conftest import PASSWORD, NEW_PASSWORD
+
+
+def write_accounts(path, rows):
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["username", "current_password", "new_password"])
+        writer.writerows(rows)
+    return str(path)
+
+
+def read_results(path):
+    with open(path, encoding="utf-8") as f:
+        return sorted((json.loads(line) for line in f), key=lambda r: r["line"])
+
+
+def test_all_rows_succeed(tmp_path, user):
+    accounts = write_accounts(
+        tmp_path / "accounts.csv", [[user, PASSWORD, NEW_PASSWORD]]
+    )
+    assert cli.main([accounts, "--no-progress", "-v"]) == 0
+
+    results = read_results(tmp_path / "accounts.results.jsonl")
+    assert [(r["line"], r["username"], r["success"]) for r in results] == [
+        (2, user, True)
+    ]
+
+
+def test_failed_rows_are_reported_with_exit_code_1(tmp_path, user):
+    accounts = write_accounts(
+        tmp_path / "accounts.csv",
+        [
+            [user, PASSWORD, NEW_PASSWORD],
+            [user, "wrong", NEW_PASSWORD],
+            ["", PASSWORD, NEW_PASSWORD],
+        ],
+    )
+    output = tmp_path / "results.csv"
+    code = cli.main([accounts, "-o", str(output), "-w", "1", "--no-progress", "-v"])
+    assert code == 1
+
+    with open(output, encoding="utf-8", newline="") as f:
+        rows = sorted(csv.DictReader(f), key=lambda r: int(r["line"]))
+    assert [(row["line"], row["success"]) for row in rows] == [
+        ("2", "True"),
+        ("3", "False"),
+        ("4", "False"),
+    ]
+
+
+def test_run_reads_ahead_only_a_bounded_number_of_rows(tmp_path, monkeypatch):
+    consumed = []
+    release = threading.Event()
+    read_rows = cli.read_rows
+
+    def counting_read_rows(path):
+        for item in read_rows(path):
+            consumed.append(item[0])
+            yield item
+
+    def process_row(line_no, row):
+        release.wait(5)
+        return {"line": line_no, "username": row["username"], "success": True}
+
+    monkeypatch.setattr(cli, "read_rows", counting_read_rows)
+    monkeypatch.setattr(cli, "process_row", process_row)
+    rows = [[f"user{i}", PASSWORD, NEW_PASSWORD] for i in range(50)]
+    accounts = write_accounts(tmp_path / "accounts.csv", rows)
+    output = tmp_path / "out.jsonl"
+
+    results = []
+    runner = threading.Thread(
+        target=lambda: results.append(cli.run(accounts, str(output), 2, False))
+    )
+    runner.start()
+    time.sleep(0.3)
+    # 兩個工作執行緒卡住時，最多只讀取 workers * 2 行
+    assert len(consumed) == 4
+    release.set()
+    runner.join(10)
+
+    assert results == [(50, 50)]
+    assert len(read_results(output)) == 50
+
+
+def test_input_errors_exit_with_code_2(tmp_path):
+    assert cli.main([str(tmp_path / "missing.csv"), "--no-progress", "-v"]) == 2
+
+    bad = tmp_path / "bad.csv"
+    bad.write_text("name,password\nalice,secret\n", encoding="utf-8")
+    assert cli.main([str(bad), "--no-progress", "-v"]) == 2
@@ -0,0 +1,66 @@
+import pytest
+
+
+@pytest.fixture
+def etag(client):
+    response = client.get("/api/config")
+    assert response.status_code == 200
+    return response.headers["etag"]
+
+
+@pytest.mark.parametrize(
+    "header",
+    [
+        "{etag}",
+        "W/{etag}",
+        '"other", {etag}',
+        '"other", W/{etag}',
+        "*",
+    ],
+)
+def test_if_none_match_returns_304(client, etag, header):
+    response = client.get(
+        "/api/config", headers={"If-None-Match": header.format(etag=etag)}
+    )
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+
+
+def test_if_none_match_with_other_etag_returns_config(client, etag):
+    response = client.get("/api/config", headers={"If-None-Match": '"other"'})
+    assert response.status_code == 200
+    assert response.json()["backend"]["type"] == "memory"
+
+
+def test_patch_with_stale_if_match_returns_412(client, etag, configure):
+    # 其他請求先修改了配置
+    configure({"executor": {"queue_size": 31}})
+    response = client.patch(
+        "/api/config",
+        json={"executor": {"queue_size": 30}},
+        headers={"If-Match": etag},
+    )
+    assert response.status_code == 412
+
+
+def test_patch_with_weak_if_match_returns_412(client, etag):
+    response = client.patch(
+        "/api/config",
+        json={"executor": {"queue_size": 30}},
+        headers={"If-Match": f"W/{etag}"},
+    )
+    assert response.status_code == 412
+
+
+def test_patch_with_current_if_match_applies_change(client, etag, configure):
+    # 由 configure 記錄原值，測試結束後還原
+    configure({"executor": {"queue_size": 32}})
+    etag = client.get("/api/config").headers["etag"]
+    response = client.patch(
+        "/api/config",
+        json={"executor": {"queue_size": 30}},
+        headers={"If-Match": etag},
+    )
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert client.get("/api/config").json()["executor"]["queue_size"] == 30
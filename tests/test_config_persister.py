@@ -0,0 +1,81 @@
+import os
+import json
+import time
+
+import pytest
+
+from app.config_persister import ConfigPersister, serialize_config, write_atomic
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return condition()
+
+
+def read(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_rapid_updates_are_coalesced_into_one_write(tmp_path):
+    path = str(tmp_path / "config.json")
+    persister = ConfigPersister(path, debounce_seconds=0.1)
+    for size in range(1, 11):
+        persister.schedule({"executor": {"queue_size": size}})
+
+    assert wait_for(lambda: persister.get_stats()["written"] == 1)
+    time.sleep(0.2)
+    stats = persister.get_stats()
+    assert stats["scheduled"] == 10
+    assert stats["written"] == 1
+    assert read(path) == {"executor": {"queue_size": 10}}
+
+
+def test_unchanged_content_is_not_rewritten(tmp_path):
+    path = tmp_path / "config.json"
+    config = {"server": {"port": 18080}}
+    path.write_text(serialize_config(config), encoding="utf-8")
+    mtime = path.stat().st_mtime_ns
+
+    persister = ConfigPersister(str(path), debounce_seconds=0)
+    persister.schedule(config)
+    persister.flush()
+    assert persister.get_stats()["skipped"] == 1
+    assert path.stat().st_mtime_ns == mtime
+
+
+def test_flush_writes_pending_content_immediately(tmp_path):
+    path = str(tmp_path / "config.json")
+    persister = ConfigPersister(path, debounce_seconds=60)
+    persister.schedule({"a": {"b": 1}})
+    assert persister.is_own_write(serialize_config({"a": {"b": 1}}))
+    persister.flush()
+    assert read(path) == {"a": {"b": 1}}
+    assert persister.is_own_write(serialize_config({"a": {"b": 1}}))
+    assert not persister.is_own_write(serialize_config({"a": {"b": 2}}))
+
+
+def test_write_atomic_leaves_original_file_on_failure(tmp_path, monkeypatch):
+    path = tmp_path / "config.json"
+    path.write_text("original", encoding="utf-8")
+
+    def fail(*args):
+        raise OSError("磁碟已滿")
+
+    monkeypatch.setattr(os, "replace", fail)
+    with pytest.raises(OSError):
+        write_atomic(str(path), "updated")
+    assert path.read_text(encoding="utf-8") == "original"
+    # 暫存文件已刪除
+    assert os.listdir(tmp_path) == ["config.json"]
+
+
+def test_failed_write_is_counted(tmp_path):
+    persister = ConfigPersister(str(tmp_path / "missing" / "config.json"))
+    persister.schedule({"a": {}})
+    persister.flush()
+    assert persister.get_stats()["failed"] == 1
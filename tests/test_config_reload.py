@@ -0,0 +1,109 @@
+import json
+import time
+
+import pytest
+
+from app.backends import get_backend
+from app.config_manager import ConfigManager
+from app.config_watcher import ConfigWatcher
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return condition()
+
+
+@pytest.fixture
+def manager(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"executor": {"queue_size": 32}}), encoding="utf-8")
+    manager = ConfigManager(str(path))
+    manager.flush()
+    manager.notified = []
+    manager.subscribe(manager.notified.append)
+    return manager
+
+
+def edit(manager, section, key, value):
+    """以外部編輯的方式修改配置文件"""
+    with open(manager.config_file, encoding="utf-8") as f:
+        data = json.load(f)
+    data[section][key] = value
+    with open(manager.config_file, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+def test_reload_applies_external_edit(manager):
+    version = manager.snapshot.version
+    edit(manager, "executor", "queue_size", 64)
+    assert manager.reload() is True
+    assert manager.snapshot.executor.queue_size == 64
+    assert manager.snapshot.version == version + 1
+    assert manager.notified == [manager.snapshot]
+
+    # 內容未變更時不換上新快照
+    assert manager.reload() is False
+
+
+@pytest.mark.parametrize("content", ["{broken", "[]", '{"server": {"port": 80.5}}'])
+def test_reload_keeps_current_config_when_file_is_invalid(manager, content):
+    before = manager.snapshot
+    with open(manager.config_file, "w", encoding="utf-8") as f:
+        f.write(content)
+    assert manager.reload() is False
+    assert manager.snapshot is before
+    assert manager.notified == []
+
+
+def test_reload_ignores_own_writes(manager):
+    manager.set("executor", "queue_size", 16)
+    manager.flush()
+    assert manager.reload() is False
+    assert len(manager.notified) == 1
+
+
+def test_watcher_check_detects_changes_by_stat(manager):
+    watcher = ConfigWatcher(manager)
+    assert watcher.check() is False
+    edit(manager, "executor", "queue_size", 48)
+    assert watcher.check() is True
+    assert watcher.reloads == 1
+    assert manager.snapshot.executor.queue_size == 48
+
+
+def test_watcher_thread_reloads_on_file_event(manager):
+    watcher = ConfigWatcher(manager, poll_interval=0.1)
+    watcher.start()
+    try:
+        edit(manager, "executor", "queue_size", 40)
+        assert wait_for(lambda: manager.snapshot.executor.queue_size == 40)
+    finally:
+        watcher.stop()
+    assert watcher.reloads == 1
+
+
+def test_resilience_settings_apply_to_running_backend(configure):
+    backend = get_backend()
+    configure(
+        {
+            "resilience": {
+                "verify_timeout_seconds": 7,
+                "breaker_failure_threshold": 9,
+                "max_concurrent_calls": 3,
+            }
+        }
+    )
+    assert backend.verify_timeout == 7
+    assert backend.breaker.failure_threshold == 9
+    assert backend.max_concurrent_calls == 3
+
+
+def test_restart_only_backend_settings_keep_running_backend(configure):
+    backend = get_backend()
+    configure({"backend": {"memory_latency_ms": 5}})
+    assert get_backend() is backend
+    assert backend.inner.name == "memory"
@@ -0,0 +1,80 @@
+import json
+
+import pytest
+
+from app.config_manager import ConfigManager, ConfigValidationError, get_config
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    def write(data):
+        path = tmp_path / "config.json"
+        path.write_text(json.dumps(data), encoding="utf-8")
+        return str(path)
+
+    return write
+
+
+def test_snapshot_cannot_be_modified():
+    snapshot = get_config().snapshot
+    with pytest.raises(AttributeError):
+        snapshot.server.port = 80
+    with pytest.raises(AttributeError):
+        snapshot.server = None
+    with pytest.raises(TypeError):
+        snapshot.backend.memory_users["mallory"] = "secret"
+
+
+def test_update_replaces_snapshot_and_keeps_old_one_intact(configure):
+    config = get_config()
+    before = config.snapshot
+    queue_size = before.executor.queue_size
+    configure({"executor": {"queue_size": queue_size + 1}})
+
+    after = config.snapshot
+    assert after.version == before.version + 1
+    assert after.etag != before.etag
+    assert after.executor.queue_size == queue_size + 1
+    # 已取得舊快照的讀取者看到的值不變
+    assert before.executor.queue_size == queue_size
+
+
+@pytest.mark.parametrize(
+    "section, key, value",
+    [
+        ("server", "port", 80.5),
+        ("server", "workers", 2.5),
+        ("batch", "parallelism", 1.5),
+        ("batch", "parallelism", 2.0),
+        ("executor", "max_workers", True),
+        ("server", "port", 70000),
+        ("logging", "level", "VERBOSE"),
+    ],
+)
+def test_invalid_values_are_rejected(section, key, value):
+    config = get_config()
+    before = config.snapshot
+    with pytest.raises(ConfigValidationError):
+        config.patch({section: {key: value}})
+    assert config.snapshot is before
+
+
+def test_patch_endpoint_rejects_fractional_integers(client):
+    response = client.patch("/api/config", json={"server": {"workers": 2.5}})
+    assert response.status_code == 400
+    assert "server.workers 必須是整數" in response.text
+
+
+def test_float_settings_still_accept_fractions(configure):
+    configure({"backend": {"memory_error_rate": 0.5}})
+    assert get_config().snapshot.backend.memory_error_rate == 0.5
+
+
+def test_invalid_values_in_file_fall_back_to_defaults(config_file):
+    path = config_file({"server": {"port": 80.5, "workers": 3}})
+    manager = ConfigManager(path)
+    manager.flush()
+    assert (
+        manager.snapshot.server.port == ConfigManager.DEFAULT_CONFIG["server"]["port"]
+    )
+    assert manager.snapshot.server.workers == 3
@@ -0,0 +1,52 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.executor import BackendExecutor, ExecutorBusyError, get_executor
+
+
+def test_rejects_when_workers_and_queue_are_full():
+    executor = BackendExecutor(max_workers=1, queue_size=1)
+    release = threading.Event()
+
+    async def scenario():
+        running = [
+            asyncio.ensure_future(executor.run(release.wait, 5)) for _ in range(2)
+        ]
+        # 讓兩個任務佔用執行與排隊名額
+        await asyncio.sleep(0)
+        with pytest.raises(ExecutorBusyError):
+            await executor.run(release.wait, 5)
+        release.set()
+        return await asyncio.gather(*running)
+
+    try:
+        assert asyncio.run(scenario()) == [True, True]
+        stats = executor.get_stats()
+        assert stats["rejected"] == 1
+        assert stats["completed"] == 2
+    finally:
+        executor.shutdown()
+
+
+def test_change_password_returns_503_when_executor_is_full(
+    user, change_password, backend_gate
+):
+    executor = get_executor()
+    max_workers, queue_size = executor.max_workers, executor.queue_size
+    executor.resize(1, 0)
+    try:
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            first = pool.submit(change_password, user)
+            assert backend_gate.entered.wait(5)
+
+            response = change_password(user, current_password="other")
+            assert response.status_code == 503
+            assert "伺服器忙碌中" in response.text
+
+            backend_gate.release()
+            assert first.result(timeout=10).status_code == 200
+    finally:
+        executor.resize(max_workers, queue_size)
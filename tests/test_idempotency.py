@@ -0,0 +1,37 @@
+import uuid
+
+from app.backends import get_backend
+
+
+def test_retry_with_same_key_replays_first_result(user, change_password):
+    headers = {"Idempotency-Key": uuid.uuid4().hex}
+    first = change_password(user, headers=headers)
+    assert first.status_code == 200
+    assert "已成功修改" in first.text
+    assert "idempotent-replayed" not in first.headers
+
+    # 密碼已經修改，重新執行會因目前密碼不正確而失敗
+    retry = change_password(user, headers=headers)
+    assert retry.status_code == 200
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert "已成功修改" in retry.text
+
+
+def test_retry_without_key_runs_again(user, change_password):
+    assert "已成功修改" in change_password(user).text
+    assert "目前密碼不正確" in change_password(user).text
+
+
+def test_retryable_failures_are_not_replayed(user, change_password, monkeypatch):
+    inner = get_backend().inner
+    headers = {"Idempotency-Key": uuid.uuid4().hex}
+
+    monkeypatch.setattr(inner, "error_rate", 1.0)
+    failed = change_password(user, headers=headers)
+    assert "已成功修改" not in failed.text
+
+    # 後端恢復後以同一冪等鍵重試會重新執行
+    monkeypatch.setattr(inner, "error_rate", 0.0)
+    retry = change_password(user, headers=headers)
+    assert "idempotent-replayed" not in retry.headers
+    assert "已成功修改" in retry.text
@@ -0,0 +1,65 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from app.keyed_lock import KeyedSingleFlight
+
+
+def test_identical_requests_in_flight_share_one_execution():
+    gate = KeyedSingleFlight()
+    fingerprint = gate.fingerprint("alice", "old", "new")
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def operation():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {"success": True}
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        leader = pool.submit(gate.run, "alice", fingerprint, operation)
+        assert started.wait(5)
+        followers = [
+            pool.submit(gate.run, "alice", fingerprint, operation) for _ in range(2)
+        ]
+        # 等待跟隨者加入進行中的操作後才放行
+        while gate.get_stats()["coalesced"] < 2:
+            time.sleep(0.01)
+        release.set()
+        results = [f.result(timeout=5) for f in [leader, *followers]]
+
+    assert calls == [1]
+    assert results == [{"success": True}] * 3
+    stats = gate.get_stats()
+    assert stats["executed"] == 1
+    assert stats["coalesced"] == 2
+
+
+def test_different_requests_for_same_user_run_in_order():
+    gate = KeyedSingleFlight()
+    active = []
+    overlaps = []
+
+    def operation(name):
+        def run():
+            if active:
+                overlaps.append(name)
+            active.append(name)
+            time.sleep(0.05)
+            active.remove(name)
+            return name
+
+        return run
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        futures = [
+            pool.submit(gate.run, "alice", gate.fingerprint(name), operation(name))
+            for name in ("first", "second")
+        ]
+        results = sorted(f.result(timeout=5) for f in futures)
+
+    assert results == ["first", "second"]
+    assert overlaps == []
+    assert gate.get_stats()["executed"] == 2
@@ -0,0 +1,112 @@
+import logging
+import threading
+import types
+
+import pytest
+
+import main
+from app.backends import get_backend
+
+
+class RecordingHandler(logging.Handler):
+    def __init__(self, events):
+        super().__init__()
+        self.events = events
+
+    def emit(self, record):
+        self.events.append(record.getMessage())
+
+
+@pytest.fixture
+def started(monkeypatch):
+    get_backend()
+    monkeypatch.setattr(main, "server_instance", types.SimpleNamespace(started=True))
+
+
+def test_healthz(client):
+    assert client.get("/healthz").json() == {"status": "ok"}
+
+
+def test_readyz_reports_each_check(client, started):
+    response = client.get("/readyz")
+    assert response.status_code == 200
+    assert response.json() == {
+        "status": "ready",
+        "checks": {"server": True, "config": True, "backend": True, "logging": True},
+    }
+
+
+def test_readyz_fails_before_server_is_listening(client, monkeypatch):
+    monkeypatch.setattr(main, "server_instance", None)
+    response = client.get("/readyz")
+    assert response.status_code == 503
+    assert response.json()["checks"]["server"] is False
+
+
+def test_readyz_fails_while_breaker_is_open(client, started, monkeypatch):
+    monkeypatch.setattr(
+        main, "get_backend_stats", lambda: {"breaker": {"state": "open"}}
+    )
+    response = client.get("/readyz")
+    assert response.status_code == 503
+    assert response.json()["checks"]["backend"] is False
+
+
+@pytest.fixture
+def lifecycle(monkeypatch):
+    """
+    以不影響其他測試的方式執行 main() 與 shutdown_application()，
+    記錄日誌訊息與 shutdown_logging 的呼叫順序
+    """
+    events = []
+    monkeypatch.setattr(main, "stop_event", threading.Event())
+    monkeypatch.setattr(main, "shutdown_once", threading.Lock())
+    monkeypatch.setattr(main, "server_instance", None)
+    monkeypatch.setattr(main, "worker_supervisor", None)
+    monkeypatch.setattr(main, "listeners", None)
+    monkeypatch.setattr(main, "shared_state", None)
+    monkeypatch.setattr(main, "start_config_watcher", lambda: None)
+    monkeypatch.setattr(main, "stop_config_watcher", lambda: None)
+    monkeypatch.setattr(main, "shutdown_backend", lambda: events.append("backend"))
+    monkeypatch.setattr(
+        main, "executor", types.SimpleNamespace(shutdown=lambda wait: None)
+    )
+    monkeypatch.setattr(
+        main, "get_log_follower", lambda: types.SimpleNamespace(stop=lambda: None)
+    )
+    monkeypatch.setattr(
+        main, "shutdown_logging", lambda: events.append("shutdown_logging")
+    )
+    monkeypatch.setattr(main.signal, "signal", lambda *args: None)
+
+    handler = RecordingHandler(events)
+    main.logger.addHandler(handler)
+    yield events
+    main.logger.removeHandler(handler)
+
+
+def test_shutdown_runs_once(lifecycle):
+    main.shutdown_application()
+    main.shutdown_application()
+    assert lifecycle.count("backend") == 1
+    assert main.stop_event.is_set()
+    # 日誌由 main() 在最後才關閉
+    assert "shutdown_logging" not in lifecycle
+
+
+def test_exit_message_is_logged_before_logging_stops(lifecycle, monkeypatch):
+    monkeypatch.setattr(main, "run_server_in_thread", lambda **kwargs: (True, 18080))
+
+    def initialize_tray(port):
+        # 模擬使用者從托盤選擇退出
+        threading.Timer(0.1, main.shutdown_application).start()
+
+    monkeypatch.setattr(main, "initialize_tray", initialize_tray)
+    assert main.main() == 0
+    assert lifecycle[-3:] == ["應用程式關閉完成", "應用程式退出", "shutdown_logging"]
+
+
+def test_startup_failure_still_stops_logging(lifecycle, monkeypatch):
+    monkeypatch.setattr(main, "run_server_in_thread", lambda **kwargs: (False, 0))
+    assert main.main() == 1
+    assert lifecycle[-2:] == ["應用程式退出", "shutdown_logging"]
@@ -0,0 +1,95 @@
+import os
+import socket
+
+import pytest
+
+from app.listeners import PortInUseError, _listen_unix, bind_listeners
+
+unix_only = pytest.mark.skipif(
+    not hasattr(socket, "AF_UNIX"), reason="此系統不支援 Unix socket"
+)
+
+
+@pytest.fixture
+def bound():
+    listeners = []
+
+    def bind(*args, **kwargs):
+        result = bind_listeners(*args, **kwargs)
+        listeners.append(result)
+        return result
+
+    yield bind
+    for result in listeners:
+        result.close()
+
+
+@pytest.fixture
+def occupied_port():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.listen(1)
+    yield sock.getsockname()[1]
+    sock.close()
+
+
+def test_system_assigned_port_is_shared_by_all_addresses(bound):
+    listeners = bound("localhost", 0, ipv6=True)
+    ports = {sock.getsockname()[1] for sock in listeners.sockets}
+    assert ports == {listeners.port}
+    assert listeners.addresses[0] == f"127.0.0.1:{listeners.port}"
+    if len(listeners.sockets) == 2:
+        assert listeners.addresses[1] == f"[::1]:{listeners.port}"
+
+
+def test_port_in_use_falls_back_to_next_port(bound, occupied_port):
+    listeners = bound("127.0.0.1", occupied_port, ipv6=False, fallback_attempts=5)
+    assert listeners.port > occupied_port
+    stats = listeners.get_stats()
+    assert stats["configured_port"] == occupied_port
+    assert stats["port_fallback"] is True
+
+
+def test_port_in_use_without_fallback_raises(bound, occupied_port):
+    with pytest.raises(PortInUseError):
+        bound("127.0.0.1", occupied_port, ipv6=False)
+
+
+@unix_only
+def test_stale_unix_socket_file_is_replaced(bound, tmp_path):
+    path = str(tmp_path / "app.sock")
+    # 上次執行留下的 socket 文件：已綁定但沒有程序在監聽
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(path)
+    stale.close()
+    assert os.path.exists(path)
+
+    listeners = bound("127.0.0.1", 0, ipv6=False, unix_socket=path)
+    assert listeners.unix_socket == path
+    assert listeners.addresses[-1] == f"unix:{path}"
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.connect(path)
+    client.close()
+
+    listeners.close()
+    assert not os.path.exists(path)
+
+
+@unix_only
+def test_unix_socket_in_use_is_not_removed(tmp_path):
+    path = str(tmp_path / "app.sock")
+    active = _listen_unix(path, 1)
+    try:
+        with pytest.raises(PortInUseError):
+            _listen_unix(path, 1)
+        assert os.path.exists(path)
+    finally:
+        active.close()
+
+
+@unix_only
+def test_unusable_unix_socket_keeps_tcp_listeners(bound, tmp_path):
+    path = str(tmp_path / "missing" / "app.sock")
+    listeners = bound("127.0.0.1", 0, ipv6=False, unix_socket=path)
+    assert listeners.unix_socket is None
+    assert len(listeners.sockets) == 1
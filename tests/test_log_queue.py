@@ -0,0 +1,105 @@
+import queue
+import logging
+import threading
+
+from app.logger import LogWriter, QueuedLogHandler
+
+
+class CollectingHandler(logging.Handler):
+    """記錄收到的訊息與 flush 次數"""
+
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+        self.flushes = 0
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+    def flush(self):
+        self.flushes += 1
+
+
+def record(message, level=logging.INFO):
+    return logging.makeLogRecord(
+        {"msg": message, "levelno": level, "levelname": logging.getLevelName(level)}
+    )
+
+
+def make_handler(policy, maxsize=2):
+    """
+    創建寫入線程尚未取出記錄的處理器，模擬寫入速度跟不上
+
+    :return: (處理器, 收集輸出的處理器)
+    """
+    output = CollectingHandler()
+    writer = LogWriter(queue.Queue(maxsize), [output])
+    writer.running = True
+    return QueuedLogHandler(writer.queue, writer, policy), output
+
+
+def queued_messages(handler):
+    return [item.getMessage() for item in list(handler.queue.queue)]
+
+
+def test_writer_drains_queue_in_batches():
+    output = CollectingHandler()
+    writer = LogWriter(queue.Queue(1000), [output])
+    handler = QueuedLogHandler(writer.queue, writer)
+    writer.start()
+    for i in range(500):
+        handler.emit(record(f"line {i}"))
+    writer.stop()
+
+    assert output.messages == [f"line {i}" for i in range(500)]
+    assert writer.written == 500
+    # 每批只 flush 一次
+    assert output.flushes <= writer.batches + 1 < 500
+
+
+def test_records_are_written_synchronously_after_writer_stops():
+    output = CollectingHandler()
+    writer = LogWriter(queue.Queue(10), [output])
+    handler = QueuedLogHandler(writer.queue, writer)
+    handler.emit(record("before start"))
+    assert output.messages == ["before start"]
+    assert writer.queue.empty()
+
+
+def test_drop_debug_policy_drops_only_debug_records():
+    handler, _ = make_handler("drop_debug")
+    handler.emit(record("a"))
+    handler.emit(record("b"))
+    handler.emit(record("noise", logging.DEBUG))
+    assert queued_messages(handler) == ["a", "b"]
+    stats = handler.get_stats()
+    assert stats["dropped"] == 1
+    assert stats["dropped_by_level"] == {"DEBUG": 1}
+
+
+def test_drop_oldest_policy_keeps_newest_records():
+    handler, _ = make_handler("drop_oldest")
+    for message in ("a", "b", "c", "d"):
+        handler.emit(record(message, logging.WARNING))
+    assert queued_messages(handler) == ["c", "d"]
+    assert handler.get_stats()["dropped_by_level"] == {"WARNING": 2}
+
+
+def test_block_policy_waits_for_room_in_queue():
+    handler, _ = make_handler("block", maxsize=1)
+    handler.emit(record("a"))
+    emitted = threading.Event()
+    thread = threading.Thread(target=lambda: (handler.emit(record("b")), emitted.set()))
+    thread.start()
+    assert not emitted.wait(0.2)
+
+    handler.queue.get_nowait()
+    assert emitted.wait(2)
+    thread.join(2)
+    assert queued_messages(handler) == ["b"]
+    assert handler.get_stats()["dropped"] == 0
+
+
+def test_unknown_policy_falls_back_to_drop_debug():
+    handler, _ = make_handler("bogus")
+    assert handler.policy == "drop_debug"
@@ -0,0 +1,151 @@
+import os
+import time
+import logging
+from datetime import date
+
+import pytest
+
+from app.log_rotation import (
+    DailyRotatingFileHandler,
+    LogMaintenance,
+    list_log_files,
+    log_file_name,
+    parse_log_name,
+)
+
+TODAY = date.today().isoformat()
+
+
+def emit(handler, message):
+    handler.handle(
+        logging.makeLogRecord(
+            {"msg": message, "levelno": logging.INFO, "created": time.time()}
+        )
+    )
+
+
+@pytest.fixture
+def make_handler(tmp_path):
+    handlers = []
+
+    def make(**kwargs):
+        handler = DailyRotatingFileHandler(str(tmp_path), "app", "log", **kwargs)
+        handler.rotated = []
+        handler.on_rotate = handler.rotated.append
+        handlers.append(handler)
+        return handler
+
+    yield make
+    for handler in handlers:
+        handler.close()
+
+
+def write(path, size, age_days=0):
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+    mtime = time.time() - age_days * 86400
+    os.utime(path, (mtime, mtime))
+    return str(path)
+
+
+def test_log_names_round_trip():
+    assert log_file_name("app", "log", "2024-01-02") == "app_2024-01-02.log"
+    assert log_file_name("app", "log", "2024-01-02", 3) == "app_2024-01-02.3.log"
+    assert parse_log_name("app", "log", "app_2024-01-02.3.log.zst") == (
+        "2024-01-02",
+        3,
+        True,
+    )
+    assert parse_log_name("app", "log", "other_2024-01-02.log") is None
+
+
+def test_list_log_files_orders_parts_before_current_file(tmp_path):
+    for name in [
+        "app_2024-01-02.log",
+        "app_2024-01-02.2.log.zst",
+        "app_2024-01-01.log",
+        "app_2024-01-02.1.log",
+        "unrelated.txt",
+    ]:
+        (tmp_path / name).write_text("")
+    names = [os.path.basename(p) for p in list_log_files(str(tmp_path), "app", "log")]
+    assert names == [
+        "app_2024-01-01.log",
+        "app_2024-01-02.1.log",
+        "app_2024-01-02.2.log.zst",
+        "app_2024-01-02.log",
+    ]
+
+
+def test_size_rollover_numbers_parts_within_the_day(make_handler, tmp_path):
+    handler = make_handler(max_bytes=50)
+    for i in range(6):
+        emit(handler, f"record {i:02d} " + "y" * 20)
+
+    assert os.path.basename(handler.baseFilename) == f"app_{TODAY}.log"
+    assert [os.path.basename(p) for p in handler.rotated] == [
+        f"app_{TODAY}.1.log",
+        f"app_{TODAY}.2.log",
+    ]
+    content = "".join(
+        open(p, encoding="utf-8").read()
+        for p in list_log_files(str(tmp_path), "app", "log")
+    )
+    assert [line.split()[1] for line in content.splitlines()] == [
+        f"{i:02d}" for i in range(6)
+    ]
+
+
+def test_daily_rollover_switches_to_new_file(make_handler):
+    handler = make_handler()
+    emit(handler, "today")
+    # 模擬寫入中的文件屬於前一天
+    yesterday = handler.baseFilename
+    handler._day = "2000-01-01"
+    handler._next_rollover = 0
+
+    emit(handler, "after midnight")
+    assert handler.rotated == [yesterday]
+    assert handler._day == TODAY
+    assert handler._next_rollover > time.time()
+
+
+def test_maintenance_enforces_retention_and_budget(make_handler, tmp_path):
+    handler = make_handler()
+    emit(handler, "active")
+    maintenance = LogMaintenance(
+        str(tmp_path), max_total_bytes=3500, retention_days=30, compress=False
+    )
+    maintenance.register(handler)
+    expired = write(tmp_path / "app_2000-01-01.log", 100, age_days=400)
+    oldest = write(tmp_path / "app_2024-01-01.log", 1000, age_days=3)
+    older = write(tmp_path / "app_2024-01-02.log", 1000, age_days=2)
+    newest = write(tmp_path / "app_2024-01-03.log", 1000, age_days=1)
+    unrelated = write(tmp_path / "notes.txt", 1000, age_days=400)
+
+    # 總容量計入目錄內所有文件：刪除過期文件後仍超過上限，再刪除最舊的文件
+    maintenance.run_once()
+    assert not os.path.exists(expired)
+    assert not os.path.exists(oldest)
+    # 其他程式的文件與寫入中的文件不會被刪除
+    for path in (older, newest, unrelated, handler.baseFilename):
+        assert os.path.exists(path)
+    assert maintenance.deleted == 2
+
+
+def test_maintenance_compresses_rotated_files(make_handler, tmp_path):
+    zstandard = pytest.importorskip("zstandard")
+    handler = make_handler()
+    emit(handler, "active")
+    maintenance = LogMaintenance(str(tmp_path))
+    maintenance.register(handler)
+    rotated = write(tmp_path / "app_2024-01-01.1.log", 1000, age_days=1)
+    mtime = os.stat(rotated).st_mtime
+
+    maintenance.run_once()
+    assert not os.path.exists(rotated)
+    assert not os.path.exists(handler.baseFilename + ".zst")
+    with open(rotated + ".zst", "rb") as f:
+        assert zstandard.ZstdDecompressor().stream_reader(f).read() == b"x" * 1000
+    assert os.stat(rotated + ".zst").st_mtime == pytest.approx(mtime)
+    assert maintenance.compressed == 1
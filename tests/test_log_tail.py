@@ -0,0 +1,109 @@
+import os
+import asyncio
+from datetime import date
+
+import pytest
+
+from app.log_tail import LogFollower, read_last_lines
+
+TODAY = date.today().isoformat()
+
+
+def append(path, text):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(text)
+
+
+@pytest.fixture
+def log_dir(tmp_path):
+    append(tmp_path / f"app_{TODAY}.log", "one\ntwo\n")
+    return tmp_path
+
+
+@pytest.fixture
+def follower(log_dir):
+    follower = LogFollower(str(log_dir), "app", "log", poll_interval=0.05)
+    yield follower
+    follower.stop()
+
+
+async def receive(subscription, count, timeout=5.0):
+    """
+    接收至少 count 行新增的行
+    """
+    lines = []
+    while len(lines) < count:
+        batch = await asyncio.wait_for(subscription.queue.get(), timeout)
+        assert batch is not None
+        lines.extend(batch)
+    return lines
+
+
+def test_read_last_lines_across_blocks(tmp_path):
+    path = tmp_path / "app.log"
+    append(path, "".join(f"line {i}\n" for i in range(10)))
+    size = os.path.getsize(path)
+    assert read_last_lines(str(path), 3, size, block_size=4) == [
+        "line 7",
+        "line 8",
+        "line 9",
+    ]
+    assert len(read_last_lines(str(path), 100, size, block_size=4)) == 10
+    # 只讀取到 end 位置為止
+    assert read_last_lines(str(path), 1, len("line 0\n"), block_size=4) == ["line 0"]
+    assert read_last_lines(str(path), 0, size) == []
+
+
+def test_subscribe_returns_tail_then_streams_new_lines(follower, log_dir):
+    path = log_dir / f"app_{TODAY}.log"
+
+    async def scenario():
+        subscription, lines = follower.subscribe(asyncio.get_running_loop(), 1)
+        assert lines == ["two"]
+        # 寫到一半的行等寫完後才分送
+        append(path, "three\nfo")
+        assert await receive(subscription, 1) == ["three"]
+        append(path, "ur\n")
+        assert await receive(subscription, 1) == ["four"]
+
+    asyncio.run(scenario())
+
+
+def test_follows_size_rotation_by_inode(follower, log_dir):
+    path = log_dir / f"app_{TODAY}.log"
+
+    async def scenario():
+        subscription, _ = follower.subscribe(asyncio.get_running_loop(), 0)
+        # 在追蹤線程下次讀取前寫入並輪替，舊文件剩下的行仍須送出
+        with follower._lock:
+            append(path, "before rotation\n")
+            os.rename(path, log_dir / f"app_{TODAY}.1.log")
+            append(path, "after rotation\n")
+        assert await receive(subscription, 2) == ["before rotation", "after rotation"]
+
+    asyncio.run(scenario())
+    assert follower.get_stats()["rotations"] == 1
+
+
+def test_truncated_file_is_read_from_start(follower, log_dir):
+    path = log_dir / f"app_{TODAY}.log"
+
+    async def scenario():
+        subscription, _ = follower.subscribe(asyncio.get_running_loop(), 0)
+        with follower._lock:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("x\n")
+        assert await receive(subscription, 1) == ["x"]
+
+    asyncio.run(scenario())
+
+
+def test_stop_closes_subscriptions(follower):
+    async def scenario():
+        subscription, _ = follower.subscribe(asyncio.get_running_loop(), 0)
+        follower.stop()
+        assert await asyncio.wait_for(subscription.queue.get(), 5) is None
+        assert subscription.closed
+
+    asyncio.run(scenario())
+    assert follower.get_stats()["subscribers"] == 0
@@ -0,0 +1,87 @@
+import pytest
+
+from app.backends import BackendError, get_backend
+from app.negative_cache import get_negative_cache
+from app.services import PasswordService
+from conftest import PASSWORD, NEW_PASSWORD
+
+
+@pytest.fixture
+def inner(configure, monkeypatch):
+    """
+    啟用否定結果快取，並計算記憶體後端收到的驗證與查詢次數
+    """
+    configure({"negative_cache": {"enabled": True}})
+    backend = get_backend().inner
+    backend.calls = []
+    for method in ("check_credentials", "lookup_user"):
+        original = getattr(backend, method)
+
+        def counted(*args, method=method, original=original):
+            backend.calls.append(method)
+            return original(*args)
+
+        monkeypatch.setattr(backend, method, counted)
+    return backend
+
+
+def change(username, current_password=PASSWORD):
+    return PasswordService.change_password(username, current_password, NEW_PASSWORD)
+
+
+def test_wrong_password_is_cached_after_lookup(inner, user):
+    assert change(user, "wrong")["success"] is False
+    assert inner.calls == ["check_credentials", "lookup_user"]
+
+    # 相同的錯誤密碼不再呼叫後端，正確的密碼不受影響
+    assert change(user, "wrong")["success"] is False
+    assert inner.calls == ["check_credentials", "lookup_user"]
+    assert change(user)["success"] is True
+
+
+def test_wrong_password_for_missing_user_caches_the_user(inner, user, monkeypatch):
+    # win32 後端的 LogonUser 對不存在的使用者也回報密碼錯誤
+    monkeypatch.setattr(
+        inner, "check_credentials", lambda username, password: inner.WRONG_PASSWORD
+    )
+    missing = f"{user}-missing"
+    assert change(missing, "one")["success"] is False
+    assert get_negative_cache().is_known_failure(missing.upper(), "another")
+
+
+def test_unknown_user_outcome_is_cached_without_lookup(inner, user):
+    missing = f"{user}-missing"
+    assert change(missing)["success"] is False
+    assert change(missing, "another")["success"] is False
+    assert inner.calls == ["check_credentials"]
+
+
+def test_lookup_failure_records_nothing(inner, user, monkeypatch):
+    def lookup_user(username):
+        raise BackendError("模擬的查詢故障")
+
+    monkeypatch.setattr(inner, "lookup_user", lookup_user)
+    assert change(user, "wrong")["success"] is False
+    assert not get_negative_cache().is_known_failure(user, "wrong")
+
+
+def test_account_state_failures_are_not_cached(inner, user, monkeypatch):
+    monkeypatch.setattr(
+        inner, "check_credentials", lambda username, password: inner.ACCOUNT_UNUSABLE
+    )
+    assert change(user)["success"] is False
+    assert not get_negative_cache().is_known_failure(user, PASSWORD)
+
+
+def test_password_change_clears_cached_failure_for_new_password(inner, user):
+    cache = get_negative_cache()
+    cache.record_failed_verification(user, NEW_PASSWORD)
+    assert change(user)["success"] is True
+    assert not cache.is_known_failure(user, NEW_PASSWORD)
+
+
+def test_disabled_cache_skips_lookup(inner, user, configure):
+    configure({"negative_cache": {"enabled": False}})
+    assert change(user, "wrong")["success"] is False
+    assert change(user, "wrong")["success"] is False
+    assert inner.calls == ["check_credentials", "check_credentials"]
@@ -0,0 +1,144 @@
+import os
+import glob
+import time
+import threading
+
+import pytest
+
+from app.backends import BackendError, BackendRejectedError, BackendTimeoutError
+from app.logger import get_log_folder
+from app.process_pool import ProcessBackendPool
+
+SETTINGS = {
+    "type": "memory",
+    "memory_users": {"alice": "secret"},
+    "memory_latency_ms": 0,
+}
+
+
+def wait_for(condition, timeout=10.0):
+    """
+    等待條件成立
+
+    :param condition: 無參數的判斷函數
+    :param timeout: 最長等待時間（秒）
+    :return: 條件是否成立
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return condition()
+
+
+@pytest.fixture
+def make_pool():
+    pools = []
+
+    def make(settings=SETTINGS, **kwargs):
+        pool = ProcessBackendPool(dict(settings), **kwargs)
+        pools.append(pool)
+        return pool
+
+    yield make
+    for pool in pools:
+        pool.shutdown()
+
+
+def test_calls_run_in_worker_processes(make_pool):
+    pool = make_pool(workers=1)
+    assert pool.call("check_credentials", "alice", "secret") == "verified"
+    assert pool.call("lookup_user", "nobody") is None
+    # 明確的拒絕保留異常類型，斷路器才能與後端故障區分
+    with pytest.raises(BackendRejectedError):
+        pool.call("set_password", "nobody", "changed")
+
+
+def test_call_over_deadline_kills_and_replaces_worker(make_pool):
+    pool = make_pool(dict(SETTINGS, memory_latency_ms=2000), workers=1)
+    pid = pool._idle.queue[0].process.pid
+    started = time.monotonic()
+    with pytest.raises(BackendTimeoutError):
+        pool.call("check_credentials", "alice", "secret", timeout=0.2)
+    # 逾時立即返回，不等待卡住的呼叫
+    assert time.monotonic() - started < 1.5
+
+    assert wait_for(lambda: pool.get_stats()["idle"] == 1)
+    stats = pool.get_stats()
+    assert stats["timeouts"] == 1
+    assert stats["spawned"] == 2
+    assert pool._idle.queue[0].process.pid != pid
+
+
+def test_workers_are_recycled_after_max_calls(make_pool):
+    pool = make_pool(workers=1, max_calls_per_worker=2)
+    for _ in range(2):
+        assert pool.call("check_credentials", "alice", "secret") == "verified"
+    assert wait_for(lambda: pool.get_stats()["idle"] == 1)
+    assert pool.call("check_credentials", "alice", "secret") == "verified"
+    stats = pool.get_stats()
+    assert stats["recycled"] == 1
+    assert stats["spawned"] == 2
+
+
+def test_crashed_worker_is_replaced(make_pool):
+    pool = make_pool(workers=1)
+    worker = pool._idle.queue[0]
+    worker.process.kill()
+    worker.process.join(5)
+    with pytest.raises(BackendError):
+        pool.call("check_credentials", "alice", "secret")
+    assert pool.get_stats()["crashes"] == 1
+
+    assert wait_for(lambda: pool.get_stats()["idle"] == 1)
+    assert pool.call("check_credentials", "alice", "secret") == "verified"
+
+
+def test_worker_logs_are_written_by_parent(make_pool):
+    pool = make_pool(dict(SETTINGS, memory_users={"a": "1", "b": "2", "c": "3"}))
+
+    def logged():
+        for path in glob.glob(os.path.join(get_log_folder(), "password_change_*")):
+            with open(path, encoding="utf-8") as f:
+                if "記憶體憑證後端初始化, 使用者數: 3" in f.read():
+                    return True
+        return False
+
+    # 每個工作進程創建後端時的日誌都轉送到主進程寫入
+    assert pool.workers == 2
+    assert wait_for(logged)
+
+
+def test_resize_grows_and_shrinks_pool(make_pool):
+    pool = make_pool(workers=1)
+    pool.resize(3, 1000, 30)
+    assert wait_for(lambda: pool.get_stats()["idle"] == 3)
+
+    pool.resize(1, 1000, 30)
+    assert wait_for(lambda: pool.get_stats()["idle"] == 1)
+    assert pool.workers == 1
+    assert pool.call("check_credentials", "alice", "secret") == "verified"
+    assert wait_for(lambda: pool.get_stats()["idle"] == 1)
+
+
+def test_shrinking_retires_busy_worker_after_its_call(make_pool):
+    pool = make_pool(dict(SETTINGS, memory_latency_ms=300), workers=1)
+    results = []
+    caller = threading.Thread(
+        target=lambda: results.append(pool.call("check_credentials", "alice", "secret"))
+    )
+    caller.start()
+    assert wait_for(lambda: pool.get_stats()["idle"] == 0)
+    pool.resize(2, 1000, 30)
+    assert wait_for(lambda: pool.get_stats()["idle"] == 1)
+
+    # 縮減時閒置的工作進程立即停止，忙碌的在完成呼叫後停止且不再補上
+    pool.resize(1, 1000, 30)
+    assert pool.get_stats()["idle"] == 0
+    caller.join(5)
+    assert results == ["verified"]
+    time.sleep(0.2)
+    stats = pool.get_stats()
+    assert stats["idle"] == 1
+    assert stats["spawned"] == 2
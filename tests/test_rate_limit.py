@@ -0,0 +1,64 @@
+import time
+
+from app.rate_limit import TokenBucketLimiter
+
+
+def test_bucket_allows_burst_then_refills(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    limiter = TokenBucketLimiter(rate_per_minute=60, burst=2)
+
+    assert limiter.allow("alice") == (True, 0.0)
+    assert limiter.allow("alice") == (True, 0.0)
+    allowed, retry_after = limiter.allow("alice")
+    assert allowed is False
+    assert retry_after == 1.0
+
+    now[0] += 1.0
+    assert limiter.allow("alice")[0] is True
+
+
+def test_least_recently_used_keys_are_evicted():
+    limiter = TokenBucketLimiter(rate_per_minute=1, burst=1, max_entries=2)
+    limiter.allow("alice")
+    limiter.allow("bob")
+    limiter.allow("alice")
+    limiter.allow("carol")
+    stats = limiter.get_stats()
+    assert stats["tracked_keys"] == 2
+    assert stats["evicted"] == 1
+    # 最近使用的 alice 仍受限；已被淘汰的 bob 重新追蹤時令牌桶是滿的
+    assert limiter.allow("alice")[0] is False
+    assert limiter.allow("bob")[0] is True
+
+
+def test_user_over_limit_gets_429_with_retry_after(user, change_password, configure):
+    configure(
+        {
+            "rate_limit": {
+                "enabled": True,
+                "user_requests_per_minute": 1,
+                "user_burst": 1,
+            }
+        }
+    )
+    assert change_password(user).status_code == 200
+
+    response = change_password(user)
+    assert response.status_code == 429
+    assert "請求過於頻繁" in response.text
+    assert 1 <= int(response.headers["retry-after"]) <= 61
+
+
+def test_limit_is_per_user(user, change_password, configure):
+    configure(
+        {
+            "rate_limit": {
+                "enabled": True,
+                "user_requests_per_minute": 1,
+                "user_burst": 1,
+            }
+        }
+    )
+    assert change_password(user).status_code == 200
+    assert change_password(f"{user}-other").status_code == 200
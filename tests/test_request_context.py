@@ -0,0 +1,67 @@
+import re
+import logging
+
+from app.audit import AuditEvent
+from app.backends import get_backend
+from app.logger import get_logger
+from app.request_context import RequestIdFilter, get_request_id
+
+
+class CollectingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+        self.addFilter(RequestIdFilter())
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def test_response_carries_generated_request_id(client):
+    response = client.get("/api/status")
+    assert re.fullmatch(r"[0-9a-f]{16}", response.headers["x-request-id"])
+    assert client.get("/api/status").headers["x-request-id"] != (
+        response.headers["x-request-id"]
+    )
+
+
+def test_valid_client_request_id_is_kept(client):
+    response = client.get("/api/status", headers={"X-Request-ID": "trace-42.a:b"})
+    assert response.headers["x-request-id"] == "trace-42.a:b"
+
+
+def test_invalid_client_request_id_is_replaced(client):
+    response = client.get("/api/status", headers={"X-Request-ID": "bad id/" + "x" * 80})
+    assert re.fullmatch(r"[0-9a-f]{16}", response.headers["x-request-id"])
+
+
+def test_request_id_reaches_backend_thread_and_log_records(
+    user, change_password, monkeypatch
+):
+    inner = get_backend().inner
+    check_credentials = inner.check_credentials
+    seen = []
+
+    def recording(username, password):
+        seen.append(get_request_id())
+        return check_credentials(username, password)
+
+    monkeypatch.setattr(inner, "check_credentials", recording)
+    collected = CollectingHandler()
+    get_logger().addHandler(collected)
+    try:
+        response = change_password(user, headers={"X-Request-ID": "req-tagged"})
+    finally:
+        get_logger().removeHandler(collected)
+
+    assert response.headers["x-request-id"] == "req-tagged"
+    assert seen == ["req-tagged"]
+    events = [r for r in collected.records if isinstance(r.msg, AuditEvent)]
+    assert events
+    assert {r.request_id for r in events} == {"req-tagged"}
+
+
+def test_records_outside_requests_are_marked_with_dash():
+    record = logging.makeLogRecord({"msg": "startup"})
+    RequestIdFilter().filter(record)
+    assert record.request_id == "-"
@@ -0,0 +1,101 @@
+import time
+
+import pytest
+
+from app.backends import BackendError, BackendRejectedError, MemoryBackend, get_backend
+from app.config_manager import get_config
+from app.resilience import CircuitBreaker, CircuitOpenError, ResilientBackend
+from app.services import PasswordService
+from conftest import PASSWORD, NEW_PASSWORD
+
+
+class FlakyBackend(MemoryBackend):
+    """可切換為故障狀態的記憶體後端"""
+
+    def __init__(self):
+        super().__init__(users={"alice": "secret"})
+        self.failing = False
+
+    def lookup_user(self, username):
+        if self.failing:
+            raise BackendError("模擬的後端故障")
+        return super().lookup_user(username)
+
+
+@pytest.fixture
+def backend():
+    inner = FlakyBackend()
+    backend = ResilientBackend(
+        inner, breaker=CircuitBreaker(failure_threshold=2, reset_timeout=0.1)
+    )
+    yield backend
+    backend.shutdown()
+
+
+def test_breaker_opens_after_consecutive_failures(backend):
+    backend.inner.failing = True
+    for _ in range(2):
+        with pytest.raises(BackendError):
+            backend.lookup_user("alice")
+    assert backend.breaker.get_stats()["state"] == CircuitBreaker.OPEN
+
+    # 開啟期間不再呼叫後端
+    backend.inner.failing = False
+    with pytest.raises(CircuitOpenError):
+        backend.lookup_user("alice")
+    assert backend.breaker.get_stats()["rejected"] == 1
+
+
+def test_half_open_probe_success_closes_breaker(backend):
+    backend.inner.failing = True
+    for _ in range(2):
+        with pytest.raises(BackendError):
+            backend.lookup_user("alice")
+
+    time.sleep(0.15)
+    backend.inner.failing = False
+    assert backend.lookup_user("alice") == {"name": "alice"}
+    stats = backend.breaker.get_stats()
+    assert stats["state"] == CircuitBreaker.CLOSED
+    assert stats["consecutive_failures"] == 0
+
+
+def test_half_open_probe_failure_reopens_breaker(backend):
+    backend.inner.failing = True
+    for _ in range(2):
+        with pytest.raises(BackendError):
+            backend.lookup_user("alice")
+
+    time.sleep(0.15)
+    with pytest.raises(BackendError):
+        backend.lookup_user("alice")
+    stats = backend.breaker.get_stats()
+    assert stats["state"] == CircuitBreaker.OPEN
+    assert stats["opened_count"] == 2
+
+
+def test_definitive_rejections_do_not_open_breaker(backend):
+    for _ in range(5):
+        with pytest.raises(BackendRejectedError):
+            backend.set_password("nobody", "new")
+    assert backend.check_credentials("alice", "wrong") == backend.WRONG_PASSWORD
+    assert backend.breaker.get_stats()["state"] == CircuitBreaker.CLOSED
+
+
+def test_apply_config_updates_deadlines_and_thresholds(backend):
+    snapshot = get_config().snapshot
+    backend.apply_config(snapshot)
+    assert backend.verify_timeout == snapshot.resilience.verify_timeout_seconds
+    assert (
+        backend.breaker.failure_threshold
+        == snapshot.resilience.breaker_failure_threshold
+    )
+
+
+def test_verify_error_is_not_reported_as_wrong_password(user, monkeypatch):
+    monkeypatch.setattr(get_backend().inner, "error_rate", 1.0)
+    result = PasswordService.change_password(user, PASSWORD, NEW_PASSWORD)
+    assert result["success"] is False
+    assert result["retryable"] is True
+    assert "無法驗證目前密碼" in result["message"]
+    assert "目前密碼不正確" not in result["message"]
@@ -0,0 +1,112 @@
+import os
+import time
+import sqlite3
+
+import pytest
+
+from app.cache import SharedTTLCache
+from app.rate_limit import SharedTokenBucketLimiter
+from app.shared_state import SharedStateBusyError, SharedStateStore
+
+
+@pytest.fixture
+def store():
+    store = SharedStateStore.create_temporary()
+    yield store
+    store.destroy()
+
+
+@pytest.fixture
+def other(store):
+    """以另一個連線開啟同一個狀態儲存，模擬另一個工作進程"""
+    return SharedStateStore(store.path, busy_timeout=0.1, fast_timeout=0.05)
+
+
+def test_token_buckets_are_shared_between_stores(store, other):
+    limiter = SharedTokenBucketLimiter(store, "user", rate_per_minute=1, burst=2)
+    other_limiter = SharedTokenBucketLimiter(other, "user", rate_per_minute=1, burst=2)
+    assert limiter.allow("alice") == (True, 0.0)
+    assert other_limiter.allow("alice") == (True, 0.0)
+    allowed, retry_after = limiter.allow("alice")
+    assert allowed is False
+    assert 0 < retry_after <= 60
+    # 不同類別的令牌桶分開保存
+    assert SharedTokenBucketLimiter(other, "ip", 1, 1).allow("alice")[0] is True
+
+    stats = other_limiter.get_stats()
+    assert (stats["allowed"], stats["rejected"], stats["tracked_keys"]) == (2, 1, 1)
+
+
+def test_limiter_allows_requests_when_store_is_busy(store, other):
+    limiter = SharedTokenBucketLimiter(other, "user", rate_per_minute=1, burst=1)
+    blocker = sqlite3.connect(store.path, isolation_level=None)
+    blocker.execute("BEGIN IMMEDIATE")
+    try:
+        with pytest.raises(SharedStateBusyError):
+            other.take_token("user", "alice", 0.1, 1, 10)
+        assert limiter.allow("alice") == (True, 0.0)
+    finally:
+        blocker.execute("ROLLBACK")
+        blocker.close()
+
+
+def test_shared_cache_round_trips_json_values(store, other):
+    cache = SharedTTLCache(store, "users", ttl_seconds=60)
+    other_cache = SharedTTLCache(other, "users", ttl_seconds=60)
+    cache.set("alice", {"name": "alice", "groups": ("a", "b")})
+    assert other_cache.get("alice") == {"name": "alice", "groups": ["a", "b"]}
+    assert other_cache.get("bob", "missing") == "missing"
+
+    other_cache.delete("alice")
+    assert cache.get("alice") is None
+    # 每個實例的計數在取得統計時寫入共享計數器
+    other_cache.get_stats()
+    stats = cache.get_stats()
+    assert stats["entries"] == 0
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+
+
+def test_shared_cache_entries_expire(store):
+    cache = SharedTTLCache(store, "users", ttl_seconds=60)
+    cache.set("alice", True, ttl_seconds=0.05)
+    cache.set("bob", True)
+    time.sleep(0.1)
+    assert cache.get("alice") is None
+    assert cache.get("bob") is True
+    cache.clear()
+    assert cache.get("bob") is None
+
+
+def test_locks_are_exclusive_until_released(store, other):
+    assert store.acquire_lock("user:alice", "owner-1", lease=10)
+    assert not other.acquire_lock("user:alice", "owner-2", lease=10, timeout=0)
+    # 只能釋放自己持有的鎖
+    other.release_lock("user:alice", "owner-2")
+    assert not other.acquire_lock("user:alice", "owner-2", lease=10, timeout=0)
+
+    store.release_lock("user:alice", "owner-1")
+    assert other.acquire_lock("user:alice", "owner-2", lease=10, timeout=0)
+
+
+def test_expired_lease_and_dead_process_release_locks(store, other):
+    assert store.acquire_lock("a", "owner-1", lease=0.05)
+    assert other.acquire_lock("a", "owner-2", lease=10, timeout=1)
+
+    assert store.acquire_lock("b", "owner-3", lease=10)
+    assert store.release_locks_of(os.getpid()) == 2
+    assert other.acquire_lock("b", "owner-4", lease=10, timeout=0)
+
+
+def test_counters_are_summed_across_stores(store, other):
+    store.incr("requests.total")
+    other.add_counters({"requests.total": 2, "requests.failed": 1})
+    assert store.get_counters("requests.") == {"total": 3, "failed": 1}
+    assert store.get_stats()["counters"]["requests.total"] == 3
+
+
+def test_destroy_removes_temporary_directory():
+    store = SharedStateStore.create_temporary()
+    directory = os.path.dirname(store.path)
+    store.incr("x")
+    store.destroy()
+    assert not os.path.exists(directory)
@@ -0,0 +1,57 @@
+import sys
+import time
+
+import pytest
+
+from app.startup_profile import StartupProfiler
+
+
+@pytest.fixture
+def profiler():
+    profiler = StartupProfiler()
+    yield profiler
+    # report() 會移除尋找器，測試失敗時也要確保移除
+    if profiler._finder in sys.meta_path:
+        sys.meta_path.remove(profiler._finder)
+
+
+def test_disabled_profiler_records_nothing(profiler):
+    profiler.mark("階段")
+    assert profiler.phases == []
+    assert profiler._finder is None
+
+
+def test_records_import_times_with_children(profiler, tmp_path, monkeypatch):
+    (tmp_path / "profiled_parent.py").write_text(
+        "import time\nimport profiled_child\ntime.sleep(0.02)\n"
+    )
+    (tmp_path / "profiled_child.py").write_text("import time\ntime.sleep(0.05)\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    for name in ("profiled_parent", "profiled_child"):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+
+    profiler.enable()
+    import profiled_parent  # noqa: F401
+
+    parent_total, parent_own = profiler.imports["profiled_parent"]
+    child_total, child_own = profiler.imports["profiled_child"]
+    assert child_total >= 0.05
+    assert parent_total >= child_total + 0.02
+    # 自身耗時不含子模組
+    assert parent_own == pytest.approx(parent_total - child_total)
+    assert child_own == child_total
+
+
+def test_report_lists_phases_and_slowest_imports(profiler):
+    profiler.enable()
+    time.sleep(0.01)
+    profiler.mark("載入配置")
+    profiler.imports = {"slow": [0.5, 0.1], "fast": [0.01, 0.01]}
+    report = profiler.report(top=1)
+
+    assert profiler._finder not in sys.meta_path
+    assert "載入配置" in report
+    assert "合計" in report
+    assert "slow" in report
+    assert "fast" not in report
+    assert "共匯入 2 個模組" in report
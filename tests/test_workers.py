@@ -0,0 +1,89 @@
+import os
+import time
+
+import pytest
+
+from app.workers import WORKER_READY, WorkerSupervisor
+
+
+def serve(index, conn, marker=None):
+    """工作進程入口：送出就緒通知後等待主進程關閉管道"""
+    conn.send(WORKER_READY)
+    try:
+        conn.recv()
+    except EOFError:
+        pass
+
+
+def crash_once(index, conn, marker):
+    """第一次啟動時異常結束，重新啟動後正常運行"""
+    if not os.path.exists(marker):
+        open(marker, "w").close()
+        os._exit(3)
+    serve(index, conn)
+
+
+def exit_cleanly(index, conn, marker=None):
+    """送出就緒通知後立即正常結束"""
+    conn.send(WORKER_READY)
+
+
+def wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return condition()
+
+
+@pytest.fixture
+def make_supervisor(monkeypatch):
+    monkeypatch.setattr(WorkerSupervisor, "RESTART_DELAY", 0.1)
+    supervisors = []
+
+    def make(target, args=(), workers=1):
+        exited = []
+        supervisor = WorkerSupervisor(target, args, workers, on_exit=exited.append)
+        supervisor.exited = exited
+        supervisors.append(supervisor)
+        return supervisor
+
+    yield make
+    for supervisor in supervisors:
+        supervisor.stop(5)
+
+
+def test_workers_start_and_stop(make_supervisor):
+    supervisor = make_supervisor(serve, workers=2)
+    supervisor.start()
+    assert supervisor.wait_until_ready(30)
+    pids = {slot.process.pid for slot in supervisor._slots}
+    assert len(pids) == 2
+
+    supervisor.stop(5)
+    assert all(slot.process.exitcode == 0 for slot in supervisor._slots)
+    assert set(supervisor.exited) == pids
+
+
+def test_crashed_worker_is_restarted(make_supervisor, tmp_path):
+    supervisor = make_supervisor(crash_once, (str(tmp_path / "crashed"),))
+    supervisor.start()
+    slot = supervisor._slots[0]
+    first_pid = slot.process.pid
+    # 啟動期間結束的工作進程讓等待立即失敗
+    assert not supervisor.wait_until_ready(30)
+
+    assert wait_for(lambda: slot.restarts == 1, 30)
+    assert slot.process.pid != first_pid
+    assert wait_for(lambda: slot.conn.poll() and slot.conn.recv() == WORKER_READY, 30)
+    assert supervisor.exited == [first_pid]
+    assert supervisor.running
+
+
+def test_cleanly_exited_worker_is_not_restarted(make_supervisor):
+    supervisor = make_supervisor(exit_cleanly)
+    supervisor.start()
+    assert supervisor.wait_until_ready(30)
+    assert wait_for(lambda: not supervisor.running, 30)
+    assert len(supervisor.exited) == 1